@@ -1,17 +1,26 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from django.urls import reverse
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count
+from django.http import HttpResponse
+from django.template.defaultfilters import filesizeformat
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
-from .models import Role, User, Employer, EmploymentStatus, Graduate, Employment, Document, Feedback, Report, \
-    RegistrationRequest
+from .models import Role, User, Employer, EmploymentStatus, Faculty, Specialization, Graduate, Employment, Document, \
+    Feedback, Report, RegistrationRequest
+from .importers import GraduateImporter, ImportFormatError, write_activation_csv
+from .services import mark_feedback
 
 admin.site.site_header = "Информационная система учета трудоустройства выпускников"
 admin.site.site_title = "ИСУТВ МУИВ"
 admin.site.index_title = "Главная"
 
+IMPORT_ERRORS_SHOWN = 200
+
 
 @admin.register(Role)
 class RoleAdmin(admin.ModelAdmin):
@@ -19,15 +28,19 @@ class RoleAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     ordering = ('name',)
 
+    def get_queryset(self, request):
+        # Счётчик одним запросом со списком, а не COUNT на каждую строку
+        return super().get_queryset(request).annotate(users_total=Count('user'))
+
     def user_count(self, obj):
         """Количество пользователей с этой ролью"""
-        count = obj.user_set.count()
         return format_html(
             '<span style="background: #940101; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            count
+            obj.users_total
         )
 
     user_count.short_description = 'Пользователей'
+    user_count.admin_order_field = 'users_total'
 
 
 @admin.register(User)
@@ -38,6 +51,7 @@ class UserAdmin(BaseUserAdmin):
     ordering = ('-date_joined',)
     list_per_page = 25
     date_hierarchy = 'date_joined'
+    list_select_related = ('role', 'graduate_profile')
 
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
@@ -124,17 +138,20 @@ class EmployerAdmin(admin.ModelAdmin):
 
     contact_info.short_description = 'Контакты'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(employees_total=Count('employment'))
+
     def employees_count(self, obj):
         """Количество сотрудников (выпускников)"""
-        count = obj.employment_set.count()
-        if count > 0:
+        if obj.employees_total > 0:
             return format_html(
                 '<span style="color: #28a745; font-weight: bold;">{}</span>',
-                count
+                obj.employees_total
             )
         return '0'
 
     employees_count.short_description = 'Выпускников'
+    employees_count.admin_order_field = 'employees_total'
 
 
 @admin.register(EmploymentStatus)
@@ -143,15 +160,48 @@ class EmploymentStatusAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     ordering = ('name',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(employments_total=Count('employment'))
+
     def employment_count(self, obj):
         """Количество выпускников с этим статусом"""
-        count = obj.employment_set.count()
         return format_html(
             '<span style="background: #940101; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            count
+            obj.employments_total
         )
 
     employment_count.short_description = 'Использований'
+    employment_count.admin_order_field = 'employments_total'
+
+
+class ReferenceAdmin(admin.ModelAdmin):
+    """Справочники факультетов и специальностей"""
+    list_display = ('id', 'name', 'graduate_count')
+    search_fields = ('name',)
+    ordering = ('name',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(graduates_total=Count('graduates'))
+
+    def graduate_count(self, obj):
+        """Количество выпускников"""
+        return format_html(
+            '<span style="background: #940101; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
+            obj.graduates_total
+        )
+
+    graduate_count.short_description = 'Выпускников'
+    graduate_count.admin_order_field = 'graduates_total'
+
+
+@admin.register(Faculty)
+class FacultyAdmin(ReferenceAdmin):
+    pass
+
+
+@admin.register(Specialization)
+class SpecializationAdmin(ReferenceAdmin):
+    pass
 
 
 # ✅ ЕДИНСТВЕННЫЙ GraduateAdmin — исправленный
@@ -159,9 +209,10 @@ class EmploymentStatusAdmin(admin.ModelAdmin):
 class GraduateAdmin(admin.ModelAdmin):
     list_display = ('id', 'full_name', 'graduation_year', 'faculty', 'specialization', 'contact_info', 'employment_status_badge')
     list_filter = ('graduation_year', 'faculty', 'specialization')
-    search_fields = ('full_name', 'faculty', 'specialization', 'email', 'phone')
+    search_fields = ('full_name', 'faculty__name', 'specialization__name', 'email', 'phone')
     ordering = ('-graduation_year', 'full_name')
     list_per_page = 25
+    list_select_related = ('faculty', 'specialization', 'employment__status')
     # УБРАНО: readonly_fields = ('user',)
 
     fieldsets = (
@@ -207,6 +258,53 @@ class GraduateAdmin(admin.ModelAdmin):
 
     employment_status_badge.short_description = 'Трудоустройство'
 
+    def get_urls(self):
+        urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_view),
+                name='muiv_graduation_system_graduate_import',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        """Пакетный импорт выпускников из XLSX/CSV"""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Импорт выпускников',
+        }
+
+        upload = request.FILES.get('file') if request.method == 'POST' else None
+        if upload:
+            with_activations = bool(request.POST.get('activation_links'))
+            importer = GraduateImporter(with_activations=with_activations)
+            try:
+                result = importer.run(upload.file, upload.name)
+            except ImportFormatError as e:
+                self.message_user(request, str(e), level=messages.ERROR)
+                return TemplateResponse(request, 'admin/muiv_graduation_system/graduate/import.html', context)
+
+            if with_activations:
+                response = HttpResponse(content_type='text/csv; charset=utf-8')
+                response['Content-Disposition'] = 'attachment; filename="activation_links.csv"'
+                response.write('\ufeff')
+                write_activation_csv(result.activations, response, request.build_absolute_uri('/'))
+                return response
+
+            context.update({
+                'result': result,
+                'rate': result.created / result.elapsed if result.elapsed else 0,
+                'errors_shown': result.errors[:IMPORT_ERRORS_SHOWN],
+                'errors_hidden': max(len(result.errors) - IMPORT_ERRORS_SHOWN, 0),
+            })
+
+        return TemplateResponse(request, 'admin/muiv_graduation_system/graduate/import.html', context)
+
 
 @admin.register(Employment)
 class EmploymentAdmin(admin.ModelAdmin):
@@ -217,6 +315,7 @@ class EmploymentAdmin(admin.ModelAdmin):
     ordering = ('-updated_at',)
     date_hierarchy = 'start_date'
     list_per_page = 25
+    list_select_related = ('graduate', 'employer', 'status')
 
     fieldsets = (
         ('Выпускник', {
@@ -285,14 +384,15 @@ class EmploymentAdmin(admin.ModelAdmin):
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
-    list_display = ('id', 'filename', 'graduate_link', 'doc_type_badge', 'uploaded_at')
+    list_display = ('id', 'filename', 'graduate_link', 'doc_type_badge', 'size_display', 'uploaded_at', 'download_link')
     list_filter = ('doc_type', 'uploaded_at')
     search_fields = ('filename', 'graduate__full_name')
     ordering = ('-uploaded_at',)
     date_hierarchy = 'uploaded_at'
     list_per_page = 25
+    list_select_related = ('graduate',)
 
-    readonly_fields = ('uploaded_at',)
+    readonly_fields = ('uploaded_at', 'sha256', 'size', 'content_type')
 
     fieldsets = (
         ('Выпускник', {
@@ -302,7 +402,7 @@ class DocumentAdmin(admin.ModelAdmin):
             'fields': ('filename', 'filepath', 'doc_type')
         }),
         ('Системная информация', {
-            'fields': ('uploaded_at',),
+            'fields': ('uploaded_at', 'sha256', 'size', 'content_type'),
             'classes': ('collapse',)
         }),
     )
@@ -331,22 +431,40 @@ class DocumentAdmin(admin.ModelAdmin):
 
     doc_type_badge.short_description = 'Тип'
 
+    def size_display(self, obj):
+        """Размер файла"""
+        return filesizeformat(obj.size) if obj.size else '—'
+
+    size_display.short_description = 'Размер'
+    size_display.admin_order_field = 'size'
+
+    def download_link(self, obj):
+        """Скачивание файла"""
+        url = reverse('muiv_graduation_system:download_document', args=[obj.id])
+        return format_html('<a href="{}">Скачать</a>', url)
+
+    download_link.short_description = 'Файл'
+
 
 @admin.register(Feedback)
 class FeedbackAdmin(admin.ModelAdmin):
     list_display = ('id', 'user_link', 'subject', 'message_preview', 'created_at', 'is_read_badge')
     list_filter = ('is_read', 'created_at')
-    search_fields = ('user__username', 'subject', 'message')
+    # Поиск по тексту сообщений — во входящих панели (FeedbackInboxView, полнотекстовый индекс)
+    search_fields = ('user__username', 'email', 'subject')
     ordering = ('-created_at',)
     date_hierarchy = 'created_at'
     list_per_page = 25
+    # Таблица самая большая — без COUNT(*) всей таблицы при фильтрации
+    show_full_result_count = False
     actions = ['mark_as_read', 'mark_as_unread']
 
     readonly_fields = ('created_at',)
+    list_select_related = ('user',)
 
     fieldsets = (
         ('Отправитель', {
-            'fields': ('user',)
+            'fields': ('user', 'email')
         }),
         ('Сообщение', {
             'fields': ('subject', 'message')
@@ -357,7 +475,9 @@ class FeedbackAdmin(admin.ModelAdmin):
     )
 
     def user_link(self, obj):
-        """Ссылка на пользователя"""
+        """Ссылка на пользователя (для гостя — email)"""
+        if obj.user_id is None:
+            return obj.email
         url = reverse('admin:muiv_graduation_system_user_change', args=[obj.user.id])
         return format_html('<a href="{}">{}</a>', url, obj.user.username)
 
@@ -380,14 +500,14 @@ class FeedbackAdmin(admin.ModelAdmin):
 
     def mark_as_read(self, request, queryset):
         """Отметить как прочитанное"""
-        updated = queryset.update(is_read=True)
+        updated = mark_feedback(queryset.values('id'), True)
         self.message_user(request, f'{updated} сообщений отмечено как прочитанные')
 
     mark_as_read.short_description = '✓ Отметить как прочитанное'
 
     def mark_as_unread(self, request, queryset):
         """Отметить как непрочитанное"""
-        updated = queryset.update(is_read=False)
+        updated = mark_feedback(queryset.values('id'), False)
         self.message_user(request, f'{updated} сообщений отмечено как непрочитанные')
 
     mark_as_unread.short_description = '✉ Отметить как непрочитанное'
@@ -401,6 +521,7 @@ class ReportAdmin(admin.ModelAdmin):
     ordering = ('-generated_at',)
     date_hierarchy = 'generated_at'
     list_per_page = 25
+    list_select_related = ('generated_by',)
 
     readonly_fields = ('generated_at',)
 
@@ -444,6 +565,7 @@ class RegistrationRequestAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)
     date_hierarchy = 'created_at'
     list_per_page = 25
+    list_select_related = ('approved_by',)
     actions = ['approve_selected_requests', 'reject_selected_requests']
 
     readonly_fields = ('created_at', 'password_hash')
@@ -480,42 +602,23 @@ class RegistrationRequestAdmin(admin.ModelAdmin):
 
     def approve_selected_requests(self, request, queryset):
         """Одобрить заявки и создать пользователей"""
-        from django.contrib.auth.hashers import make_password
-        from .models import User, Role
-
-        count = 0
-        for obj in queryset.filter(is_approved=False):
-            # Получаем роль "Manager"
-            manager_role = Role.objects.filter(name__iexact='manager').first()
-            if not manager_role:
-                self.message_user(request, 'Ошибка: роль "Manager" не найдена', level='ERROR')
-                continue
-
-            # Разбираем full_name на части (Фамилия Имя Отчество)
-            name_parts = obj.full_name.split() if obj.full_name else []
-            last_name = name_parts[0] if len(name_parts) > 0 else ''
-            first_name = name_parts[1] if len(name_parts) > 1 else ''
-
-            # Создаем пользователя
-            user = User.objects.create(
-                username=obj.username,
-                email=obj.email,
-                first_name=first_name,
-                last_name=last_name,
-                password=obj.password_hash,  # Используем как есть, если это хеш
-                role=manager_role,
-                is_active=True,
-                is_staff=False,
-            )
+        from .models import Role
+        from .services import approve_registration_requests
 
-            # Отмечаем и удаляем заявку
-            obj.is_approved = True
-            obj.approved_by = request.user
-            obj.save()
-            obj.delete()
-            count += 1
-
-        self.message_user(request, f'Успешно создано пользователей: {count}')
+        try:
+            result = approve_registration_requests(queryset, request.user)
+        except Role.DoesNotExist:
+            self.message_user(request, 'Ошибка: роль "Manager" не найдена', level='ERROR')
+            return
+
+        self.message_user(request, f'Успешно создано пользователей: {len(result.approved)}')
+        if result.skipped:
+            self.message_user(
+                request,
+                f'Пропущено заявок (логин или email уже заняты): {len(result.skipped)} — '
+                f'{", ".join(result.skipped[:20])}{"…" if len(result.skipped) > 20 else ""}',
+                level='WARNING'
+            )
 
     approve_selected_requests.short_description = '✓ Одобрить выбранные заявки'
 
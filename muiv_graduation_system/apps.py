@@ -1,6 +1,8 @@
 # muiv_graduation_system/apps.py
 
 from django.apps import AppConfig
+from django.core.checks import Tags, register
+from django.db.backends.signals import connection_created
 from django.db.models.signals import post_migrate
 from django.dispatch import receiver
 
@@ -11,4 +13,9 @@ class MuivGraduationSystemConfig(AppConfig):
 
     def ready(self):
         from . import signals  # подключаем сигналы
-        post_migrate.connect(signals.init_demo_data, sender=self)
\ No newline at end of file
+        from .checks import check_shared_cache_versions
+        from .instrumentation import install_query_counter
+        post_migrate.connect(signals.init_demo_data, sender=self)
+        # Счётчик SQL-запросов для Server-Timing и метрик — на каждом новом соединении
+        connection_created.connect(install_query_counter)
+        register(check_shared_cache_versions, Tags.caches, deploy=True)
\ No newline at end of file
@@ -0,0 +1,388 @@
+import re
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth import alogin
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import render, redirect
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .backends import aget_role_name
+from .caching import card_cache_timeout, graduate_card_versions
+from .hashing import amake_password, averify_password
+from .models import User, Role, Graduate, Employment, EmploymentStatus, RegistrationRequest
+from .views import (
+    _graduate_list_etag, _graduate_profile_validators, _graduation_year, _page_state, _profile_row_validators,
+    _search_graduates
+)
+
+
+# ========================
+# АСИНХРОННЫЕ ПРЕДСТАВЛЕНИЯ АВТОРИЗАЦИИ (ASGI)
+# ========================
+# Асинхронные версии LoginView, RegisterAsView и AdminCreateUserView.
+# Поиск пользователей идёт через async ORM, PBKDF2 — в пуле hashing.py.
+# Включаются настройкой ASYNC_AUTH_VIEWS (см. urls.py).
+
+# Шаблоны обращаются к request.user (синхронный ORM), поэтому рендер — в потоке
+arender = sync_to_async(render)
+
+AUTH_BACKEND = 'muiv_graduation_system.backends.RoleModelBackend'
+
+
+class AsyncRoleRequiredMixin:
+    """Асинхронный аналог RoleRequiredMixin"""
+    allowed_roles = []
+
+    async def dispatch(self, request, *args, **kwargs):
+        role_name = await aget_role_name(request)
+        if role_name not in self.allowed_roles:
+            messages.error(request, "У вас недостаточно прав для доступа к этой странице.")
+            return redirect('muiv_graduation_system:index')
+        # Пользователь уже загружен: синхронный код (ETag, шаблоны) не пойдёт за ним в БД
+        request.user = await request.auser()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncLoginView(View):
+    """Вход в систему (async)"""
+    template_name = 'login.html'
+
+    async def get(self, request):
+        user = await request.auser()
+        if user.is_authenticated:
+            return redirect('muiv_graduation_system:profile')
+        return await arender(request, self.template_name)
+
+    async def post(self, request):
+        username = request.POST.get('username', '')
+        password = request.POST.get('password', '')
+
+        user = await self._authenticate(username, password)
+
+        if user is not None:
+            await alogin(request, user, backend=AUTH_BACKEND)
+            display_name = user.username
+
+            # Профиль выпускника загружен тем же запросом
+            if user.role and user.role.name == 'graduate':
+                try:
+                    display_name = user.graduate_profile.full_name
+                except Graduate.DoesNotExist:
+                    pass
+
+            messages.success(request, f"Добро пожаловать, {display_name}!")
+            return redirect('muiv_graduation_system:profile')
+        else:
+            messages.error(request, "Неверный логин или пароль")
+            return await arender(request, self.template_name)
+
+    async def _authenticate(self, username, password):
+        """Аналог ModelBackend.authenticate с хешированием в пуле"""
+        if not username or not password:
+            return None
+        try:
+            user = await User.objects.select_related('role', 'graduate_profile').aget(username=username)
+        except User.DoesNotExist:
+            # Хешируем впустую, чтобы время ответа не выдавало существование логина
+            await amake_password(password)
+            return None
+
+        is_correct, must_update = await averify_password(password, user.password)
+        if not is_correct or not user.is_active:
+            return None
+        if must_update:
+            user.password = await amake_password(password)
+            await user.asave(update_fields=['password'])
+        return user
+
+
+class AsyncRegisterAsView(View):
+    """Регистрация с выбранной ролью (async)"""
+
+    async def get(self, request, role):
+        if role == 'graduate':
+            return await arender(request, 'register_graduate.html')
+        elif role == 'manager':
+            return await arender(request, 'register_manager.html')
+        else:
+            messages.error(request, "Недопустимая роль")
+            return redirect('muiv_graduation_system:register')
+
+    async def post(self, request, role):
+        if role == 'graduate':
+            return await self._register_graduate(request)
+        elif role == 'manager':
+            return await self._register_manager(request)
+        else:
+            messages.error(request, "Недопустимая роль")
+            return redirect('muiv_graduation_system:register')
+
+    async def _register_graduate(self, request):
+        """Регистрация выпускника"""
+        last_name = request.POST.get('last_name', '').strip()
+        first_name = request.POST.get('first_name', '').strip()
+        middle_name = request.POST.get('middle_name', '').strip()
+        grad_year = request.POST.get('graduation_year', '')
+        email = request.POST.get('email', '').strip()
+        username = request.POST.get('username', '').strip()
+        password = request.POST.get('password', '')
+
+        # Валидация
+        if not last_name or not first_name:
+            messages.error(request, "Фамилия и имя обязательны")
+            return await arender(request, 'register_graduate.html')
+
+        grad_year = _graduation_year(grad_year)
+        if grad_year is None:
+            messages.error(request, "Год выпуска должен быть числом от 2000 до 2030")
+            return await arender(request, 'register_graduate.html')
+
+        if not re.match(r"[^@]+@[^@]+\.[^@]+", email):
+            messages.error(request, "Некорректный email")
+            return await arender(request, 'register_graduate.html')
+
+        if await User.objects.filter(username=username).aexists():
+            messages.error(request, "Логин занят")
+            return await arender(request, 'register_graduate.html')
+
+        if await User.objects.filter(email=email).aexists():
+            messages.error(request, "Email уже используется")
+            return await arender(request, 'register_graduate.html')
+
+        # Создание пользователя
+        full_name = f"{last_name} {first_name}" + (f" {middle_name}" if middle_name else "")
+        role_obj, _ = await Role.objects.aget_or_create(name='graduate')
+
+        user = await User.objects.acreate(
+            username=username,
+            email=email,
+            password=await amake_password(password),
+            role=role_obj
+        )
+
+        await Graduate.objects.acreate(
+            user=user,
+            full_name=full_name,
+            graduation_year=grad_year,
+            email=email
+        )
+
+        messages.success(request, "Регистрация завершена! Войдите в систему.")
+        return redirect('muiv_graduation_system:login')
+
+    async def _register_manager(self, request):
+        """Регистрация менеджера (заявка)"""
+        username = request.POST.get('username', '').strip()
+        email = request.POST.get('email', '').strip()
+        password = request.POST.get('password', '')
+        full_name = request.POST.get('full_name', '').strip()
+
+        # Проверка уникальности
+        if (await User.objects.filter(Q(username=username) | Q(email=email)).aexists() or
+                await RegistrationRequest.objects.filter(Q(username=username) | Q(email=email)).aexists()):
+            messages.error(request, "Логин или email уже используется")
+            return await arender(request, 'register_manager.html')
+
+        # Создание заявки
+        await RegistrationRequest.objects.acreate(
+            username=username,
+            email=email,
+            password_hash=await amake_password(password),
+            full_name=full_name
+        )
+
+        messages.info(request, "Заявка отправлена. Ожидайте одобрения администратором.")
+        return redirect('muiv_graduation_system:index')
+
+
+class AsyncAdminCreateUserView(AsyncRoleRequiredMixin, View):
+    """Создание пользователя админом (async)"""
+    allowed_roles = ['admin']
+    template_name = 'admin/create_user.html'
+
+    async def get(self, request):
+        return await self._render_form(request)
+
+    async def post(self, request):
+        username = request.POST.get('username', '')
+        email = request.POST.get('email', '')
+        password = request.POST.get('password', '')
+        role_id = request.POST.get('role_id', '')
+
+        if not role_id.isdigit() or not await Role.objects.exclude(name='graduate').filter(pk=role_id).aexists():
+            messages.error(request, "Выберите роль")
+        elif await User.objects.filter(username=username).aexists():
+            messages.error(request, "Логин занят")
+        elif await User.objects.filter(email=email).aexists():
+            messages.error(request, "Email уже используется")
+        else:
+            await User.objects.acreate(
+                username=username,
+                email=email,
+                password=await amake_password(password),
+                role_id=int(role_id)
+            )
+            messages.success(request, "Пользователь создан")
+            return redirect('muiv_graduation_system:admin_users')
+
+        return await self._render_form(request)
+
+    async def _render_form(self, request):
+        roles = [role async for role in Role.objects.exclude(name='graduate')]
+        return await arender(request, self.template_name, {'roles': roles})
+
+
+# ========================
+# АСИНХРОННЫЕ ПРЕДСТАВЛЕНИЯ ЧТЕНИЯ (ASGI)
+# ========================
+# Асинхронные версии ManagerGraduatesView, SearchGraduatesView и ProfileView.
+# Запросы к БД — через async ORM (acount, aiterator, aget), ETag и версии карточек
+# те же, что у синхронных версий. Включаются настройкой ASYNC_READ_VIEWS (см. urls.py).
+
+agraduate_card_versions = sync_to_async(graduate_card_versions)
+
+
+async def apaginate(request, queryset, per_page, page_kwarg='page'):
+    """Аналог ListView.paginate_queryset: число строк — acount(), страница — aiterator()"""
+    paginator = Paginator(queryset, per_page)
+    # Paginator.count синхронный — подставляем результат acount()
+    paginator.count = await queryset.acount()
+
+    page_number = request.GET.get(page_kwarg) or 1
+    try:
+        page_number = paginator.num_pages if page_number == 'last' else int(page_number)
+    except ValueError:
+        raise Http404("Номер страницы должен быть числом")
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage as e:
+        raise Http404(f"Неверная страница ({page_number}): {e}")
+
+    page.object_list = [obj async for obj in page.object_list.aiterator()]
+    return paginator, page
+
+
+class AsyncGraduateListView(AsyncRoleRequiredMixin, View):
+    """Общая часть асинхронных списков выпускников (аналог ListView + GraduateCardCacheMixin)"""
+    allowed_roles = ['manager', 'admin']
+    template_name = None
+    paginate_by = 25
+
+    def get_queryset(self):
+        return Graduate.objects.select_related(
+            'faculty', 'specialization', 'employment__employer', 'employment__status'
+        )
+
+    def get_context_data(self, **kwargs):
+        return kwargs
+
+    async def get(self, request):
+        paginator, page = await apaginate(request, self.get_queryset(), self.paginate_by)
+        graduates = page.object_list
+        versions = await agraduate_card_versions([grad.id for grad in graduates])
+        for grad in graduates:
+            grad.card_version = versions[grad.id]
+
+        context = self.get_context_data(
+            paginator=paginator,
+            page_obj=page,
+            is_paginated=page.has_other_pages(),
+            object_list=graduates,
+            graduates=graduates,
+            statuses=EmploymentStatus.objects.all(),
+            card_cache_timeout=card_cache_timeout(),
+        )
+        return await arender(request, self.template_name, context)
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+@method_decorator(condition(etag_func=_graduate_list_etag), name='get')
+class AsyncManagerGraduatesView(AsyncGraduateListView):
+    """Список выпускников для менеджера (async)"""
+    template_name = 'manager/graduates.html'
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+@method_decorator(condition(etag_func=_graduate_list_etag), name='get')
+class AsyncSearchGraduatesView(AsyncGraduateListView):
+    """Поиск выпускников (async)"""
+    template_name = 'manager/search.html'
+
+    def get_queryset(self):
+        query = self.request.GET.get('query', '').strip()
+        return _search_graduates(super().get_queryset(), query).distinct()
+
+    def get_context_data(self, **kwargs):
+        kwargs['query'] = self.request.GET.get('query', '')
+        return kwargs
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+@method_decorator(condition(
+    etag_func=lambda request: _graduate_profile_validators(request)[0],
+    last_modified_func=lambda request: _graduate_profile_validators(request)[1],
+), name='get')
+class AsyncProfileView(View):
+    """Профиль пользователя (async)"""
+    login_url = 'muiv_graduation_system:login'
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), self.login_url)
+        request.user = user
+        self.role_name = await aget_role_name(request)
+        # Валидаторы считаются здесь: condition вызывает etag_func синхронно
+        request._profile_validators = await self._avalidators(request)
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def _avalidators(self, request):
+        """Асинхронный аналог _graduate_profile_validators"""
+        state = _page_state(request)
+        if state is None or self.role_name != 'graduate':
+            return None, None
+        row = await Graduate.objects.filter(user_id=request.user.pk) \
+            .values_list('updated_at', 'employment__updated_at').afirst()
+        return _profile_row_validators(state, row)
+
+    async def get(self, request):
+        if not self.role_name:
+            messages.error(request, "У пользователя не назначена роль")
+            return redirect('muiv_graduation_system:index')
+
+        if self.role_name == 'graduate':
+            return await self._graduate_profile(request)
+        elif self.role_name == 'manager':
+            return await arender(request, 'profile/manager.html', {'user': request.user})
+        elif self.role_name == 'admin':
+            return await self._admin_profile(request)
+
+        return redirect('muiv_graduation_system:index')
+
+    async def _graduate_profile(self, request):
+        """Профиль выпускника"""
+        try:
+            graduate = await Graduate.objects.select_related(
+                'faculty', 'specialization', 'employment__employer', 'employment__status'
+            ).aget(user=request.user)
+        except Graduate.DoesNotExist:
+            messages.error(request, "Профиль выпускника не найден")
+            return redirect('muiv_graduation_system:index')
+
+        return await arender(request, 'profile/graduate.html', {'graduate': graduate})
+
+    async def _admin_profile(self, request):
+        """Профиль администратора"""
+        stats = {
+            'total_users': await User.objects.acount(),
+            'total_graduates': await Graduate.objects.acount(),
+            'employed_graduates': await Employment.objects.filter(status__name='трудоустроен').acount()
+        }
+        return await arender(request, 'profile/admin.html', {'user': request.user, 'stats': stats})
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+# ========================
+# АУТЕНТИФИКАЦИЯ С УЧЁТОМ РОЛИ
+# ========================
+
+# В сессии хранится пара [role_id, название роли]; role_id берётся из уже
+# загруженной строки пользователя, поэтому смена роли сразу сбрасывает кеш.
+ROLE_SESSION_KEY = '_auth_user_role'
+
+
+class RoleModelBackend(ModelBackend):
+    """
+    ModelBackend, загружающий пользователя вместе с ролью и профилем выпускника.
+
+    И при входе, и при восстановлении пользователя из сессии выполняется
+    один запрос с select_related('role', 'graduate_profile'), так что
+    user.role.name и user.graduate_profile не требуют отдельных запросов.
+    """
+
+    def get_queryset(self):
+        return get_user_model()._default_manager.select_related('role', 'graduate_profile')
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = self.get_queryset().get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Хешируем впустую, чтобы время ответа не выдавало существование логина
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        user = self.get_queryset().filter(pk=user_id).first()
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+def _cached_role(session_value, user):
+    if session_value and session_value[0] == user.role_id:
+        return session_value[1]
+    return None
+
+
+def get_role_name(request):
+    """Название роли текущего пользователя (None — аноним или роль не назначена)"""
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    role_name = _cached_role(request.session.get(ROLE_SESSION_KEY), user)
+    if role_name is None and user.role_id is not None:
+        role_name = user.role.name
+        request.session[ROLE_SESSION_KEY] = [user.role_id, role_name]
+    return role_name
+
+
+async def aget_role_name(request):
+    """Асинхронная версия get_role_name"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    role_name = _cached_role(await request.session.aget(ROLE_SESSION_KEY), user)
+    if role_name is None and user.role_id is not None:
+        if type(user).role.is_cached(user):
+            role_name = user.role.name
+        else:
+            # Пользователь загружен другим бэкендом — ленивая загрузка в async недоступна
+            role_name = await type(user).role.get_queryset().filter(pk=user.role_id) \
+                .values_list('name', flat=True).afirst()
+        await request.session.aset(ROLE_SESSION_KEY, [user.role_id, role_name])
+    return role_name
@@ -0,0 +1,142 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# ========================
+# ВЕРСИИ КАРТОЧЕК ВЫПУСКНИКОВ
+# ========================
+# Карточки в списках менеджера кешируются тегом {% cache %} по ключу
+# «id выпускника + версия». Версия — случайный токен в кеше: при изменении
+# выпускника или его трудоустройства токен заменяется (signals.py), а смена
+# работодателя, статуса или массовое обновление меняют общее поколение.
+# Если токен вытеснен из кеша, создаётся новый, поэтому устаревший
+# фрагмент не может снова стать актуальным.
+# Токены работают, только если кеш общий для всех воркеров (SHARED_CACHE_VERSIONS):
+# иначе сброс в одном воркере не виден остальным, и кеширование отключается.
+
+GENERATION_KEY = 'graduate_card:generation'
+
+# Версия данных списков выпускников (для ETag): меняется при любом изменении
+LIST_VERSION_KEY = 'graduate_list:version'
+
+
+def _version_key(graduate_id):
+    return f'graduate_card:version:{graduate_id}'
+
+
+def _new_token():
+    return uuid.uuid4().hex[:12]
+
+
+def versions_shared():
+    """Токены версий видны всем воркерам (см. SHARED_CACHE_VERSIONS)"""
+    return getattr(settings, 'SHARED_CACHE_VERSIONS', False)
+
+
+def card_cache_timeout():
+    # Время жизни 0: фрагмент устаревает сразу, т.е. карточки не кешируются
+    if not versions_shared():
+        return 0
+    return getattr(settings, 'GRADUATE_CARD_CACHE_TIMEOUT', 3600)
+
+
+def graduate_card_versions(graduate_ids):
+    """Словарь «id выпускника → версия карточки» за одно обращение к кешу"""
+    if not versions_shared():
+        return dict.fromkeys(graduate_ids, '')
+    keys = {graduate_id: _version_key(graduate_id) for graduate_id in graduate_ids}
+    values = cache.get_many([GENERATION_KEY, *keys.values()])
+
+    missing = {}
+    generation = values.get(GENERATION_KEY)
+    if generation is None:
+        generation = missing[GENERATION_KEY] = _new_token()
+    for key in keys.values():
+        if key not in values:
+            values[key] = missing[key] = _new_token()
+    if missing:
+        cache.set_many(missing, timeout=None)
+
+    return {graduate_id: f'{generation}.{values[key]}' for graduate_id, key in keys.items()}
+
+
+def graduate_generation():
+    """Общее поколение карточек (меняется при правке работодателей и статусов)"""
+    return _get_or_create_token(GENERATION_KEY)
+
+
+def graduate_list_version():
+    """Версия данных списков выпускников"""
+    return _get_or_create_token(LIST_VERSION_KEY)
+
+
+def _get_or_create_token(key):
+    token = cache.get(key)
+    if token is None:
+        token = _new_token()
+        if not cache.add(key, token, timeout=None):
+            token = cache.get(key, token)
+    return token
+
+
+def bump_graduate_card(graduate_id):
+    """Сброс кеша карточки одного выпускника"""
+    cache.set_many({_version_key(graduate_id): _new_token(), LIST_VERSION_KEY: _new_token()}, timeout=None)
+
+
+def bump_all_graduate_cards():
+    """Сброс кеша всех карточек (работодатели, статусы, массовые изменения)"""
+    cache.set_many({GENERATION_KEY: _new_token(), LIST_VERSION_KEY: _new_token()}, timeout=None)
+
+
+def bump_graduate_list():
+    """Новая версия списков (новые выпускники: старые карточки не меняются)"""
+    cache.set(LIST_VERSION_KEY, _new_token(), timeout=None)
+
+
+# ========================
+# ПОКОЛЕНИЯ СПРАВОЧНИКОВ
+# ========================
+# Кеш «название → id» справочников живёт в памяти процесса (NormalizedNameManager).
+# Поколение в общем кеше меняется после фиксации правки справочника, и каждый
+# воркер сбрасывает свой кеш при следующем обращении.
+
+def _reference_key(label):
+    return f'reference_ids:generation:{label}'
+
+
+def reference_generation(label):
+    """Поколение кеша «название → id» справочника; None — общего кеша нет, кешировать нельзя"""
+    if not versions_shared():
+        return None
+    return _get_or_create_token(_reference_key(label))
+
+
+def bump_reference_generation(label):
+    cache.set(_reference_key(label), _new_token(), timeout=None)
+
+
+# ========================
+# СЧЁТЧИК НЕПРОЧИТАННОЙ ОБРАТНОЙ СВЯЗИ
+# ========================
+# Число непрочитанных сообщений показывается на каждой странице администратора,
+# поэтому хранится в кеше. Сбрасывается после фиксации изменения сообщения
+# (signals.py; для записей без сигналов — save_guest_feedback, mark_feedback).
+
+UNREAD_FEEDBACK_KEY = 'feedback:unread'
+
+
+def unread_feedback_count():
+    """Число непрочитанных сообщений обратной связи (COUNT по частичному индексу при промахе кеша)"""
+    count = cache.get(UNREAD_FEEDBACK_KEY)
+    if count is None:
+        from .models import Feedback
+        count = Feedback.objects.filter(is_read=False).count()
+        cache.set(UNREAD_FEEDBACK_KEY, count, timeout=getattr(settings, 'UNREAD_FEEDBACK_CACHE_TIMEOUT', 60))
+    return count
+
+
+def reset_unread_feedback_count():
+    cache.delete(UNREAD_FEEDBACK_KEY)
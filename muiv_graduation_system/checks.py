@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error
+
+
+def check_shared_cache_versions(app_configs, **kwargs):
+    """Токены версий в кеше памяти процесса расходятся между воркерами"""
+    if getattr(settings, 'SHARED_CACHE_VERSIONS', False) and isinstance(caches['default'], LocMemCache):
+        return [Error(
+            'SHARED_CACHE_VERSIONS включён, а кеш по умолчанию хранится в памяти процесса.',
+            hint='Задайте REDIS_URL (общий кеш для всех воркеров) или выключите SHARED_CACHE_VERSIONS.',
+            id='muiv_graduation_system.E001',
+        )]
+    return []
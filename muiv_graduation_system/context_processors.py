@@ -0,0 +1,14 @@
+from .backends import get_role_name
+from .caching import unread_feedback_count
+
+
+def user_role(request):
+    """Название роли текущего пользователя для шаблонов (user_role)"""
+    return {'user_role': get_role_name(request)}
+
+
+def unread_feedback(request):
+    """Число непрочитанных сообщений обратной связи для меню администратора (читается из кеша лениво)"""
+    if get_role_name(request) != 'admin':
+        return {}
+    return {'unread_feedback_count': unread_feedback_count}
@@ -0,0 +1,472 @@
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+from django.db import transaction
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+from .models import Document, DocumentBlob, Graduate, UploadSession
+
+
+# ========================
+# ХРАНИЛИЩЕ ДОКУМЕНТОВ (КОНТЕНТНАЯ АДРЕСАЦИЯ)
+# ========================
+# Файл лежит в DOCUMENTS_ROOT/<sha[:2]>/<sha[2:4]>/<sha>: одинаковое содержимое
+# хранится один раз, сколько бы документов на него ни ссылалось. Загрузка
+# пишется на диск кусками с подсчётом SHA-256 прямо при приёме, готовый файл
+# переносится в хранилище переименованием — без повторного чтения и копирования.
+#
+# Файл общий для документов с одним содержимым, поэтому сохранение документа
+# и удаление ненужного файла выполняются под блокировкой строки DocumentBlob
+# этого содержимого: удаление не может проверить «ссылок нет» между переносом
+# файла новой загрузки и фиксацией её документа.
+
+ALLOWED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.doc', '.docx', '.odt', '.rtf')
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Блок чтения тела запроса и файла при загрузке по частям
+COPY_CHUNK_SIZE = 1024 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def documents_root():
+    return Path(settings.DOCUMENTS_ROOT)
+
+
+def blob_path(sha256):
+    """Путь файла относительно DOCUMENTS_ROOT по его SHA-256"""
+    return f'{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def temp_file():
+    """Временный файл на том же диске, что и хранилище (перенос — os.replace)"""
+    tmp_dir = documents_root() / 'tmp'
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=tmp_dir, prefix='upload_', delete=False)
+
+
+def lock_blob(sha256):
+    """Блокировка содержимого sha256 до конца текущей транзакции (строка DocumentBlob создаётся при необходимости)"""
+    while True:
+        DocumentBlob.objects.bulk_create([DocumentBlob(sha256=sha256)], ignore_conflicts=True)
+        # Строку могло удалить параллельное удаление файла — тогда создаём заново
+        if list(DocumentBlob.objects.select_for_update().filter(sha256=sha256).values_list('pk', flat=True)):
+            return
+
+
+def store_file(temp_path, sha256):
+    """
+    Перенос готового временного файла в хранилище (под lock_blob).
+    Если такое содержимое уже есть, временный файл удаляется; пропавший файл
+    создаётся заново. Возвращает путь для Document.filepath.
+    """
+    relpath = blob_path(sha256)
+    path = documents_root() / relpath
+    if path.exists():
+        os.remove(temp_path)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    return relpath
+
+
+def save_document(graduate, filename, temp_path, sha256, size, doc_type=''):
+    """
+    Документ выпускника из принятого файла: (документ, создан ли новый).
+    Повторная загрузка того же содержимого возвращает уже существующий документ.
+    """
+    with transaction.atomic(savepoint=False):
+        lock_blob(sha256)
+        filepath = store_file(temp_path, sha256)
+        existing = graduate.documents.filter(sha256=sha256).first()
+        if existing is not None:
+            return existing, False
+        document = Document.objects.create(
+            graduate=graduate,
+            filename=filename,
+            filepath=filepath,
+            doc_type=doc_type,
+            sha256=sha256,
+            size=size,
+            content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        )
+    return document, True
+
+
+def delete_unused_blob(filepath, sha256):
+    """Удаление файла хранилища, на который больше не ссылается ни один документ"""
+    if not sha256:
+        return
+    with transaction.atomic():
+        blob = DocumentBlob.objects.select_for_update().filter(sha256=sha256)
+        if not list(blob.values_list('pk', flat=True)) or Document.objects.filter(sha256=sha256).exists():
+            # Нет строки — файл уже удалён (или заново создаётся) под блокировкой
+            return
+        try:
+            os.remove(documents_root() / filepath)
+        except FileNotFoundError:
+            pass
+        blob.delete()
+
+
+# ========================
+# ПРИЁМ ЗАГРУЗКИ
+# ========================
+
+class HashedUploadedFile(UploadedFile):
+    """Загруженный файл во временном файле хранилища; sha256 посчитан при приёме"""
+
+    def __init__(self, file, name, content_type, size, charset, sha256):
+        super().__init__(file, name, content_type, size, charset)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+class DocumentUploadHandler(FileUploadHandler):
+    """
+    Обработчик загрузки: куски сразу пишутся во временный файл и хешируются,
+    в памяти воркера — не больше одного куска (chunk_size) при любом размере файла.
+    Файл недопустимого типа пропускается без записи (request.upload_rejected = True),
+    файл больше DOCUMENTS_MAX_SIZE отбрасывается (request.upload_too_large = True).
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.temp_files = []
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        # Парсер закрывает handler.file при SkipFile — это не должен быть файл предыдущего поля
+        self.__dict__.pop('file', None)
+        if os.path.splitext(self.file_name or '')[1].lower() not in ALLOWED_EXTENSIONS:
+            self.request.upload_rejected = True
+            raise SkipFile()
+        self.file = temp_file()
+        self.temp_files.append(self.file)
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.DOCUMENTS_MAX_SIZE:
+            self.upload_interrupted()
+            self.request.upload_too_large = True
+            raise StopUpload(connection_reset=False)
+        self.hash.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.flush()
+        self.file.seek(0)
+        return HashedUploadedFile(
+            self.file, self.file_name, self.content_type, file_size, self.charset, self.hash.hexdigest()
+        )
+
+    def discard(self):
+        """Удаление временных файлов, не перенесённых в хранилище (отказ CSRF, ошибка, лишние поля)"""
+        for file in self.temp_files:
+            file.close()
+            try:
+                os.remove(file.name)
+            except FileNotFoundError:
+                pass
+
+    def upload_interrupted(self):
+        file = getattr(self, 'file', None)
+        if file is not None and not file.closed:
+            file.close()
+            try:
+                os.remove(file.name)
+            except FileNotFoundError:
+                pass
+
+
+def store_upload(graduate, uploaded, doc_type=''):
+    """Документ из файла, принятого DocumentUploadHandler"""
+    uploaded.file.close()
+    return save_document(
+        graduate, os.path.basename(uploaded.name), uploaded.temporary_file_path(),
+        uploaded.sha256, uploaded.size, doc_type,
+    )
+
+
+# ========================
+# ЗАГРУЗКА ПО ЧАСТЯМ
+# ========================
+# init → части с явным смещением → finalize. Каждая часть пишется в тот же
+# временный файл на своё место, принятое смещение хранится в UploadSession,
+# поэтому после обрыва клиент узнаёт смещение и продолжает с него.
+
+class UploadError(Exception):
+    """Ошибка загрузки по частям; status — HTTP-код ответа, offset — принятое смещение"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def session_path(session):
+    return documents_root() / 'tmp' / f'resumable_{session.pk}'
+
+
+def upload_expiry():
+    """Загрузки, не обновлявшиеся с этого момента, истекли (DOCUMENTS_UPLOAD_TTL_HOURS)"""
+    return timezone.now() - timedelta(hours=settings.DOCUMENTS_UPLOAD_TTL_HOURS)
+
+
+def active_sessions(user):
+    """Незавершённые загрузки пользователя, ещё не истёкшие"""
+    return UploadSession.objects.filter(user=user, updated_at__gte=upload_expiry())
+
+
+def get_upload(user, session_id):
+    """Незавершённая загрузка пользователя; 404 — не найдена, 410 — истекла (ждёт cleanup_uploads)"""
+    session = UploadSession.objects.filter(pk=session_id, user=user).first()
+    if session is None:
+        raise UploadError('Загрузка не найдена', status=404)
+    if session.updated_at < upload_expiry():
+        raise UploadError('Срок загрузки истёк, начните её заново', status=410)
+    return session
+
+
+def start_upload(user, filename, size, sha256='', doc_type=''):
+    """Новая загрузка по частям (не больше DOCUMENTS_MAX_ACTIVE_UPLOADS одновременно у пользователя)"""
+    filename = os.path.basename(filename or '')
+    if os.path.splitext(filename)[1].lower() not in ALLOWED_EXTENSIONS:
+        raise UploadError(f"Допустимые типы файлов: {', '.join(ALLOWED_EXTENSIONS)}")
+    if not 0 < size <= settings.DOCUMENTS_MAX_SIZE:
+        raise UploadError(f"Размер файла — от 1 байта до {settings.DOCUMENTS_MAX_SIZE // (1024 * 1024)} МБ")
+    if sha256 and not re.fullmatch(r'[0-9a-f]{64}', sha256):
+        raise UploadError('sha256 — 64 шестнадцатеричных символа')
+    with transaction.atomic():
+        # Блокировка строки выпускника: параллельные init не превысят лимит.
+        # Без профиля файл некуда сохранить — отказ до первой части, а не на finalize
+        if not Graduate.objects.select_for_update().filter(user=user).exists():
+            raise UploadError('Профиль выпускника не найден', status=404)
+        if active_sessions(user).count() >= settings.DOCUMENTS_MAX_ACTIVE_UPLOADS:
+            raise UploadError('Слишком много незавершённых загрузок', status=429)
+        session = UploadSession.objects.create(
+            user=user, filename=filename, size=size, sha256=sha256,
+            doc_type=doc_type if doc_type in dict(Document.DOC_TYPES) else '',
+        )
+    path = session_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return session
+
+
+def _claim(user, session_id, offset=None):
+    """
+    Захват загрузки на время записи части одним условным UPDATE (без долгой транзакции).
+    Захват истекает через DOCUMENTS_UPLOAD_LEASE_SECONDS, если воркер упал посреди части.
+    """
+    now = timezone.now()
+    claimable = active_sessions(user).filter(pk=session_id) \
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+    if offset is not None:
+        claimable = claimable.filter(received=offset)
+    if claimable.update(locked_until=now + timedelta(seconds=settings.DOCUMENTS_UPLOAD_LEASE_SECONDS)):
+        return UploadSession.objects.get(pk=session_id)
+
+    session = get_upload(user, session_id)
+    if offset is not None and session.received != offset:
+        raise UploadError('Смещение не совпадает с принятым', status=409, offset=session.received)
+    raise UploadError('Загрузка занята другим запросом', status=409, offset=session.received)
+
+
+def _release(session, received):
+    UploadSession.objects.filter(pk=session.pk).update(
+        received=received, locked_until=None, updated_at=timezone.now()
+    )
+
+
+def write_chunk(user, session_id, offset, stream, length, checksum=''):
+    """
+    Запись части длиной length с позиции offset прямо во временный файл.
+    checksum — SHA-256 части: при несовпадении или обрыве часть отбрасывается.
+    Возвращает новое принятое смещение.
+    """
+    if not 0 < length <= settings.DOCUMENTS_UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadError(
+            f"Размер части — до {settings.DOCUMENTS_UPLOAD_MAX_CHUNK_SIZE // (1024 * 1024)} МБ", status=413
+        )
+    session = _claim(user, session_id, offset)
+    received = offset
+    try:
+        if offset + length > session.size:
+            raise UploadError('Часть выходит за объявленный размер файла', offset=offset)
+        digest = hashlib.sha256()
+        written = 0
+        with open(session_path(session), 'r+b') as f:
+            f.seek(offset)
+            while written < length:
+                block = stream.read(min(COPY_CHUNK_SIZE, length - written))
+                if not block:
+                    break
+                digest.update(block)
+                f.write(block)
+                written += len(block)
+            if written < length:
+                f.truncate(offset)
+                raise UploadError('Часть принята не полностью', offset=offset)
+            if checksum and digest.hexdigest() != checksum.lower():
+                f.truncate(offset)
+                raise UploadError('Контрольная сумма части не совпала', offset=offset)
+            # Хвост прерванной ранее записи за пределами части не нужен
+            f.truncate(offset + length)
+        received = offset + length
+        return received
+    finally:
+        _release(session, received)
+
+
+def file_sha256(path):
+    """SHA-256 файла блоками — файл не читается в память целиком"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finish_upload(user, session_id):
+    """Проверка и перенос собранного файла в хранилище: (документ, создан ли новый)"""
+    session = _claim(user, session_id)
+    try:
+        if session.received != session.size:
+            raise UploadError('Файл принят не полностью', status=409, offset=session.received)
+        path = session_path(session)
+        sha256 = file_sha256(path)
+        if session.sha256 and sha256 != session.sha256:
+            # Части сошлись, а файл нет — продолжать эту загрузку бессмысленно
+            session.delete()
+            raise UploadError('Контрольная сумма файла не совпала, начните загрузку заново', status=422)
+        graduate = Graduate.objects.filter(user=user).first()
+        if graduate is None:
+            raise UploadError('Профиль выпускника не найден', status=404)
+        with transaction.atomic():
+            document, created = save_document(graduate, session.filename, path, sha256, session.size, session.doc_type)
+            session.delete()
+        return document, created
+    finally:
+        # После delete() у сессии нет pk — освобождать нечего
+        if session.pk is not None:
+            _release(session, session.received)
+
+
+def cancel_upload(user, session_id):
+    """Отмена загрузки; временный файл удаляется обработчиком post_delete"""
+    if not UploadSession.objects.filter(pk=session_id, user=user).delete()[0]:
+        raise UploadError('Загрузка не найдена', status=404)
+
+
+def remove_session_file(session):
+    try:
+        os.remove(session_path(session))
+    except FileNotFoundError:
+        pass
+
+
+# ========================
+# ОТДАЧА
+# ========================
+
+def _byte_range(header, size):
+    """(start, end) из заголовка Range; None — отдать файл целиком; ValueError — диапазон вне файла"""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Несколько диапазонов и прочие формы не поддерживаются — RFC 9110 разрешает ответить 200
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def document_response(request, document):
+    """
+    Ответ со скачиваемым документом.
+
+    DOCUMENTS_SENDFILE = 'nginx' / 'apache' — файл отдаёт веб-сервер
+    (X-Accel-Redirect / X-Sendfile), он же обрабатывает Range. Иначе Django:
+    целиком — FileResponse (wsgi.file_wrapper → sendfile), часть — потоком кусками.
+    """
+    path = documents_root() / document.filepath
+    if not path.is_file():
+        raise Http404('Файл документа не найден')
+
+    etag = f'"{document.sha256}"' if document.sha256 else None
+    if etag and etag in request.headers.get('If-None-Match', ''):
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    content_type = document.content_type or 'application/octet-stream'
+    sendfile = getattr(settings, 'DOCUMENTS_SENDFILE', None)
+    if sendfile == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.DOCUMENTS_ACCEL_PREFIX + document.filepath
+    elif sendfile == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(path)
+    else:
+        size = path.stat().st_size
+        byte_range = None
+        range_header = request.headers.get('Range')
+        # If-Range: часть отдаётся, только если у клиента та же версия файла
+        if range_header and request.headers.get('If-Range', etag) == etag:
+            try:
+                byte_range = _byte_range(range_header, size)
+            except ValueError:
+                return HttpResponse(status=416, headers={'Content-Range': f'bytes */{size}'})
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(path, start, end - start + 1), status=206, content_type=content_type
+            )
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+
+    response['Content-Disposition'] = content_disposition_header(True, document.filename)
+    if etag:
+        response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+
+def schedule_blob_cleanup(document):
+    """После фиксации удаления документа — удалить файл, если он больше не нужен"""
+    transaction.on_commit(lambda: delete_unused_blob(document.filepath, document.sha256))
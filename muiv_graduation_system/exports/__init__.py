@@ -0,0 +1,47 @@
+from functools import cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# ========================
+# РЕЕСТР ФОРМАТОВ ЭКСПОРТА
+# ========================
+# Формат из URL (manager/export/<format>/) → класс движка. Модуль движка
+# вместе с python-docx / openpyxl импортируется при первом экспорте в этом
+# формате, а не при загрузке воркера. Новые форматы подключаются через
+# EXPORT_ENGINES в settings.
+
+DEFAULT_EXPORT_ENGINES = {
+    'docx': 'muiv_graduation_system.exports.docx_engine.DocxExporter',
+    'xlsx': 'muiv_graduation_system.exports.xlsx_engine.XlsxExporter',
+}
+
+
+class ExportEngine:
+    """Базовый движок экспорта"""
+    format = None
+
+    def search_report(self, graduates, filepath, query):
+        """Отчёт по результатам поиска выпускников"""
+        raise NotImplementedError
+
+    def personal_report(self, graduate, employment, filepath):
+        """Персональный отчёт выпускника"""
+        raise NotImplementedError
+
+
+def export_engines():
+    """Все зарегистрированные форматы: формат → путь к классу движка"""
+    return {**DEFAULT_EXPORT_ENGINES, **getattr(settings, 'EXPORT_ENGINES', {})}
+
+
+def get_export_engine(format):
+    """Движок для формата или None, если формат не зарегистрирован"""
+    path = export_engines().get(format)
+    return _load_engine(path) if path else None
+
+
+@cache
+def _load_engine(path):
+    return import_string(path)()
@@ -0,0 +1,267 @@
+from datetime import datetime
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt, RGBColor
+
+from . import ExportEngine
+
+
+class DocxExporter(ExportEngine):
+    """Отчёты Word (python-docx)"""
+    format = 'docx'
+
+    def search_report(self, graduates, filepath, query):
+        """Экспорт в DOCX с красивым форматированием"""
+        doc = Document()
+
+        # Заголовок
+        title = doc.add_heading('Отчёт по выпускникам', 0)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Информация о поиске
+        if query:
+            search_info = doc.add_paragraph()
+            search_info.add_run('🔍 Поисковый запрос: ').bold = True
+            search_info.add_run(f'"{query}"')
+            search_info.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Метаданные
+        meta = doc.add_paragraph()
+        meta.add_run(f'📅 Дата формирования: {datetime.now().strftime("%d.%m.%Y %H:%M")}\n')
+        meta.add_run(f'👥 Найдено выпускников: {graduates.count()}')
+        meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        doc.add_paragraph('')  # Пустая строка
+
+        # Статистика
+        doc.add_heading('📊 Статистика', level=1)
+
+        employed_count = sum(1 for g in graduates if hasattr(g, 'employment') and g.employment and g.employment.status)
+        unemployed_count = graduates.count() - employed_count
+
+        stats_table = doc.add_table(rows=3, cols=2)
+        stats_table.style = 'Light List Accent 1'
+
+        stats_data = [
+            ('Всего выпускников', str(graduates.count())),
+            ('С указанным трудоустройством', str(employed_count)),
+            ('Без информации о трудоустройстве', str(unemployed_count)),
+        ]
+
+        for i, (label, value) in enumerate(stats_data):
+            row = stats_table.rows[i]
+            row.cells[0].text = label
+            row.cells[1].text = value
+            row.cells[0].paragraphs[0].runs[0].bold = True
+
+        doc.add_paragraph('')
+
+        # Таблица выпускников
+        doc.add_heading('📋 Список выпускников', level=1)
+
+        # Заголовки таблицы
+        table = doc.add_table(rows=1, cols=10)
+        table.style = 'Light Grid Accent 1'
+
+        headers = ['№', 'ФИО', 'Год', 'Факультет', 'Специальность', 'Email', 'Телефон', 'Статус', 'Работодатель',
+                   'Должность']
+        hdr_cells = table.rows[0].cells
+
+        for i, header in enumerate(headers):
+            hdr_cells[i].text = header
+            hdr_cells[i].paragraphs[0].runs[0].bold = True
+            hdr_cells[i].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Данные
+        for idx, g in enumerate(graduates, 1):
+            emp = getattr(g, 'employment', None)
+
+            row_cells = table.add_row().cells
+            row_cells[0].text = str(idx)
+            row_cells[1].text = g.full_name or '—'
+            row_cells[2].text = str(g.graduation_year) if g.graduation_year else '—'
+            row_cells[3].text = g.faculty.name if g.faculty else '—'
+            row_cells[4].text = g.specialization.name if g.specialization else '—'
+            row_cells[5].text = g.email or '—'
+            row_cells[6].text = g.phone or '—'
+
+            # Статус с цветом
+            if emp and emp.status:
+                status_para = row_cells[7].paragraphs[0]
+                status_run = status_para.add_run(emp.status.name)
+                if emp.status.name.lower() == 'трудоустроен':
+                    status_run.font.color.rgb = RGBColor(34, 139, 34)
+                elif emp.status.name.lower() == 'в поиске':
+                    status_run.font.color.rgb = RGBColor(255, 165, 0)
+                status_run.bold = True
+            else:
+                row_cells[7].text = 'Не указан'
+
+            row_cells[8].text = emp.employer.name if emp and emp.employer else '—'
+            row_cells[9].text = emp.job_title if emp and emp.job_title else '—'
+
+            # Центрирование номера
+            row_cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Футер
+        doc.add_paragraph('')
+        doc.add_paragraph('_' * 100)
+        footer = doc.add_paragraph(
+            'Документ сформирован автоматически системой учёта трудоустройства выпускников МУ им. С.Ю. Витте'
+        )
+        footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        footer.runs[0].font.size = Pt(8)
+        footer.runs[0].italic = True
+
+        doc.save(filepath)
+
+    def personal_report(self, graduate, employment, filepath):
+        """Персональный отчёт выпускника"""
+        doc = Document()
+
+        # Заголовок документа
+        title = doc.add_heading('Персональный отчёт о трудоустройстве', 0)
+        title.alignment = 1  # Центрирование
+
+        # Информация о выпускнике
+        doc.add_paragraph(f'Выпускник: {graduate.full_name}', style='Heading 2')
+        doc.add_paragraph(f'Дата формирования: {datetime.now().strftime("%d.%m.%Y %H:%M")}')
+        doc.add_paragraph('')  # Пустая строка
+
+        # ========================
+        # ЛИЧНЫЕ ДАННЫЕ
+        # ========================
+        doc.add_heading('📋 Личные данные', level=1)
+
+        # Таблица с личными данными
+        personal_table = doc.add_table(rows=6, cols=2)
+        personal_table.style = 'Light Grid Accent 1'
+
+        personal_data = [
+            ('ФИО', graduate.full_name),
+            ('Год выпуска', str(graduate.graduation_year)),
+            ('Факультет', graduate.faculty.name if graduate.faculty else 'Не указан'),
+            ('Специальность', graduate.specialization.name if graduate.specialization else 'Не указана'),
+            ('Email', graduate.email),
+            ('Телефон', graduate.phone or 'Не указан'),
+        ]
+
+        for i, (label, value) in enumerate(personal_data):
+            row = personal_table.rows[i]
+            row.cells[0].text = label
+            row.cells[1].text = value
+            # Жирный шрифт для лейблов
+            row.cells[0].paragraphs[0].runs[0].bold = True
+
+        doc.add_paragraph('')  # Пустая строка
+
+        # ========================
+        # ТРУДОУСТРОЙСТВО
+        # ========================
+        doc.add_heading('💼 Информация о трудоустройстве', level=1)
+
+        if employment:
+            # Статус трудоустройства
+            status_para = doc.add_paragraph()
+            status_para.add_run('Статус: ').bold = True
+
+            if employment.status:
+                status_run = status_para.add_run(employment.status.name)
+                status_run.font.size = 12
+                # Цвет в зависимости от статуса
+                if employment.status.name.lower() == 'трудоустроен':
+                    status_run.font.color.rgb = RGBColor(34, 139, 34)  # Зелёный
+                elif employment.status.name.lower() == 'в поиске':
+                    status_run.font.color.rgb = RGBColor(255, 165, 0)  # Оранжевый
+                else:
+                    status_run.font.color.rgb = RGBColor(220, 20, 60)  # Красный
+            else:
+                status_para.add_run('Не указан')
+
+            doc.add_paragraph('')
+
+            # Таблица с данными о работе
+            employment_table = doc.add_table(rows=5, cols=2)
+            employment_table.style = 'Light Grid Accent 1'
+
+            employment_data = [
+                ('Работодатель', employment.employer.name if employment.employer else 'Не указан'),
+                ('Должность', employment.job_title or 'Не указана'),
+                ('Зарплата', f'{employment.salary:,} ₽/мес.' if employment.salary else 'Не указана'),
+                ('Дата начала работы',
+                 employment.start_date.strftime('%d.%m.%Y') if employment.start_date else 'Не указана'),
+                ('Стаж работы',
+                 self._calculate_work_experience(employment.start_date) if employment.start_date else '—'),
+            ]
+
+            for i, (label, value) in enumerate(employment_data):
+                row = employment_table.rows[i]
+                row.cells[0].text = label
+                row.cells[1].text = str(value)
+                row.cells[0].paragraphs[0].runs[0].bold = True
+        else:
+            # Если трудоустройство не указано
+            no_employment = doc.add_paragraph()
+            no_employment.add_run('ℹ️ Информация о трудоустройстве отсутствует').italic = True
+            no_employment.alignment = 1  # Центрирование
+
+            doc.add_paragraph('')
+            doc.add_paragraph('Рекомендации:')
+            recommendations = [
+                'Обновите информацию о трудоустройстве в личном кабинете',
+                'Обратитесь в отдел по трудоустройству для консультации',
+                'Воспользуйтесь карьерными услугами университета'
+            ]
+            for rec in recommendations:
+                doc.add_paragraph(f'  • {rec}', style='List Bullet')
+
+        # ========================
+        # ФУТЕР
+        # ========================
+        doc.add_paragraph('')
+        doc.add_paragraph('_' * 60)
+        footer = doc.add_paragraph(
+            f'Документ сформирован автоматически системой учёта трудоустройства выпускников МУ им. С.Ю. Витте'
+        )
+        footer.alignment = 1
+        footer.runs[0].font.size = 8
+        footer.runs[0].italic = True
+
+        # Сохранение файла
+        doc.save(filepath)
+
+    def _calculate_work_experience(self, start_date):
+        """Вычисление стажа работы"""
+        if not start_date:
+            return '—'
+
+        from datetime import date
+        today = date.today()
+        delta = today - start_date
+
+        years = delta.days // 365
+        months = (delta.days % 365) // 30
+        days = (delta.days % 365) % 30
+
+        parts = []
+        if years > 0:
+            parts.append(f'{years} {self._pluralize(years, "год", "года", "лет")}')
+        if months > 0:
+            parts.append(f'{months} {self._pluralize(months, "месяц", "месяца", "месяцев")}')
+        if not parts and days > 0:
+            parts.append(f'{days} {self._pluralize(days, "день", "дня", "дней")}')
+
+        return ' '.join(parts) if parts else 'Менее месяца'
+
+    def _pluralize(self, n, form1, form2, form5):
+        """Склонение слов по числам"""
+        n = abs(n) % 100
+        if n >= 5 and n <= 20:
+            return form5
+        n = n % 10
+        if n == 1:
+            return form1
+        if n >= 2 and n <= 4:
+            return form2
+        return form5
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+
+from . import ExportEngine
+
+
+class XlsxExporter(ExportEngine):
+    """Отчёты Excel (openpyxl)"""
+    format = 'xlsx'
+
+    def search_report(self, graduates, filepath, query):
+        """Экспорт в XLSX с форматированием"""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Выпускники"
+
+        # Заголовок
+        ws.merge_cells('A1:J1')
+        title_cell = ws['A1']
+        title_cell.value = 'ОТЧЁТ ПО ВЫПУСКНИКАМ'
+        title_cell.font = Font(size=16, bold=True, color='FFFFFF')
+        title_cell.fill = PatternFill(start_color='940101', end_color='940101', fill_type='solid')
+        title_cell.alignment = Alignment(horizontal='center', vertical='center')
+        ws.row_dimensions[1].height = 30
+
+        # Метаданные
+        ws.merge_cells('A2:J2')
+        meta_cell = ws['A2']
+        meta_text = f'Дата формирования: {datetime.now().strftime("%d.%m.%Y %H:%M")}'
+        if query:
+            meta_text += f' | Поисковый запрос: "{query}"'
+        meta_text += f' | Найдено: {graduates.count()}'
+        meta_cell.value = meta_text
+        meta_cell.alignment = Alignment(horizontal='center')
+        meta_cell.font = Font(italic=True)
+
+        # Пустая строка
+        ws.row_dimensions[3].height = 5
+
+        # Заголовки таблицы
+        headers = ['№', 'ФИО', 'Год выпуска', 'Факультет', 'Специальность', 'Email', 'Телефон', 'Статус',
+                   'Работодатель', 'Должность']
+        header_fill = PatternFill(start_color='D3D3D3', end_color='D3D3D3', fill_type='solid')
+        header_font = Font(bold=True, size=11)
+
+        for col_num, header in enumerate(headers, 1):
+            cell = ws.cell(row=4, column=col_num, value=header)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            cell.border = Border(
+                left=Side(style='thin'),
+                right=Side(style='thin'),
+                top=Side(style='thin'),
+                bottom=Side(style='thin')
+            )
+
+        ws.row_dimensions[4].height = 30
+
+        # Данные
+        for idx, g in enumerate(graduates, 1):
+            emp = getattr(g, 'employment', None)
+            row_num = idx + 4
+
+            data = [
+                idx,
+                g.full_name or '—',
+                g.graduation_year if g.graduation_year else '—',
+                g.faculty.name if g.faculty else '—',
+                g.specialization.name if g.specialization else '—',
+                g.email or '—',
+                g.phone or '—',
+                emp.status.name if emp and emp.status else 'Не указан',
+                emp.employer.name if emp and emp.employer else '—',
+                emp.job_title if emp and emp.job_title else '—'
+            ]
+
+            for col_num, value in enumerate(data, 1):
+                cell = ws.cell(row=row_num, column=col_num, value=value)
+                cell.alignment = Alignment(horizontal='left' if col_num > 1 else 'center', vertical='center',
+                                           wrap_text=True)
+                cell.border = Border(
+                    left=Side(style='thin'),
+                    right=Side(style='thin'),
+                    top=Side(style='thin'),
+                    bottom=Side(style='thin')
+                )
+
+                # Цвет для статуса
+                if col_num == 8 and emp and emp.status:
+                    if emp.status.name.lower() == 'трудоустроен':
+                        cell.font = Font(color='228B22', bold=True)
+                    elif emp.status.name.lower() == 'в поиске':
+                        cell.font = Font(color='FFA500', bold=True)
+                    else:
+                        cell.font = Font(color='DC143C', bold=True)
+
+        # Автоподбор ширины колонок (исправленная версия)
+        column_widths = [5, 30, 12, 25, 25, 25, 15, 15, 30, 25]
+        for i, width in enumerate(column_widths, 1):
+            column_letter = get_column_letter(i)
+            ws.column_dimensions[column_letter].width = width
+
+        # Замораживание заголовков
+        ws.freeze_panes = 'A5'
+
+        wb.save(filepath)
@@ -0,0 +1,41 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+
+# ========================
+# ХЕШИРОВАНИЕ ПАРОЛЕЙ ВНЕ EVENT LOOP
+# ========================
+# PBKDF2 занимает сотни миллисекунд CPU. hashlib отпускает GIL на время
+# вычисления, поэтому ограниченный пул потоков даёт настоящий параллелизм
+# и не блокирует event loop ASGI-воркера.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    """Общий пул потоков для хеширования (размер — PASSWORD_HASHING_WORKERS)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or os.cpu_count() or 1
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+    return _executor
+
+
+async def amake_password(raw_password):
+    """make_password в пуле хеширования"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hashing_executor(), make_password, raw_password)
+
+
+async def averify_password(raw_password, encoded):
+    """verify_password в пуле хеширования; возвращает (верен ли пароль, нужно ли перехешировать)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hashing_executor(), verify_password, raw_password, encoded)
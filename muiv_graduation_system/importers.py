@@ -0,0 +1,347 @@
+import csv
+import io
+import os
+import re
+import time
+from collections import namedtuple
+from datetime import date, datetime
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.db import IntegrityError, transaction
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .caching import bump_graduate_list
+from .models import (
+    User, Role, Graduate, Employer, Employment, EmploymentStatus, Faculty, Specialization, ChangeEvent
+)
+from .outbox import record_changes
+
+
+# ========================
+# ИМПОРТ ВЫПУСКНИКОВ (XLSX / CSV)
+# ========================
+
+IMPORT_BATCH_SIZE = 1000
+
+# Заголовки колонок → поля. Поддерживаются и русские заголовки из
+# экспорта (ExportSearchResultsView), и короткие английские имена.
+COLUMN_ALIASES = {
+    'фио': 'full_name',
+    'full_name': 'full_name',
+    'год выпуска': 'graduation_year',
+    'год': 'graduation_year',
+    'graduation_year': 'graduation_year',
+    'email': 'email',
+    'электронная почта': 'email',
+    'логин': 'username',
+    'username': 'username',
+    'факультет': 'faculty',
+    'faculty': 'faculty',
+    'специальность': 'specialization',
+    'специализация': 'specialization',
+    'specialization': 'specialization',
+    'телефон': 'phone',
+    'phone': 'phone',
+    'статус': 'employment_status',
+    'employment_status': 'employment_status',
+    'работодатель': 'employer',
+    'employer': 'employer',
+    'должность': 'job_title',
+    'job_title': 'job_title',
+    'зарплата': 'salary',
+    'salary': 'salary',
+    'дата начала работы': 'start_date',
+    'start_date': 'start_date',
+}
+
+REQUIRED_COLUMNS = ('full_name', 'graduation_year', 'email')
+
+EMPTY_VALUES = ('', '—', '-', 'Не указан', 'Не указана')
+
+EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
+
+ImportResult = namedtuple('ImportResult', ['created', 'errors', 'activations', 'elapsed'])
+
+
+class ImportFormatError(ValueError):
+    """Файл не удалось разобрать (формат или заголовки)"""
+
+
+def _normalize_header(value):
+    return str(value).strip().lower() if value is not None else ''
+
+
+def _map_header(row):
+    """Сопоставление заголовков колонок с полями; None — если это не строка заголовков"""
+    mapping = {}
+    for index, cell in enumerate(row):
+        field = COLUMN_ALIASES.get(_normalize_header(cell))
+        if field and field not in mapping.values():
+            mapping[index] = field
+    if all(field in mapping.values() for field in REQUIRED_COLUMNS):
+        return mapping
+    return None
+
+
+def _iter_mapped(rows):
+    """Поиск строки заголовков и выдача (номер строки, словарь значений)"""
+    mapping = None
+    for row_number, row in enumerate(rows, 1):
+        if mapping is None:
+            mapping = _map_header(row)
+            continue
+        if not any(cell not in (None, '') for cell in row):
+            continue
+        yield row_number, {
+            field: row[index] if index < len(row) else None
+            for index, field in mapping.items()
+        }
+    if mapping is None:
+        raise ImportFormatError(
+            "Не найдена строка заголовков (нужны колонки: ФИО, Год выпуска, Email)"
+        )
+
+
+def _iter_xlsx(fileobj):
+    """Потоковое чтение XLSX в режиме read_only"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _iter_csv(fileobj):
+    """Потоковое чтение CSV (UTF-8, разделитель ; или ,)"""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(text, dialect)
+    finally:
+        text.detach()
+
+
+def iter_import_rows(fileobj, filename):
+    """Строки файла импорта в виде (номер строки, словарь значений)"""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.xlsx':
+        rows = _iter_xlsx(fileobj)
+    elif ext == '.csv':
+        rows = _iter_csv(fileobj)
+    else:
+        raise ImportFormatError("Поддерживаются только файлы .xlsx и .csv")
+    return _iter_mapped(rows)
+
+
+def _clean_str(value):
+    if value is None:
+        return ''
+    value = str(value).strip()
+    return '' if value in EMPTY_VALUES else value
+
+
+def _clean_row(data):
+    """Валидация строки; возвращает (очищенные данные, текст ошибки)"""
+    row = {field: _clean_str(data.get(field)) for field in COLUMN_ALIASES.values()}
+
+    if not row['full_name']:
+        return None, "Не указано ФИО"
+
+    year = row['graduation_year']
+    if year.endswith('.0'):
+        year = year[:-2]
+    if not year.isdigit():
+        return None, "Год выпуска должен быть числом"
+    row['graduation_year'] = int(year)
+    if row['graduation_year'] < 2000 or row['graduation_year'] > 2030:
+        return None, "Год должен быть между 2000 и 2030"
+
+    if not EMAIL_RE.match(row['email']):
+        return None, "Некорректный email"
+    row['email'] = row['email'].lower()
+    row['username'] = row['username'] or row['email']
+
+    salary = row['salary'].replace(' ', '').replace('\xa0', '')
+    if salary.endswith('.0'):
+        salary = salary[:-2]
+    if salary and not salary.isdigit():
+        return None, "Зарплата должна быть числом"
+    row['salary'] = int(salary) if salary else None
+
+    start_date = data.get('start_date')
+    if isinstance(start_date, datetime):
+        row['start_date'] = start_date.date()
+    elif isinstance(start_date, date):
+        row['start_date'] = start_date
+    elif row['start_date']:
+        for fmt in ('%Y-%m-%d', '%d.%m.%Y'):
+            try:
+                row['start_date'] = datetime.strptime(row['start_date'], fmt).date()
+                break
+            except ValueError:
+                continue
+        else:
+            return None, "Некорректная дата начала работы (ожидается ДД.ММ.ГГГГ)"
+    else:
+        row['start_date'] = None
+
+    return row, None
+
+
+class GraduateImporter:
+    """
+    Пакетный импорт выпускников.
+
+    Строки читаются потоково, валидируются и сохраняются пачками по batch_size:
+    каждая пачка — одна транзакция с bulk_create для User/Graduate/Employment
+    и недостающих Employer. Пароли не хешируются: пользователи получают
+    непригодный пароль и ссылку активации (токен сброса пароля).
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, with_activations=False):
+        self.batch_size = batch_size
+        self.with_activations = with_activations
+        self.role = None
+        self.statuses = {}
+        self.seen_usernames = set()
+        self.seen_emails = set()
+
+    def run(self, fileobj, filename):
+        started = time.monotonic()
+        self.role, _ = Role.objects.get_or_create(name='graduate')
+        self.statuses = {s.name.lower(): s for s in EmploymentStatus.objects.all()}
+
+        created = 0
+        errors = []
+        activations = []
+        batch = []
+        for row_number, data in iter_import_rows(fileobj, filename):
+            row, error = _clean_row(data)
+            if error:
+                errors.append((row_number, error))
+                continue
+            batch.append((row_number, row))
+            if len(batch) >= self.batch_size:
+                created += self._flush(batch, errors, activations)
+                batch = []
+        if batch:
+            created += self._flush(batch, errors, activations)
+        if created:
+            transaction.on_commit(bump_graduate_list)
+
+        return ImportResult(created, errors, activations, time.monotonic() - started)
+
+    def _flush(self, batch, errors, activations):
+        """Сохранение одной пачки строк в транзакции"""
+        usernames = [row['username'] for _, row in batch]
+        emails = [row['email'] for _, row in batch]
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+        rows = []
+        for row_number, row in batch:
+            if row['username'] in taken_usernames or row['username'] in self.seen_usernames:
+                errors.append((row_number, f"Логин {row['username']} уже занят"))
+            elif row['email'] in taken_emails or row['email'] in self.seen_emails:
+                errors.append((row_number, f"Email {row['email']} уже используется"))
+            elif row['employment_status'] and row['employment_status'].lower() not in self.statuses:
+                errors.append((row_number, f"Неизвестный статус трудоустройства: {row['employment_status']}"))
+            else:
+                self.seen_usernames.add(row['username'])
+                self.seen_emails.add(row['email'])
+                rows.append((row_number, row))
+
+        if not rows:
+            return 0
+
+        try:
+            users = self._save([row for _, row in rows])
+        except IntegrityError:
+            # Логин или email заняли параллельно после проверки — пачка откатилась,
+            # сохраняем её построчно, чтобы ошибка досталась только своей строке
+            users = []
+            for row_number, row in rows:
+                try:
+                    users.extend(self._save([row]))
+                except IntegrityError:
+                    errors.append((row_number, f"Логин {row['username']} или email {row['email']} уже заняты"))
+
+        if self.with_activations:
+            activations.extend(
+                (user.username, user.email, urlsafe_base64_encode(force_bytes(user.pk)),
+                 default_token_generator.make_token(user))
+                for user in users
+            )
+        return len(users)
+
+    def _save(self, rows):
+        """Пользователи, выпускники и трудоустройства строк одной транзакцией"""
+        with transaction.atomic():
+            employers = self._resolve_employers({row['employer'] for row in rows if row['employer']})
+            faculties = Faculty.objects.ids_for_names({row['faculty'] for row in rows})
+            specializations = Specialization.objects.ids_for_names({row['specialization'] for row in rows})
+
+            # make_password(None) — непригодный пароль без PBKDF2
+            users = User.objects.bulk_create([
+                User(
+                    username=row['username'],
+                    email=row['email'],
+                    password=make_password(None),
+                    role=self.role,
+                ) for row in rows
+            ], batch_size=self.batch_size)
+
+            graduates = Graduate.objects.bulk_create([
+                Graduate(
+                    user=user,
+                    full_name=row['full_name'],
+                    graduation_year=row['graduation_year'],
+                    faculty_id=faculties.get(row['faculty']),
+                    specialization_id=specializations.get(row['specialization']),
+                    phone=row['phone'],
+                    email=row['email'],
+                ) for user, row in zip(users, rows)
+            ], batch_size=self.batch_size)
+
+            employments = Employment.objects.bulk_create([
+                Employment(
+                    graduate=graduate,
+                    status=self.statuses.get(row['employment_status'].lower()),
+                    employer_id=employers.get(row['employer']),
+                    job_title=row['job_title'] or None,
+                    salary=row['salary'],
+                    start_date=row['start_date'],
+                ) for graduate, row in zip(graduates, rows)
+                if row['employment_status'] or row['employer'] or row['job_title']
+            ], batch_size=self.batch_size)
+
+            # bulk_create не отправляет сигналов — события журнала изменений пишем сами
+            record_changes(graduates, ChangeEvent.CREATED)
+            record_changes(employments, ChangeEvent.CREATED)
+        return users
+
+    def _resolve_employers(self, names):
+        """id работодателей по названию; недостающие создаются одним INSERT … ON CONFLICT"""
+        if not names:
+            return {}
+        return Employer.objects.ids_for_names(names)
+
+
+def write_activation_csv(activations, out, base_url=''):
+    """Запись ссылок активации импортированных пользователей в CSV"""
+    from django.urls import reverse
+
+    writer = csv.writer(out, delimiter=';')
+    writer.writerow(['Логин', 'Email', 'Ссылка активации'])
+    for username, email, uidb64, token in activations:
+        path = reverse('muiv_graduation_system:activate_account', kwargs={'uidb64': uidb64, 'token': token})
+        writer.writerow([username, email, f"{base_url.rstrip('/')}{path}"])
@@ -0,0 +1,142 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+logger = logging.getLogger('muiv_graduation_system.timing')
+
+
+# ========================
+# ЗАМЕРЫ ВРЕМЕНИ ЗАПРОСА
+# ========================
+# ServerTimingMiddleware кладёт RequestTimings в request_timings на время
+# запроса; SQL считается через execute_wrapper, шаблоны — TimedDjangoTemplates,
+# отчёты — record_timing('report') в представлениях экспорта.
+#
+# execute_wrapper ставится на каждое соединение при его открытии
+# (count_queries, сигнал connection_created), а не на время запроса: под ASGI
+# запросы к БД идут из потоков sync_to_async со своими соединениями, туда
+# попадает только копия контекста с request_timings.
+
+request_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Замеры одного запроса: число и время SQL-запросов, время шаблонов и отчётов"""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.durations = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper для соединений с БД"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def server_timing(self, total):
+        """Значение заголовка Server-Timing (длительности в миллисекундах)"""
+        metrics = [f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"']
+        metrics += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.durations.items()]
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def log(self, request, response, total):
+        """Структурированная строка лога (JSON) по запросу"""
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_time * 1000, 1),
+        }
+        record.update({f'{name}_ms': round(seconds * 1000, 1) for name, seconds in self.durations.items()})
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def count_query(execute, sql, params, many, context):
+    """Постоянный execute_wrapper соединений: вне замера — прямой вызов"""
+    timings = request_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Обработчик connection_created (подключается в apps.py)"""
+    if count_query not in connection.execute_wrappers:
+        # В начало списка: временные обёртки снимаются pop() с конца
+        connection.execute_wrappers.insert(0, count_query)
+
+
+@contextmanager
+def measure_request():
+    """
+    Замеры текущего запроса (синхронного или асинхронного).
+
+    Вложенный вызов (ServerTimingMiddleware внутри MetricsMiddleware)
+    возвращает уже активные замеры.
+    """
+    timings = request_timings.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        request_timings.reset(token)
+
+
+@contextmanager
+def record_timing(name):
+    """Замер участка кода для Server-Timing текущего запроса (вне замера — без затрат)"""
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with record_timing('template'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Бэкенд шаблонов Django с замером времени рендера.
+
+    Замеряется только шаблон верхнего уровня: include и extends
+    рендерятся внутри него и отдельно не учитываются.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,213 @@
+import io
+import json
+import math
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from django.contrib import admin
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from muiv_graduation_system.exports import get_export_engine
+from muiv_graduation_system.models import Graduate, User
+from muiv_graduation_system.views import ManagerGraduatesView, _search_graduates
+
+
+# Поисковые запросы: по ФИО (частый), по работодателю, по факультету (широкий)
+SEARCH_QUERIES = {
+    'name': 'Иванов',
+    'employer': 'Технологии',
+    'faculty': 'экономики',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Микробенчмарки горячих путей (поиск, список выпускников, экспорт, списки админки) '
+        'на тестовой БД с 1k/10k/100k выпускников; результат — JSON, сравнение с базовым прогоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Размеры набора данных (число выпускников)')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов каждого замера (берётся медиана)')
+        parser.add_argument('--export-query', default=SEARCH_QUERIES['name'],
+                            help='Поисковый запрос, результаты которого выгружаются в DOCX/XLSX')
+        parser.add_argument('--output', default='benchmark_results.json', help='Файл с результатами прогона')
+        parser.add_argument('--baseline', help='Базовый прогон (JSON) для сравнения')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Записать результаты в --baseline вместо сравнения')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Допустимое замедление относительно базового прогона (0.2 = 20%%)')
+        parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                            help='Замедления меньше этого числа миллисекунд считаются шумом')
+
+    def handle(self, *args, **options):
+        if options['update_baseline'] and not options['baseline']:
+            raise CommandError('--update-baseline требует --baseline')
+        sizes = sorted(set(options['sizes']))
+
+        # Отдельная тестовая БД: рабочие данные не затрагиваются
+        # Отчёты пишутся в BASE_DIR/static/reports — подменяем на временный каталог
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        work_dir = tempfile.mkdtemp(prefix='bench_')
+        try:
+            with override_settings(
+                BASE_DIR=work_dir,
+                ALLOWED_HOSTS=['testserver'],
+                DEBUG=False,
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                REPLICA_READ_VIEWS=(),
+                SERVER_TIMING_SAMPLE_RATE=0,
+            ):
+                results = {}
+                for size in sizes:
+                    self._seed(size)
+                    self.stdout.write(f'Набор данных: {size} выпускников')
+                    results[str(size)] = self._run_cases(options, work_dir)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        run = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'vendor': connection.vendor,
+            'repeat': options['repeat'],
+            'export_query': options['export_query'],
+            'results': results,
+        }
+        self._write(options['output'], run)
+        self.stdout.write(f'Результаты записаны в {options["output"]}')
+
+        if options['update_baseline']:
+            self._write(options['baseline'], run)
+            self.stdout.write(self.style.SUCCESS(f'Базовый прогон обновлён: {options["baseline"]}'))
+        elif options['baseline']:
+            self._compare(run, options)
+
+    # ========================
+    # ДАННЫЕ
+    # ========================
+
+    def _seed(self, size):
+        """Догенерация выпускников до size (размеры идут по возрастанию)"""
+        missing = size - Graduate.objects.count()
+        if missing <= 0:
+            return
+        call_command(
+            'generate_load_data', graduates=missing, prefix=f'bench{size}', seed=size,
+            stdout=io.StringIO(),
+        )
+
+    # ========================
+    # ЗАМЕРЫ
+    # ========================
+
+    def _run_cases(self, options, work_dir):
+        repeat = options['repeat']
+        manager = Client()
+        manager.force_login(User.objects.get(username='manager'))
+        superuser = Client()
+        superuser.force_login(User.objects.filter(is_superuser=True).order_by('id').first())
+        graduate = Client()
+        graduate.force_login(Graduate.objects.order_by('id').first().user)
+
+        pages = math.ceil(Graduate.objects.count() / ManagerGraduatesView.paginate_by)
+        graduates_url = reverse('muiv_graduation_system:manager_graduates')
+        search_url = reverse('muiv_graduation_system:search_graduates')
+
+        cases = {
+            'manager_graduates[page=1]': lambda: manager.get(graduates_url),
+            f'manager_graduates[page={pages}]': lambda: manager.get(graduates_url, {'page': pages}),
+            'export_my_data_docx': lambda: graduate.get(reverse('muiv_graduation_system:export_my_data_docx')),
+        }
+        for label, query in SEARCH_QUERIES.items():
+            cases[f'search_graduates[{label}]'] = lambda query=query: manager.get(search_url, {'query': query})
+
+        for fmt in ('docx', 'xlsx'):
+            cases[f'_export_{fmt}'] = lambda fmt=fmt: get_export_engine(fmt).search_report(
+                _search_graduates(
+                    Graduate.objects.select_related(
+                        'faculty', 'specialization', 'employment__employer', 'employment__status'
+                    ),
+                    options['export_query'],
+                ),
+                os.path.join(work_dir, f'report.{fmt}'),
+                options['export_query'],
+            )
+
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            cases[f'admin:{opts.app_label}_{opts.model_name}_changelist'] = lambda url=url: superuser.get(url)
+
+        return {name: self._measure(name, case, repeat) for name, case in cases.items()}
+
+    def _measure(self, name, case, repeat):
+        self._call(name, case)  # прогрев: шаблоны, кеш карточек
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                self._call(name, case)
+                timings.append(time.perf_counter() - started)
+        result = {
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'min_ms': round(min(timings) * 1000, 2),
+            'max_ms': round(max(timings) * 1000, 2),
+            'queries': len(queries),
+        }
+        self.stdout.write(f'  {name}: {result["median_ms"]:.1f} мс, запросов: {result["queries"]}')
+        return result
+
+    def _call(self, name, case):
+        response = case()
+        if response is None:
+            return
+        if response.status_code != 200:
+            raise CommandError(f'{name}: HTTP {response.status_code}')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        response.close()
+
+    # ========================
+    # СРАВНЕНИЕ С БАЗОВЫМ ПРОГОНОМ
+    # ========================
+
+    def _compare(self, run, options):
+        try:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f'Базовый прогон не найден: {options["baseline"]} (создайте его с --update-baseline)')
+
+        regressions = []
+        for size, cases in run['results'].items():
+            for name, result in cases.items():
+                base = baseline['results'].get(size, {}).get(name)
+                if base is None:
+                    continue
+                delta = result['median_ms'] - base['median_ms']
+                if delta > options['min_delta_ms'] and result['median_ms'] > base['median_ms'] * (1 + options['tolerance']):
+                    regressions.append(
+                        f'{size} / {name}: {base["median_ms"]:.1f} → {result["median_ms"]:.1f} мс'
+                    )
+                if result['queries'] > base['queries']:
+                    regressions.append(f'{size} / {name}: запросов {base["queries"]} → {result["queries"]}')
+
+        if regressions:
+            raise CommandError('Замедление относительно базового прогона:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Замедлений относительно базового прогона нет'))
+
+    def _write(self, path, run):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,106 @@
+import asyncio
+import statistics
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from muiv_graduation_system import async_views, views
+from muiv_graduation_system.models import User
+
+
+BENCH_LOGIN_URL = '/bench/login/'
+
+
+def _bench_urlconf(login_view):
+    """URLconf с заданной версией LoginView (остальные маршруты — как в приложении)"""
+    urlconf = types.ModuleType(f'bench_urls_{login_view.__name__}')
+    urlconf.urlpatterns = [
+        path(BENCH_LOGIN_URL.strip('/') + '/', login_view.as_view()),
+        path('', include('muiv_graduation_system.urls', namespace='muiv_graduation_system')),
+    ]
+    return urlconf
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение пропускной способности входа: синхронный LoginView через WSGI-обработчик '
+        'и AsyncLoginView через ASGI-обработчик. Нужны пользователи из generate_load_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='load', help='Префикс логинов (как в generate_load_data)')
+        parser.add_argument('--password', default='load12345', help='Пароль сгенерированных пользователей')
+        parser.add_argument('--requests', type=int, default=200, help='Количество входов в каждом прогоне')
+        parser.add_argument('--concurrency', type=int, default=16, help='Одновременных запросов')
+        parser.add_argument('--mode', choices=['both', 'sync', 'async'], default='both')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        usernames = list(
+            User.objects.filter(username__startswith=f"{options['prefix']}_")
+            .order_by('id').values_list('username', flat=True)[:total]
+        )
+        if not usernames:
+            raise CommandError('Нет пользователей для входа — сначала выполните generate_load_data')
+        usernames = [usernames[i % len(usernames)] for i in range(total)]
+
+        bench_settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            DEBUG=False,
+        )
+        with bench_settings:
+            if options['mode'] in ('both', 'sync'):
+                with override_settings(ROOT_URLCONF=_bench_urlconf(views.LoginView)):
+                    latencies, elapsed = self._run_sync(usernames, options['password'], options['concurrency'])
+                self._report('WSGI (sync LoginView)', latencies, elapsed)
+
+            if options['mode'] in ('both', 'async'):
+                with override_settings(ROOT_URLCONF=_bench_urlconf(async_views.AsyncLoginView)):
+                    latencies, elapsed = asyncio.run(
+                        self._run_async(usernames, options['password'], options['concurrency'])
+                    )
+                self._report('ASGI (AsyncLoginView)', latencies, elapsed)
+
+    def _run_sync(self, usernames, password, concurrency):
+        def login(username):
+            started = time.perf_counter()
+            response = Client().post(BENCH_LOGIN_URL, {'username': username, 'password': password})
+            self._check(response)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(login, usernames))
+        return latencies, time.perf_counter() - started
+
+    async def _run_async(self, usernames, password, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login(username):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await AsyncClient().post(BENCH_LOGIN_URL, {'username': username, 'password': password})
+                self._check(response)
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(login(username) for username in usernames))
+        return latencies, time.perf_counter() - started
+
+    def _check(self, response):
+        if response.status_code != 302:
+            raise CommandError(f'Вход не выполнен (HTTP {response.status_code}) — проверьте --password')
+
+    def _report(self, label, latencies, elapsed):
+        latencies = sorted(latencies)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        self.stdout.write(
+            f'{label}: {len(latencies) / elapsed:.1f} входов/с, '
+            f'p50 {statistics.median(latencies) * 1000:.0f} мс, p95 {p95 * 1000:.0f} мс'
+        )
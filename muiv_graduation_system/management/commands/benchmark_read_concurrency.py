@@ -0,0 +1,164 @@
+import asyncio
+import statistics
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from muiv_graduation_system import async_views, views
+from muiv_graduation_system.models import User, Graduate
+
+
+BENCH_SEARCH_URL = '/bench/search/'
+
+
+def _bench_urlconf(search_view):
+    """URLconf с заданной версией SearchGraduatesView (остальные маршруты — как в приложении)"""
+    urlconf = types.ModuleType(f'bench_urls_{search_view.__name__}')
+    urlconf.urlpatterns = [
+        path(BENCH_SEARCH_URL.strip('/') + '/', search_view.as_view()),
+        path('', include('muiv_graduation_system.urls', namespace='muiv_graduation_system')),
+    ]
+    return urlconf
+
+
+class Command(BaseCommand):
+    help = (
+        'Сколько одновременных поисковых запросов выдерживает один воркер: синхронный '
+        'SearchGraduatesView в sync-воркере gunicorn (--sync-threads потоков) и '
+        'AsyncSearchGraduatesView в одном ASGI-воркере. Нужны данные из generate_load_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Менеджер, от имени которого идут запросы (по умолчанию — первый)')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64],
+                            help='Уровни одновременных запросов')
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на каждом уровне')
+        parser.add_argument('--sync-threads', type=int, default=1,
+                            help='Потоков sync-воркера (gunicorn --threads; 1 — класс sync)')
+        parser.add_argument('--latency-budget', type=float, default=500,
+                            help='Допустимый p95, мс: по нему считается итоговая ёмкость воркера')
+        parser.add_argument('--mode', choices=['both', 'sync', 'async'], default='both')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(role__name='manager').order_by('id')
+        if options['username']:
+            users = users.filter(username=options['username'])
+        user = users.first()
+        if user is None:
+            raise CommandError('Нет пользователя с ролью manager')
+
+        queries = self._queries(options['requests'])
+        if not queries:
+            raise CommandError('Нет выпускников для поиска — сначала выполните generate_load_data')
+
+        bench_settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            DEBUG=False,
+            SERVER_TIMING_SAMPLE_RATE=0,
+        )
+        capacity = {}
+        with bench_settings:
+            # Одна сессия на все запросы; первый запрос кеширует роль в сессии
+            client = Client()
+            client.force_login(user)
+            cookies = client.cookies
+
+            if options['mode'] in ('both', 'sync'):
+                label = f"WSGI (sync SearchGraduatesView, {options['sync_threads']} поток.)"
+                with override_settings(ROOT_URLCONF=_bench_urlconf(views.SearchGraduatesView)):
+                    capacity[label] = self._sweep(
+                        label, options, lambda c: self._run_sync(cookies, queries, c, options['sync_threads'])
+                    )
+
+            if options['mode'] in ('both', 'async'):
+                label = 'ASGI (AsyncSearchGraduatesView)'
+                with override_settings(ROOT_URLCONF=_bench_urlconf(async_views.AsyncSearchGraduatesView)):
+                    capacity[label] = self._sweep(
+                        label, options, lambda c: asyncio.run(self._run_async(cookies, queries, c))
+                    )
+
+        self.stdout.write('')
+        for label, level in capacity.items():
+            self.stdout.write(
+                f"{label}: {level or 'менее ' + str(min(options['concurrency']))} одновременных запросов "
+                f"при p95 ≤ {options['latency_budget']:.0f} мс"
+            )
+
+    def _queries(self, count):
+        """Поисковые строки: фамилии и факультеты из данных, плюс пустой запрос"""
+        rows = Graduate.objects.order_by('id').values_list('full_name', 'faculty__name')[:50]
+        terms = {''}
+        for full_name, faculty in rows:
+            terms.add(full_name.split()[0] if full_name else '')
+            terms.add(faculty or '')
+        terms = sorted(terms)
+        return [terms[i % len(terms)] for i in range(count)] if len(terms) > 1 else []
+
+    def _sweep(self, label, options, run):
+        """Прогон по уровням конкурентности; возвращает наибольший уровень в пределах p95"""
+        self.stdout.write(label)
+        capacity = None
+        for concurrency in options['concurrency']:
+            latencies, elapsed = run(concurrency)
+            p95 = self._report(concurrency, latencies, elapsed)
+            if p95 * 1000 <= options['latency_budget']:
+                capacity = concurrency
+        return capacity
+
+    def _run_sync(self, cookies, queries, concurrency, worker_threads):
+        # Клиенты шлют запросы параллельно, но sync-воркер обрабатывает
+        # не больше worker_threads одновременно — остальные ждут в очереди (FIFO)
+        def handle(query):
+            client = Client()
+            client.cookies = cookies
+            response = client.get(BENCH_SEARCH_URL, {'query': query})
+            self._check(response)
+
+        def search(query):
+            started = time.perf_counter()
+            worker.submit(handle, query).result()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=worker_threads) as worker, \
+                ThreadPoolExecutor(max_workers=concurrency) as clients:
+            latencies = list(clients.map(search, queries))
+        return latencies, time.perf_counter() - started
+
+    async def _run_async(self, cookies, queries, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def search(query):
+            async with semaphore:
+                client = AsyncClient()
+                client.cookies = cookies
+                started = time.perf_counter()
+                # Как в ASGIHandler: у каждого запроса свой поток для sync-кода
+                async with ThreadSensitiveContext():
+                    response = await client.get(BENCH_SEARCH_URL, {'query': query})
+                self._check(response)
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(search(query) for query in queries))
+        return latencies, time.perf_counter() - started
+
+    def _check(self, response):
+        if response.status_code != 200:
+            raise CommandError(f'Поиск не выполнен (HTTP {response.status_code}) — проверьте --username')
+
+    def _report(self, concurrency, latencies, elapsed):
+        latencies = sorted(latencies)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        self.stdout.write(
+            f'  {concurrency:>4} одновременно: {len(latencies) / elapsed:.1f} запросов/с, '
+            f'p50 {statistics.median(latencies) * 1000:.0f} мс, p95 {p95 * 1000:.0f} мс'
+        )
+        return p95
@@ -0,0 +1,82 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Что делает воркер до первого запроса: WSGI-приложение и URLconf со всеми
+# представлениями. После — модули, которые стоит загружать только по требованию.
+WORKER_BOOT = '''
+import resource, sys
+from django.core.wsgi import get_wsgi_application
+from django.conf import settings
+from importlib import import_module
+application = get_wsgi_application()
+import_module(settings.ROOT_URLCONF)
+print('LAZY', ','.join(name for name in {lazy!r} if name in sys.modules), file=sys.stderr)
+print('MAXRSS', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)
+'''
+
+LAZY_MODULES = ('docx', 'openpyxl', 'lxml', 'PIL')
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Время и память загрузки воркера (python -X importtime): WSGI-приложение и URLconf '
+        'в отдельном процессе; показывает самые тяжёлые импорты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Число запусков (берётся медиана)')
+        parser.add_argument('--top', type=int, default=15, help='Сколько самых тяжёлых импортов показать')
+
+    def handle(self, *args, **options):
+        runs = [self._boot() for _ in range(options['runs'])]
+        runs.sort(key=lambda run: run['total_us'])
+        median = runs[len(runs) // 2]
+
+        self.stdout.write(f'Импорт при загрузке воркера: {median["total_us"] / 1000:.0f} мс '
+                          f'(медиана из {len(runs)}), модулей: {median["modules"]}')
+        self.stdout.write(f'Пиковая память процесса: {median["maxrss_kb"] / 1024:.1f} МБ')
+        self.stdout.write(
+            f'Загружены при старте: {", ".join(median["lazy"]) or "—"} '
+            f'(из проверяемых {", ".join(LAZY_MODULES)})'
+        )
+        self.stdout.write('Самые тяжёлые импорты верхнего уровня (накопительно):')
+        for name, cumulative in median['top'][:options['top']]:
+            self.stdout.write(f'  {cumulative / 1000:8.1f} мс  {name}')
+
+    def _boot(self):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', WORKER_BOOT.format(lazy=LAZY_MODULES)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Воркер не загрузился:\n{result.stderr[-2000:]}')
+
+        total = 0
+        modules = 0
+        top = []
+        lazy = []
+        maxrss = 0
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_RE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                total += int(self_us)
+                modules += 1
+                # Отступ 1 пробел — импорт верхнего уровня
+                if len(indent) == 1:
+                    top.append((name, int(cumulative_us)))
+            elif line.startswith('LAZY '):
+                lazy = [name for name in line[5:].split(',') if name]
+            elif line.startswith('MAXRSS '):
+                maxrss = int(line.split()[1])
+        top.sort(key=lambda item: item[1], reverse=True)
+        return {'total_us': total, 'modules': modules, 'top': top, 'lazy': lazy, 'maxrss_kb': maxrss}
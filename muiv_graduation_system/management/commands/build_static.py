@@ -0,0 +1,51 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from muiv_graduation_system import storage
+from muiv_graduation_system.storage import CompressedManifestStaticFilesStorage
+
+
+class Command(BaseCommand):
+    help = 'Сборка статики в STATIC_ROOT: хеши в именах файлов и сжатые копии .gz/.br'
+
+    def handle(self, *args, **options):
+        if not isinstance(staticfiles_storage, CompressedManifestStaticFilesStorage):
+            raise CommandError(
+                'Хранилище статики не CompressedManifestStaticFilesStorage — '
+                'сборка выполняется с DEBUG = False'
+            )
+
+        # Отчёты пишутся в static/reports и в сборку не входят
+        call_command(
+            'collectstatic',
+            interactive=False,
+            ignore_patterns=['reports'],
+            verbosity=options['verbosity'],
+        )
+
+        totals = {'': 0, '.gz': 0, '.br': 0}
+        for hashed_name in set(staticfiles_storage.hashed_files.values()):
+            path = staticfiles_storage.path(hashed_name)
+            if not os.path.exists(path + '.gz'):
+                continue
+            for suffix in totals:
+                if os.path.exists(path + suffix):
+                    totals[suffix] += os.path.getsize(path + suffix)
+
+        self.stdout.write(self.style.SUCCESS(f'Статика собрана в {settings.STATIC_ROOT}'))
+        if storage.brotli is None:
+            self.stdout.write(
+                f"Сжимаемые файлы: {totals[''] / 1024:.0f} КБ, gzip: {totals['.gz'] / 1024:.0f} КБ"
+            )
+            self.stdout.write(self.style.WARNING(
+                'Пакет brotli не установлен — файлы .br не созданы (pip install -r requirement.txt)'
+            ))
+        else:
+            self.stdout.write(
+                f"Сжимаемые файлы: {totals[''] / 1024:.0f} КБ, gzip: {totals['.gz'] / 1024:.0f} КБ, "
+                f"brotli: {totals['.br'] / 1024:.0f} КБ"
+            )
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from muiv_graduation_system.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаление незавершённых загрузок по частям, в которые ничего не писали '
+        'дольше DOCUMENTS_UPLOAD_TTL_HOURS, вместе с их временными файлами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help='Срок жизни загрузки (по умолчанию DOCUMENTS_UPLOAD_TTL_HOURS)')
+
+    def handle(self, *args, **options):
+        hours = options['hours'] or settings.DOCUMENTS_UPLOAD_TTL_HOURS
+        expired = UploadSession.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=hours))
+        # post_delete для каждой загрузки удаляет её временный файл
+        deleted = expired.delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Удалено незавершённых загрузок: {deleted}'))
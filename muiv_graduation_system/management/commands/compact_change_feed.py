@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from muiv_graduation_system.outbox import compact
+
+
+class Command(BaseCommand):
+    help = (
+        'Очистка журнала изменений: удаляются события, полученные всеми потребителями '
+        'CHANGE_FEED_CONSUMERS, и события старше срока хранения'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int,
+                            help='Срок хранения в днях (по умолчанию CHANGE_FEED_RETENTION_DAYS, 0 — без срока)')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Событий в одном DELETE')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        deleted = compact(retention_days=options['retention_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Удалено событий: {deleted}'))
@@ -0,0 +1,278 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from muiv_graduation_system.caching import bump_graduate_list
+from muiv_graduation_system.models import (
+    User, Role, Graduate, Employer, Employment, EmploymentStatus, Faculty, Feedback, Specialization, ChangeEvent
+)
+from muiv_graduation_system.outbox import record_changes
+
+
+# ========================
+# СПРАВОЧНИКИ ДЛЯ ГЕНЕРАЦИИ
+# ========================
+
+SURNAMES = [
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов',
+    'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семёнов', 'Егоров',
+    'Павлов', 'Козлов', 'Степанов', 'Николаев', 'Орлов', 'Андреев', 'Макаров', 'Никитин',
+    'Захаров', 'Зайцев', 'Соловьёв', 'Борисов', 'Яковлев', 'Григорьев', 'Романов', 'Воробьёв',
+    'Сергеев', 'Кузьмин', 'Фролов', 'Александров', 'Дмитриев', 'Королёв', 'Гусев', 'Киселёв',
+    'Ильин', 'Максимов', 'Поляков', 'Сорокин', 'Виноградов', 'Ковалёв', 'Белов', 'Медведев',
+    'Антонов', 'Тарасов', 'Жуков', 'Баранов', 'Филиппов', 'Комаров', 'Давыдов', 'Беляев',
+]
+
+MALE_NAMES = [
+    'Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей', 'Артём', 'Илья',
+    'Кирилл', 'Михаил', 'Никита', 'Матвей', 'Роман', 'Егор', 'Арсений', 'Иван',
+    'Денис', 'Евгений', 'Даниил', 'Тимофей', 'Владислав', 'Игорь', 'Владимир', 'Павел',
+]
+
+FEMALE_NAMES = [
+    'Анастасия', 'Мария', 'Анна', 'Виктория', 'Екатерина', 'Наталья', 'Марина', 'Полина',
+    'Дарья', 'Алина', 'Ирина', 'Елена', 'Юлия', 'Ольга', 'Татьяна', 'Ксения',
+    'Софья', 'Валерия', 'Александра', 'Елизавета', 'Вероника', 'Светлана', 'Кристина', 'Алёна',
+]
+
+PATRONYMIC_ROOTS = [
+    'Александров', 'Дмитриев', 'Сергеев', 'Андреев', 'Алексеев', 'Михайлов', 'Иванов',
+    'Владимиров', 'Николаев', 'Петров', 'Викторов', 'Олегов', 'Игорев', 'Павлов', 'Юрьев',
+]
+
+# Факультет → (специальности, множитель зарплаты)
+FACULTIES = {
+    'Факультет информационных технологий': (
+        ['Бизнес-информатика', 'Прикладная информатика', 'Информационные системы и технологии'], 1.35),
+    'Факультет экономики и финансов': (
+        ['Экономика', 'Финансы и кредит', 'Бухгалтерский учёт, анализ и аудит'], 1.1),
+    'Факультет управления': (
+        ['Менеджмент', 'Государственное и муниципальное управление', 'Управление персоналом'], 1.0),
+    'Юридический факультет': (
+        ['Юриспруденция', 'Гражданское право', 'Уголовное право'], 1.05),
+    'Факультет торговли и сервиса': (
+        ['Торговое дело', 'Гостиничное дело', 'Туризм'], 0.85),
+    'Факультет психологии и педагогики': (
+        ['Психология', 'Педагогическое образование'], 0.8),
+}
+
+JOB_TITLES = [
+    'Младший специалист', 'Специалист', 'Ведущий специалист', 'Аналитик', 'Бухгалтер',
+    'Юрист', 'Менеджер проектов', 'Разработчик', 'Тестировщик', 'Экономист',
+    'Менеджер по продажам', 'HR-специалист', 'Администратор', 'Консультант', 'Маркетолог',
+]
+
+COMPANY_FORMS = ['ООО', 'АО', 'ПАО', 'ИП']
+
+COMPANY_WORDS = [
+    'Альфа', 'Вектор', 'Гранит', 'Дельта', 'Импульс', 'Квант', 'Меридиан', 'Норд', 'Орион',
+    'Прогресс', 'Ресурс', 'Сигма', 'Спектр', 'Стандарт', 'Технологии', 'Техносервис',
+    'Феникс', 'Форвард', 'Эталон', 'Юнит', 'Консалт', 'Инвест', 'Логистик', 'Строй',
+]
+
+FEEDBACK_SUBJECTS = [
+    'Вопрос по трудоустройству', 'Ошибка в профиле', 'Предложение', 'Смена работодателя',
+    'Не могу войти', 'Благодарность', 'Вопрос по отчёту', 'Без темы',
+]
+
+FEEDBACK_MESSAGES = [
+    'Подскажите, как обновить информацию о месте работы?',
+    'В моём профиле указан неверный год выпуска, исправьте, пожалуйста.',
+    'Было бы удобно выгружать отчёт в PDF.',
+    'Сменил работу, не получается указать нового работодателя.',
+    'Спасибо за удобный сервис!',
+    'Не приходит письмо для восстановления пароля.',
+]
+
+STATUS_WEIGHTS = {
+    'трудоустроен': 0.68,
+    'в поиске': 0.2,
+    'не трудоустроен': 0.12,
+}
+
+# Дата, от которой считаются стаж и даты начала работы: фиксированная,
+# чтобы одно и то же зерно давало одинаковые данные в любой день
+DEFAULT_AS_OF = date(2025, 12, 31)
+
+
+class Command(BaseCommand):
+    help = 'Генерация синтетических данных (пользователи, выпускники, трудоустройство, обратная связь) для нагрузочного тестирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--graduates', type=int, default=10000, help='Количество выпускников')
+        parser.add_argument('--employers', type=int, default=2000, help='Количество синтетических работодателей')
+        parser.add_argument('--feedback', type=int, default=None,
+                            help='Количество сообщений обратной связи (по умолчанию 10%% от выпускников)')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора — одинаковое зерно даёт одинаковые данные')
+        parser.add_argument('--as-of', type=date.fromisoformat, default=DEFAULT_AS_OF,
+                            help=f'Дата «сегодня» для стажа и дат начала работы, ГГГГ-ММ-ДД (по умолчанию {DEFAULT_AS_OF})')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Размер пачки bulk_create')
+        parser.add_argument('--prefix', default='load', help='Префикс логинов и email сгенерированных пользователей')
+        parser.add_argument('--password', default='load12345',
+                            help='Общий пароль всех сгенерированных пользователей (хешируется один раз)')
+        parser.add_argument('--delete', action='store_true',
+                            help='Удалить ранее сгенерированные данные с этим префиксом и выйти')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        user_prefix = f'{prefix}_'
+
+        if options['delete']:
+            deleted, _ = User.objects.filter(username__startswith=user_prefix).delete()
+            self.stdout.write(self.style.SUCCESS(f'Удалено записей: {deleted}'))
+            return
+
+        if User.objects.filter(username__startswith=user_prefix).exists():
+            raise CommandError(
+                f'Данные с префиксом "{prefix}" уже есть. Используйте --prefix или --delete.'
+            )
+
+        total = options['graduates']
+        batch_size = options['batch_size']
+        feedback_total = options['feedback'] if options['feedback'] is not None else total // 10
+        rng = random.Random(options['seed'])
+        as_of = options['as_of']
+
+        role, _ = Role.objects.get_or_create(name='graduate')
+        statuses = {s.name: s.id for s in EmploymentStatus.objects.filter(name__in=STATUS_WEIGHTS)}
+        status_names = [name for name in STATUS_WEIGHTS if name in statuses]
+        status_weights = [STATUS_WEIGHTS[name] for name in status_names]
+        employer_ids = self._employer_ids(rng, options['employers'])
+        faculties = list(FACULTIES.items())
+        faculty_ids = Faculty.objects.ids_for_names(FACULTIES)
+        specialization_ids = Specialization.objects.ids_for_names(
+            {name for specializations, _ in FACULTIES.values() for name in specializations}
+        )
+
+        # Один PBKDF2 на всех пользователей
+        password_hash = make_password(options['password'])
+
+        started = time.monotonic()
+        user_ids = []
+        for start in range(0, total, batch_size):
+            size = min(batch_size, total - start)
+            with transaction.atomic():
+                rows = [self._graduate_row(rng, start + i, user_prefix, faculties) for i in range(size)]
+
+                users = User.objects.bulk_create([
+                    User(
+                        username=row['username'],
+                        email=row['email'],
+                        password=password_hash,
+                        first_name=row['first_name'],
+                        last_name=row['last_name'],
+                        role=role,
+                    ) for row in rows
+                ], batch_size=batch_size)
+                user_ids.extend(user.id for user in users)
+
+                graduates = Graduate.objects.bulk_create([
+                    Graduate(
+                        user=user,
+                        full_name=row['full_name'],
+                        graduation_year=row['graduation_year'],
+                        faculty_id=faculty_ids[row['faculty']],
+                        specialization_id=specialization_ids[row['specialization']],
+                        phone=row['phone'],
+                        email=row['email'],
+                    ) for user, row in zip(users, rows)
+                ], batch_size=batch_size)
+
+                employments = []
+                for graduate, row in zip(graduates, rows):
+                    # Примерно у каждого десятого данных о трудоустройстве нет
+                    if not status_names or rng.random() < 0.1:
+                        continue
+                    status_name = rng.choices(status_names, status_weights)[0]
+                    employments.append(
+                        self._employment(rng, graduate, row, status_name, statuses, employer_ids, as_of)
+                    )
+                Employment.objects.bulk_create(employments, batch_size=batch_size)
+                record_changes(graduates, ChangeEvent.CREATED)
+                record_changes(employments, ChangeEvent.CREATED)
+
+            done = start + size
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  выпускников: {done}/{total} ({done / elapsed:.0f} строк/с)')
+
+        feedback_count = self._generate_feedback(rng, user_ids, feedback_total, batch_size)
+        bump_graduate_list()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Сгенерировано выпускников: {total}, обратной связи: {feedback_count}, время: {elapsed:.1f} с'
+        ))
+
+    def _employer_ids(self, rng, count):
+        """id работодателей: существующие плюс синтетические с реалистичными названиями"""
+        names = set()
+        attempts = 0
+        while len(names) < count and attempts < count * 10:
+            attempts += 1
+            name = '-'.join(rng.sample(COMPANY_WORDS, rng.choice([1, 1, 2])))
+            if rng.random() < 0.3:
+                name = f'{name} {rng.randint(1, 99)}'
+            names.add(f'{rng.choice(COMPANY_FORMS)} «{name}»')
+        Employer.objects.ids_for_names(sorted(names))
+        return list(Employer.objects.order_by('id').values_list('id', flat=True))
+
+    def _graduate_row(self, rng, index, user_prefix, faculties):
+        surname = rng.choice(SURNAMES)
+        if rng.random() < 0.55:
+            first_name = rng.choice(FEMALE_NAMES)
+            last_name = surname + 'а' if not surname.endswith('ий') else surname[:-2] + 'ая'
+            patronymic = rng.choice(PATRONYMIC_ROOTS) + 'на'
+        else:
+            first_name = rng.choice(MALE_NAMES)
+            last_name = surname
+            patronymic = rng.choice(PATRONYMIC_ROOTS) + 'ич'
+
+        faculty, (specializations, salary_factor) = rng.choice(faculties)
+        username = f'{user_prefix}{index}'
+        return {
+            'username': username,
+            'email': f'{username}@example.ru',
+            'first_name': first_name,
+            'last_name': last_name,
+            'full_name': f'{last_name} {first_name} {patronymic}',
+            'graduation_year': rng.randint(2005, 2025),
+            'faculty': faculty,
+            'specialization': rng.choice(specializations),
+            'salary_factor': salary_factor,
+            'phone': f'+79{rng.randint(0, 999999999):09d}',
+        }
+
+    def _employment(self, rng, graduate, row, status_name, statuses, employer_ids, as_of):
+        employment = Employment(graduate=graduate, status_id=statuses[status_name])
+        if status_name != 'трудоустроен' or not employer_ids:
+            return employment
+
+        # Логнормальное распределение зарплат с поправкой на факультет и стаж
+        years = max(as_of.year - row['graduation_year'], 0)
+        salary = rng.lognormvariate(11.2, 0.35) * row['salary_factor'] * (1 + 0.04 * years)
+        graduation_date = date(row['graduation_year'], 7, 1)
+
+        employment.employer_id = rng.choice(employer_ids)
+        employment.job_title = rng.choice(JOB_TITLES)
+        employment.salary = int(round(salary, -3))
+        employment.start_date = min(graduation_date + timedelta(days=rng.randint(0, 365 * 3)), as_of)
+        return employment
+
+    def _generate_feedback(self, rng, user_ids, total, batch_size):
+        if not user_ids:
+            return 0
+        for start in range(0, total, batch_size):
+            size = min(batch_size, total - start)
+            Feedback.objects.bulk_create([
+                Feedback(
+                    user_id=rng.choice(user_ids),
+                    subject=rng.choice(FEEDBACK_SUBJECTS),
+                    message=rng.choice(FEEDBACK_MESSAGES),
+                    is_read=rng.random() < 0.6,
+                ) for _ in range(size)
+            ], batch_size=batch_size)
+        return total
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from muiv_graduation_system.models import Employer
+from muiv_graduation_system.services import find_duplicate_employers, merge_employers
+
+
+class Command(BaseCommand):
+    help = 'Поиск и слияние дублей работодателей с переносом трудоустройств'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--into', type=int, metavar='ID',
+                            help='id работодателя, в которого сливаются перечисленные ids')
+        parser.add_argument('ids', nargs='*', type=int,
+                            help='id работодателей-дублей (только вместе с --into)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать найденные дубли')
+
+    def handle(self, *args, **options):
+        if options['into']:
+            groups = [self._explicit_group(options['into'], options['ids'])]
+        elif options['ids']:
+            raise CommandError('Список ids указывается вместе с --into')
+        else:
+            groups = find_duplicate_employers()
+
+        if not groups:
+            self.stdout.write('Дубли работодателей не найдены')
+            return
+
+        moved = 0
+        for target, *duplicates in groups:
+            names = ', '.join(f'"{d.name}" (#{d.pk})' for d in duplicates)
+            self.stdout.write(f'"{target.name}" (#{target.pk}) ← {names}')
+            if not options['dry_run']:
+                moved += merge_employers(target, duplicates)
+
+        if options['dry_run']:
+            self.stdout.write(f'Найдено групп дублей: {len(groups)}')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Объединено групп: {len(groups)}, перенесено трудоустройств: {moved}'
+            ))
+
+    def _explicit_group(self, target_id, ids):
+        if not ids:
+            raise CommandError('Укажите id дублей после --into')
+        employers = Employer.objects.in_bulk([target_id, *ids])
+        missing = [pk for pk in [target_id, *ids] if pk not in employers]
+        if missing:
+            raise CommandError(f'Работодатели не найдены: {", ".join(map(str, missing))}')
+        return [employers[target_id], *(employers[pk] for pk in ids if pk != target_id)]
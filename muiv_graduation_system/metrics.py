@@ -0,0 +1,121 @@
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .instrumentation import record_timing
+
+
+# ========================
+# МЕТРИКИ PROMETHEUS
+# ========================
+# При нескольких воркерах gunicorn значения хранятся в файлах каталога
+# PROMETHEUS_MULTIPROC_DIR и суммируются при выдаче /metrics. Переменная
+# окружения задаётся до запуска сервера, а каталог очищает скрипт запуска
+# (приложение его не трогает): иначе к новым значениям прибавятся файлы
+# прошлого запуска.
+
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+REQUEST_LATENCY = Histogram(
+    'muiv_http_request_duration_seconds', 'Время обработки запроса',
+    ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RESPONSES = Counter(
+    'muiv_http_responses', 'Ответы по коду статуса',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Histogram(
+    'muiv_http_request_db_queries', 'SQL-запросов на один HTTP-запрос',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+REPORT_DURATION = Histogram(
+    'muiv_report_generation_seconds', 'Время формирования отчёта',
+    ['report', 'format'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+REPORT_SIZE = Histogram(
+    'muiv_report_size_bytes', 'Размер файла отчёта',
+    ['report', 'format'],
+    buckets=(10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 20_000_000, 100_000_000),
+)
+EXPORT_ROWS = Counter(
+    'muiv_export_rows', 'Строк выгружено в отчёты',
+    ['format'],
+)
+LOGINS = Counter('muiv_logins', 'Успешные входы')
+
+
+def view_label(request):
+    """Метка представления — имя маршрута из urls.py (без пути, чтобы не плодить ряды)"""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else 'unmatched'
+
+
+def observe_request(request, response, duration, db_queries):
+    view = view_label(request)
+    REQUEST_LATENCY.labels(view, request.method).observe(duration)
+    RESPONSES.labels(view, request.method, str(response.status_code)).inc()
+    DB_QUERIES.labels(view).observe(db_queries)
+
+
+@contextmanager
+def track_report(report, format):
+    """Замер формирования отчёта: Server-Timing запроса и гистограмма по формату"""
+    started = time.perf_counter()
+    with record_timing('report'):
+        yield
+    REPORT_DURATION.labels(report, format).observe(time.perf_counter() - started)
+
+
+def observe_report_file(report, format, filepath, rows=None):
+    REPORT_SIZE.labels(report, format).observe(os.path.getsize(filepath))
+    if rows is not None:
+        EXPORT_ROWS.labels(format).inc(rows)
+
+
+class ActiveLoginsCollector:
+    """
+    Активные входы — непросроченные сессии в БД.
+
+    Считается при выдаче /metrics одним COUNT по индексу expire_date;
+    для файлового хранилища сессий метрика не выдаётся.
+    """
+
+    def describe(self):
+        # Без describe() реестр вызвал бы collect() при регистрации — запрос к БД на импорте
+        return [GaugeMetricFamily('muiv_active_logins', 'Активные (непросроченные) сессии')]
+
+    def collect(self):
+        from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+
+        store = import_string(f'{settings.SESSION_ENGINE}.SessionStore')
+        if not issubclass(store, DatabaseSessionStore):
+            return
+        active = store.get_model_class().objects.filter(expire_date__gt=timezone.now()).count()
+        yield GaugeMetricFamily('muiv_active_logins', 'Активные (непросроченные) сессии', value=active)
+
+
+if not MULTIPROCESS:
+    REGISTRY.register(ActiveLoginsCollector())
+
+
+def render_metrics():
+    """Текст метрик в формате Prometheus и его Content-Type"""
+    if MULTIPROCESS:
+        # Собственный реестр: файлы всех воркеров суммирует MultiProcessCollector
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(ActiveLoginsCollector())
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
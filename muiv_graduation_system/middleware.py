@@ -0,0 +1,415 @@
+import hashlib
+import mimetypes
+import os
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from fnmatch import fnmatchcase
+from urllib.parse import urlparse
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse
+from django.utils._os import safe_join
+
+from .instrumentation import measure_request
+from .metrics import observe_request
+from .routers import REPLICA_ALIAS, request_db_state
+
+
+# ========================
+# ОБЩАЯ ОСНОВА
+# ========================
+
+class HybridMiddleware:
+    """
+    Middleware, работающее и под WSGI, и под ASGI без адаптации цепочки.
+
+    Как django.utils.deprecation.MiddlewareMixin: если следующий обработчик
+    асинхронный, экземпляр помечается корутинной функцией и __call__
+    возвращает корутину __acall__. Иначе Django обернул бы всю цепочку
+    ниже в sync_to_async и асинхронные представления выполнялись бы в потоке.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+# ========================
+# ОГРАНИЧЕНИЕ ЧАСТОТЫ ЗАПРОСОВ
+# ========================
+# Правила задаются в RATE_LIMITS по имени URL (или view_name с пространством
+# имён): {'login': {'ip': '30/m', 'username': '10/m'}}. Ключ 'ip' — адрес
+# клиента, любой другой — поле POST-формы. Проверка идёт в process_view,
+# до CSRF, сессии и самого представления, поэтому отклонённый запрос
+# не хеширует пароль и не обращается к БД.
+
+RATE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'20/m' → (20, 60): ёмкость корзины и период её полного пополнения в секундах"""
+    count, unit = rate.split('/')
+    return int(count), RATE_UNITS[unit.strip().lower()[0]]
+
+
+class TokenBuckets:
+    """
+    Корзины токенов в памяти процесса.
+
+    Ключи распределены по шардам, у каждого своя блокировка, поэтому
+    параллельные потоки почти не конкурируют. Лимит действует на воркер.
+    """
+    shards = 16
+    max_keys_per_shard = 10000
+
+    def __init__(self):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(self.shards)]
+
+    def consume(self, key, capacity, period):
+        """0 — токен выдан, иначе секунды до появления следующего токена"""
+        lock, buckets = self._shards[hash(key) % self.shards]
+        rate = capacity / period
+        now = time.monotonic()
+        with lock:
+            tokens, updated = buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            buckets[key] = (tokens - 1 if wait == 0 else tokens, now)
+            buckets.move_to_end(key)
+            while len(buckets) > self.max_keys_per_shard:
+                buckets.popitem(last=False)
+        return wait
+
+
+class CacheTokenBuckets:
+    """
+    Общие для всех воркеров счётчики в кеше (RATE_LIMIT_CACHE).
+
+    Без блокировок: каждое окно длиной period — отдельный ключ, токены
+    списываются атомарным incr (Redis, Memcached). Средний темп тот же,
+    что у корзины токенов, всплеск ограничен ёмкостью окна.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def consume(self, key, capacity, period):
+        now = time.time()
+        window = int(now // period)
+        cache_key = f"ratelimit:{hashlib.sha1(key.encode()).hexdigest()}:{window}"
+        self.cache.add(cache_key, 0, timeout=period + 1)
+        try:
+            used = self.cache.incr(cache_key)
+        except ValueError:
+            # Ключ истёк между add и incr
+            self.cache.set(cache_key, 1, timeout=period + 1)
+            used = 1
+        return 0 if used <= capacity else (window + 1) * period - now
+
+
+class RateLimitCounters:
+    """Счётчики пропущенных и отклонённых запросов по view_name (для мониторинга)"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, view_name, outcome):
+        with self._lock:
+            self._counts[(view_name, outcome)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        result = {}
+        for (view_name, outcome), value in counts.items():
+            result.setdefault(view_name, {'allowed': 0, 'limited': 0})[outcome] = value
+        return result
+
+
+rate_limit_counters = RateLimitCounters()
+
+
+def client_ip(request):
+    """IP клиента; за обратным прокси — первый адрес из RATE_LIMIT_IP_HEADER"""
+    header = getattr(settings, 'RATE_LIMIT_IP_HEADER', None)
+    if header and request.META.get(header):
+        return request.META[header].split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class RateLimitMiddleware(HybridMiddleware):
+    """Ограничение частоты POST-запросов к входу, регистрации и обратной связи (HTTP 429)"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.rules = {
+            name: [(field, *parse_rate(rate)) for field, rate in rules.items()]
+            for name, rules in getattr(settings, 'RATE_LIMITS', {}).items()
+        }
+        self.methods = getattr(settings, 'RATE_LIMIT_METHODS', ('POST',))
+        alias = getattr(settings, 'RATE_LIMIT_CACHE', None)
+        self.buckets = CacheTokenBuckets(caches[alias]) if alias else TokenBuckets()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.methods:
+            return None
+        match = request.resolver_match
+        rules = self.rules.get(match.view_name) or self.rules.get(match.url_name)
+        if not rules:
+            return None
+
+        retry_after = 0
+        for field, capacity, period in rules:
+            if field == 'ip':
+                value = client_ip(request)
+            else:
+                value = request.POST.get(field, '').strip().lower()
+            if value:
+                key = f"{match.view_name}:{field}:{value}"
+                retry_after = max(retry_after, self.buckets.consume(key, capacity, period))
+
+        if retry_after:
+            rate_limit_counters.add(match.view_name, 'limited')
+            response = HttpResponse(
+                "Слишком много запросов. Повторите попытку позже.",
+                status=429,
+                content_type='text/plain; charset=utf-8',
+            )
+            response['Retry-After'] = str(max(1, round(retry_after)))
+            return response
+
+        rate_limit_counters.add(match.view_name, 'allowed')
+        return None
+
+
+# ========================
+# ЧТЕНИЕ С РЕПЛИКИ
+# ========================
+
+REPLICA_PIN_COOKIE = 'db_primary_pin'
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    Направление чтения тяжёлых страниц (REPLICA_READ_VIEWS) на реплику.
+
+    Если в запросе была запись, браузер получает cookie на
+    REPLICA_STICKY_SECONDS секунд, и пока она жива, все чтения этого
+    пользователя идут в основную БД: он сразу видит свои изменения,
+    даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = REPLICA_ALIAS in settings.DATABASES
+        self.patterns = getattr(settings, 'REPLICA_READ_VIEWS', ())
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        state = {'read_alias': None, 'wrote': False}
+        token = request_db_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_db_state.reset(token)
+        return self._pin(state, response)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        # Контекст копируется в потоки sync_to_async, словарь состояния — общий
+        state = {'read_alias': None, 'wrote': False}
+        token = request_db_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_db_state.reset(token)
+        return self._pin(state, response)
+
+    def _pin(self, state, response):
+        if state['wrote']:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled or request.method not in ('GET', 'HEAD'):
+            return None
+        if REPLICA_PIN_COOKIE in request.COOKIES:
+            return None
+        view_name = request.resolver_match.view_name
+        if any(fnmatchcase(view_name, pattern) for pattern in self.patterns):
+            request_db_state.get()['read_alias'] = REPLICA_ALIAS
+        return None
+
+
+# ========================
+# РАЗДАЧА СОБРАННОЙ СТАТИКИ
+# ========================
+
+STATIC_IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+STATIC_DEFAULT_CACHE_CONTROL = 'public, max-age=300'
+
+# Порядок предпочтения кодировок и суффиксы сжатых копий (см. storage.py)
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class PrecompressedStaticMiddleware(HybridMiddleware):
+    """
+    Раздача STATIC_ROOT без отдельного веб-сервера (при DEBUG = False).
+
+    По Accept-Encoding выбирается заранее сжатая копия (.br, затем .gz).
+    Файлы с хешем содержимого в имени (есть в манифесте) кешируются
+    браузером навсегда, остальные — на несколько минут.
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.prefix = urlparse(settings.STATIC_URL).path
+        self.root = str(settings.STATIC_ROOT)
+        self.immutable = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self._is_static(request):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self._is_static(request):
+            # Проверка и открытие файла — блокирующие вызовы, в поток только для статики
+            response = await sync_to_async(self.serve)(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def _is_static(self, request):
+        return request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        accepted = {
+            token.split(';')[0].strip()
+            for token in request.headers.get('Accept-Encoding', '').split(',')
+        }
+        encoding = None
+        served_path = path
+        for candidate, suffix in STATIC_ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                encoding, served_path = candidate, path + suffix
+                break
+
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(open(served_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+        response['Cache-Control'] = (
+            STATIC_IMMUTABLE_CACHE_CONTROL if name in self.immutable else STATIC_DEFAULT_CACHE_CONTROL
+        )
+        return response
+
+
+# ========================
+# SERVER-TIMING
+# ========================
+
+class ServerTimingMiddleware(HybridMiddleware):
+    """
+    Заголовок Server-Timing и строка лога с замерами запроса.
+
+    Замеряется доля запросов SERVER_TIMING_SAMPLE_RATE (0 — выключено),
+    остальные проходят без обёрток и накладных расходов.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with measure_request() as timings:
+            response = self.get_response(request)
+        return self._report(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        with measure_request() as timings:
+            response = await self.get_response(request)
+        return self._report(request, response, timings, time.perf_counter() - started)
+
+    def _report(self, request, response, timings, total):
+        response['Server-Timing'] = timings.server_timing(total)
+        timings.log(request, response, total)
+        return response
+
+
+# ========================
+# МЕТРИКИ PROMETHEUS
+# ========================
+
+class MetricsMiddleware(HybridMiddleware):
+    """Гистограммы времени и числа SQL-запросов, счётчики статусов по имени маршрута"""
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with measure_request() as timings:
+            response = self.get_response(request)
+        observe_request(request, response, time.perf_counter() - started, timings.db_queries)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with measure_request() as timings:
+            response = await self.get_response(request)
+        observe_request(request, response, time.perf_counter() - started, timings.db_queries)
+        return response
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:15
+
+from django.db import migrations, models
+
+
+EMPLOYER_NAME_STRIP = str.maketrans('', '', '«»"\'„“”')
+
+MERGED_FIELDS = ('industry', 'contact_person', 'email', 'phone')
+
+
+def normalize(name):
+    name = (name or '').translate(EMPLOYER_NAME_STRIP).replace('ё', 'е').replace('Ё', 'Е')
+    return ' '.join(name.split()).casefold()
+
+
+def merge_duplicate_employers(apps, schema_editor):
+    """Заполнение normalized_name и слияние дублей (Employment переносятся на первую запись)"""
+    Employer = apps.get_model('muiv_graduation_system', 'Employer')
+    Employment = apps.get_model('muiv_graduation_system', 'Employment')
+
+    kept = {}
+    for employer in Employer.objects.order_by('id').iterator():
+        key = normalize(employer.name) or f'#{employer.id}'
+        target = kept.get(key)
+        if target is None:
+            employer.normalized_name = key
+            employer.save(update_fields=['normalized_name'])
+            kept[key] = employer
+            continue
+
+        changed = [field for field in MERGED_FIELDS
+                   if not getattr(target, field) and getattr(employer, field)]
+        for field in changed:
+            setattr(target, field, getattr(employer, field))
+        if changed:
+            target.save(update_fields=changed)
+
+        Employment.objects.filter(employer_id=employer.id).update(employer_id=target.id)
+        employer.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0004_alter_document_options_alter_employer_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employer',
+            name='normalized_name',
+            field=models.CharField(editable=False, max_length=150, null=True, verbose_name='Нормализованное название'),
+        ),
+        migrations.RunPython(merge_duplicate_employers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0005_employer_normalized_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employer',
+            name='normalized_name',
+            field=models.CharField(editable=False, max_length=150, unique=True, verbose_name='Нормализованное название'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:26
+
+import hashlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def digest(subject, message):
+    text = f"{' '.join(subject.split())}\n{' '.join(message.split())}".casefold()
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def detach_guest_feedback(apps, schema_editor):
+    """
+    Перенос сообщений временных пользователей guest_* в гостевые записи.
+
+    Email переносится в Feedback, повторы одного сообщения удаляются,
+    сами временные пользователи (общий пароль guest123) удаляются.
+    """
+    User = apps.get_model('muiv_graduation_system', 'User')
+    Feedback = apps.get_model('muiv_graduation_system', 'Feedback')
+
+    guests = User.objects.filter(username__startswith='guest_', graduate_profile__isnull=True)
+    seen = set()
+    detached = []
+    duplicate_ids = []
+    for feedback in Feedback.objects.filter(user__in=guests).select_related('user').order_by('id').iterator():
+        key = (feedback.user.email.lower(), digest(feedback.subject, feedback.message))
+        if key in seen:
+            duplicate_ids.append(feedback.id)
+            continue
+        seen.add(key)
+        feedback.email, feedback.digest, feedback.user = key[0], key[1], None
+        detached.append(feedback)
+
+    Feedback.objects.bulk_update(detached, ['email', 'digest', 'user'], batch_size=1000)
+    Feedback.objects.filter(id__in=duplicate_ids).delete()
+    guests.filter(feedbacks__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0006_alter_employer_normalized_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='digest',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Отпечаток сообщения'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='email',
+            field=models.EmailField(blank=True, max_length=254, verbose_name='Email гостя'),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='feedbacks', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.RunPython(detach_guest_feedback, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='feedback',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('email', 'digest'), name='feedback_guest_unique_message'),
+        ),
+    ]
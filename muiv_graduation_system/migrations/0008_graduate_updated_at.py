@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0007_feedback_guest_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='graduate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Дата обновления'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+EMPLOYER_NAME_STRIP = str.maketrans('', '', '«»"\'„“”')
+
+REFERENCE_FIELDS = (('faculty', 'Faculty'), ('specialization', 'Specialization'))
+
+
+def normalize(name):
+    name = (name or '').translate(EMPLOYER_NAME_STRIP).replace('ё', 'е').replace('Ё', 'Е')
+    return ' '.join(name.split()).casefold()
+
+
+def fill_references(apps, schema_editor):
+    """
+    Справочники из различных значений faculty/specialization.
+
+    Написания, совпадающие после нормализации, сводятся в одну запись
+    (название — самое частое написание); выпускники получают ссылку
+    одним UPDATE на каждое написание.
+    """
+    Graduate = apps.get_model('muiv_graduation_system', 'Graduate')
+    for field, model_name in REFERENCE_FIELDS:
+        Reference = apps.get_model('muiv_graduation_system', model_name)
+
+        spellings = {}
+        rows = Graduate.objects.exclude(**{field: ''}).order_by().values_list(field).annotate(total=Count('id'))
+        for value, total in rows:
+            key = normalize(value)
+            if key:
+                spellings.setdefault(key, []).append((total, value))
+
+        for key, variants in spellings.items():
+            name = ' '.join(max(variants)[1].split())
+            reference = Reference.objects.create(name=name, normalized_name=key)
+            Graduate.objects.filter(**{f'{field}__in': [value for _, value in variants]}) \
+                .update(**{f'{field}_ref': reference})
+
+
+def restore_text(apps, schema_editor):
+    """Обратно: название из справочника в текстовое поле"""
+    Graduate = apps.get_model('muiv_graduation_system', 'Graduate')
+    for field, model_name in REFERENCE_FIELDS:
+        Reference = apps.get_model('muiv_graduation_system', model_name)
+        for reference_id, name in Reference.objects.values_list('id', 'name'):
+            Graduate.objects.filter(**{f'{field}_ref_id': reference_id}).update(**{field: name})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0008_graduate_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Faculty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('normalized_name', models.CharField(editable=False, max_length=100, unique=True, verbose_name='Нормализованное название')),
+            ],
+            options={
+                'verbose_name': 'Факультет',
+                'verbose_name_plural': 'Факультеты',
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Specialization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('normalized_name', models.CharField(editable=False, max_length=100, unique=True, verbose_name='Нормализованное название')),
+            ],
+            options={
+                'verbose_name': 'Специальность',
+                'verbose_name_plural': 'Специальности',
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='graduate',
+            name='faculty_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='muiv_graduation_system.faculty'),
+        ),
+        migrations.AddField(
+            model_name='graduate',
+            name='specialization_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='muiv_graduation_system.specialization'),
+        ),
+        migrations.RunPython(fill_references, restore_text),
+        migrations.RemoveField(
+            model_name='graduate',
+            name='faculty',
+        ),
+        migrations.RemoveField(
+            model_name='graduate',
+            name='specialization',
+        ),
+        migrations.RenameField(
+            model_name='graduate',
+            old_name='faculty_ref',
+            new_name='faculty',
+        ),
+        migrations.RenameField(
+            model_name='graduate',
+            old_name='specialization_ref',
+            new_name='specialization',
+        ),
+        migrations.AlterField(
+            model_name='graduate',
+            name='faculty',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='graduates', to='muiv_graduation_system.faculty', verbose_name='Факультет'),
+        ),
+        migrations.AlterField(
+            model_name='graduate',
+            name='specialization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='graduates', to='muiv_graduation_system.specialization', verbose_name='Специализация'),
+        ),
+    ]
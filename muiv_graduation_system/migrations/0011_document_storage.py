@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0010_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=100, verbose_name='MIME-тип'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='size',
+            field=models.BigIntegerField(default=0, verbose_name='Размер, байт'),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='doc_type',
+            field=models.CharField(blank=True, choices=[('diploma', 'Диплом'), ('resume', 'Резюме'), ('certificate', 'Сертификат')], max_length=50, verbose_name='Тип документа'),
+        ),
+    ]
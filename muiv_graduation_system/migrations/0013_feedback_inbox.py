@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:20
+
+from django.db import migrations, models
+
+
+SEARCH_INDEX_NAME = 'feedback_search_idx'
+
+
+def _search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    return GinIndex(SearchVector('subject', 'message', config='russian'), name=SEARCH_INDEX_NAME)
+
+
+def add_search_index(apps, schema_editor):
+    """Полнотекстовый GIN-индекс по теме и тексту (только PostgreSQL; в остальных СУБД поиск — icontains)"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('muiv_graduation_system', 'Feedback'), _search_index())
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('muiv_graduation_system', 'Feedback'), _search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0012_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-created_at', '-id'], name='feedback_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['-created_at', '-id'], name='feedback_created_idx'),
+        ),
+        migrations.RunPython(add_search_index, remove_search_index),
+    ]
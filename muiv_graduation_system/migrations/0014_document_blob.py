@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:40
+
+from django.db import migrations, models
+
+
+def fill_blobs(apps, schema_editor):
+    """
+    Строки DocumentBlob для уже сохранённого содержимого и удаление
+    повторных документов выпускника с одним содержимым (остаётся первый;
+    файл общий и остаётся на месте).
+    """
+    Document = apps.get_model('muiv_graduation_system', 'Document')
+    DocumentBlob = apps.get_model('muiv_graduation_system', 'DocumentBlob')
+
+    hashes = Document.objects.exclude(sha256='').values_list('sha256', flat=True).distinct()
+    DocumentBlob.objects.bulk_create(
+        [DocumentBlob(sha256=sha256) for sha256 in hashes.iterator()], batch_size=1000, ignore_conflicts=True
+    )
+
+    seen = set()
+    duplicate_ids = []
+    rows = Document.objects.exclude(sha256='').order_by('id').values_list('id', 'graduate_id', 'sha256')
+    for pk, graduate_id, sha256 in rows.iterator():
+        if (graduate_id, sha256) in seen:
+            duplicate_ids.append(pk)
+        else:
+            seen.add((graduate_id, sha256))
+    Document.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0013_feedback_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA-256')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+            ],
+            options={
+                'verbose_name': 'Файл хранилища',
+                'verbose_name_plural': 'Файлы хранилища',
+            },
+        ),
+        migrations.RunPython(fill_blobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='document',
+            constraint=models.UniqueConstraint(condition=models.Q(('sha256', ''), _negated=True), fields=('graduate', 'sha256'), name='document_graduate_unique_content'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-19 05:12
+
+from django.db import migrations, models
+
+
+def number_existing_events(apps, schema_editor):
+    """Уже записанные события получают номер, равный id: позиции потребителей остаются верными"""
+    ChangeEvent = apps.get_model('muiv_graduation_system', 'ChangeEvent')
+    ChangeFeedSequence = apps.get_model('muiv_graduation_system', 'ChangeFeedSequence')
+
+    ChangeEvent.objects.update(position=models.F('id'))
+    last = ChangeEvent.objects.aggregate(last=models.Max('id'))['last'] or 0
+    ChangeFeedSequence.objects.create(position=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('muiv_graduation_system', '0014_document_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changeevent',
+            name='position',
+            field=models.BigIntegerField(editable=False, null=True, unique=True, verbose_name='Номер в ленте'),
+        ),
+        migrations.CreateModel(
+            name='ChangeFeedSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Последний номер')),
+            ],
+            options={
+                'verbose_name': 'Нумерация ленты изменений',
+                'verbose_name_plural': 'Нумерация ленты изменений',
+            },
+        ),
+        migrations.RunPython(number_existing_events, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=models.Index(
+                condition=models.Q(('position__isnull', True)), fields=['id'], name='change_event_unsequenced'
+            ),
+        ),
+    ]
@@ -1,6 +1,13 @@
-from django.db import models
+import hashlib
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
 from django.contrib.auth.models import AbstractUser
 
+from .caching import bump_reference_generation, reference_generation
+
 
 class Role(models.Model):
     name = models.CharField(max_length=50, unique=True, verbose_name='Название роли')
@@ -31,16 +38,157 @@ class User(AbstractUser):
         verbose_name_plural = 'Пользователи'
 
 
-class Employer(models.Model):
+class ChangeTrackedModel(models.Model):
+    """
+    Модель, изменения которой попадают в журнал изменений (ChangeEvent).
+
+    save() выполняется в транзакции, поэтому событие, которое пишет обработчик
+    post_save (см. signals.py), фиксируется вместе с самой записью.
+    """
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+EMPLOYER_NAME_STRIP = str.maketrans('', '', '«»"\'„“”')
+
+
+def normalize_name(name):
+    """Нормализованное название (работодатель, факультет, специальность): без кавычек, лишних пробелов и регистра"""
+    if not name:
+        return ''
+    name = name.translate(EMPLOYER_NAME_STRIP).replace('ё', 'е').replace('Ё', 'Е')
+    return ' '.join(name.split()).casefold()
+
+
+normalize_employer_name = normalize_name
+
+
+class NormalizedNameManager(models.Manager):
+    """
+    Менеджер справочника с уникальным normalized_name и кешем «нормализованное название → id».
+
+    Кеш у каждого подкласса свой, живёт в памяти процесса и ограничен по размеру.
+    При изменении или удалении записи (см. signals.py) он сбрасывается сразу в этом
+    процессе, а в остальных — по смене поколения в общем кеше после фиксации.
+    Без общего кеша (SHARED_CACHE_VERSIONS) id всегда берутся из БД.
+    """
+    cache_size = 10000
+    _id_cache = {}
+    _id_cache_generation = None
+
+    def clear_cache(self):
+        type(self)._id_cache.clear()
+        label = self.model._meta.label_lower
+        transaction.on_commit(lambda: bump_reference_generation(label), using=self.db)
+
+    def _cache_generation(self):
+        """Текущее поколение; кеш процесса от прошлого поколения сбрасывается"""
+        generation = reference_generation(self.model._meta.label_lower)
+        manager = type(self)
+        if generation is not None and manager._id_cache_generation != generation:
+            manager._id_cache.clear()
+            manager._id_cache_generation = generation
+        return generation
+
+    def _remember(self, ids, generation):
+        cache = type(self)._id_cache
+        if type(self)._id_cache_generation != generation:
+            return
+        if len(cache) + len(ids) > self.cache_size:
+            cache.clear()
+        cache.update(ids)
+
+    def id_for_name(self, name):
+        """id записи по названию; создаётся, если такой ещё нет"""
+        return self.ids_for_names([name]).get(name)
+
+    def ids_for_names(self, names):
+        """
+        Словарь «название → id» для набора названий.
+
+        Отсутствующие записи создаются через INSERT … ON CONFLICT DO NOTHING
+        по уникальному normalized_name, поэтому параллельные запросы не создают дублей.
+        """
+        generation = self._cache_generation()
+        cache = type(self)._id_cache if generation is not None else {}
+        normalized = {}
+        for name in names:
+            key = normalize_name(name)
+            if key:
+                normalized[name] = key
+        missing = {key for key in normalized.values() if key not in cache}
+
+        if missing:
+            found = dict(self.filter(normalized_name__in=missing).values_list('normalized_name', 'id'))
+            to_create = {}
+            for name, key in normalized.items():
+                if key in missing and key not in found and key not in to_create:
+                    to_create[key] = self.model(name=' '.join(name.split()), normalized_name=key)
+            if to_create:
+                with transaction.atomic(using=self.db, savepoint=False):
+                    self.bulk_create(to_create.values(), ignore_conflicts=True)
+                    created = dict(self.filter(normalized_name__in=to_create.keys()).values_list('normalized_name', 'id'))
+                    self._created(created.values())
+                found.update(created)
+            result = {name: found[key] if key in found else cache.get(key) for name, key in normalized.items()}
+            # Внутри транзакции кешируем только после фиксации — иначе после
+            # отката в кеше останутся id несуществующих строк
+            if generation is not None:
+                transaction.on_commit(lambda: self._remember(found, generation), using=self.db)
+            return result
+
+        return {name: cache[key] for name, key in normalized.items()}
+
+    def _created(self, ids):
+        """Вызывается в транзакции после создания записей через ids_for_names"""
+
+
+class EmployerManager(NormalizedNameManager):
+    """Менеджер работодателей с кешем «нормализованное название → id»"""
+    _id_cache = {}
+
+    def _created(self, ids):
+        # bulk_create не отправляет сигналов — событие журнала пишем сами
+        from .outbox import record_queryset
+        record_queryset(self.filter(pk__in=list(ids)), ChangeEvent.CREATED)
+
+
+class Employer(ChangeTrackedModel):
     name = models.CharField(max_length=150, verbose_name='Название компании')
+    normalized_name = models.CharField(
+        max_length=150,
+        unique=True,
+        editable=False,
+        verbose_name='Нормализованное название'
+    )
     industry = models.CharField(max_length=100, blank=True, verbose_name='Отрасль')
     contact_person = models.CharField(max_length=100, blank=True, verbose_name='Контактное лицо')
     email = models.EmailField(blank=True, verbose_name='Электронная почта')
     phone = models.CharField(max_length=20, blank=True, verbose_name='Телефон')
 
+    objects = EmployerManager()
+
     def __str__(self):
         return self.name
 
+    def clean(self):
+        normalized = normalize_employer_name(self.name)
+        if Employer.objects.filter(normalized_name=normalized).exclude(pk=self.pk).exists():
+            raise ValidationError({'name': 'Работодатель с таким названием уже существует.'})
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_employer_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_name'}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'Работодатель'
         verbose_name_plural = 'Работодатели'
@@ -57,7 +205,62 @@ class EmploymentStatus(models.Model):
         verbose_name_plural = 'Статусы трудоустройства'
 
 
-class Graduate(models.Model):
+class ReferenceModel(models.Model):
+    """Справочник с уникальным нормализованным названием (факультеты, специальности)"""
+    name = models.CharField(max_length=100, verbose_name='Название')
+    normalized_name = models.CharField(
+        max_length=100,
+        unique=True,
+        editable=False,
+        verbose_name='Нормализованное название'
+    )
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        normalized = normalize_name(self.name)
+        if type(self).objects.filter(normalized_name=normalized).exclude(pk=self.pk).exists():
+            raise ValidationError({'name': 'Запись с таким названием уже существует.'})
+
+    def save(self, *args, **kwargs):
+        self.name = ' '.join(self.name.split())
+        self.normalized_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_name'}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+        ordering = ['name']
+
+
+class FacultyManager(NormalizedNameManager):
+    _id_cache = {}
+
+
+class Faculty(ReferenceModel):
+    objects = FacultyManager()
+
+    class Meta(ReferenceModel.Meta):
+        verbose_name = 'Факультет'
+        verbose_name_plural = 'Факультеты'
+
+
+class SpecializationManager(NormalizedNameManager):
+    _id_cache = {}
+
+
+class Specialization(ReferenceModel):
+    objects = SpecializationManager()
+
+    class Meta(ReferenceModel.Meta):
+        verbose_name = 'Специальность'
+        verbose_name_plural = 'Специальности'
+
+
+class Graduate(ChangeTrackedModel):
     user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
@@ -66,10 +269,25 @@ class Graduate(models.Model):
     )
     full_name = models.CharField(max_length=100, verbose_name='ФИО')
     graduation_year = models.IntegerField(verbose_name='Год выпуска')
-    faculty = models.CharField(max_length=100, blank=True, verbose_name='Факультет')
-    specialization = models.CharField(max_length=100, blank=True, verbose_name='Специализация')
+    faculty = models.ForeignKey(
+        Faculty,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='graduates',
+        verbose_name='Факультет'
+    )
+    specialization = models.ForeignKey(
+        Specialization,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='graduates',
+        verbose_name='Специализация'
+    )
     phone = models.CharField(max_length=20, blank=True, verbose_name='Телефон')
     email = models.EmailField(verbose_name='Электронная почта')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
 
     def __str__(self):
         return self.full_name
@@ -79,7 +297,7 @@ class Graduate(models.Model):
         verbose_name_plural = 'Выпускники'
 
 
-class Employment(models.Model):
+class Employment(ChangeTrackedModel):
     graduate = models.OneToOneField(
         Graduate,
         on_delete=models.CASCADE,
@@ -114,6 +332,12 @@ class Employment(models.Model):
 
 
 class Document(models.Model):
+    DOC_TYPES = [
+        ('diploma', 'Диплом'),
+        ('resume', 'Резюме'),
+        ('certificate', 'Сертификат'),
+    ]
+
     graduate = models.ForeignKey(
         Graduate,
         on_delete=models.CASCADE,
@@ -121,9 +345,13 @@ class Document(models.Model):
         verbose_name='Выпускник'
     )
     filename = models.CharField(max_length=255, verbose_name='Имя файла')
+    # Путь относительно DOCUMENTS_ROOT; у загруженных файлов — по SHA-256 содержимого (documents.py)
     filepath = models.CharField(max_length=500, verbose_name='Путь к файлу')
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата загрузки')
-    doc_type = models.CharField(max_length=50, blank=True, verbose_name='Тип документа')
+    doc_type = models.CharField(max_length=50, blank=True, choices=DOC_TYPES, verbose_name='Тип документа')
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, verbose_name='SHA-256')
+    size = models.BigIntegerField(default=0, verbose_name='Размер, байт')
+    content_type = models.CharField(max_length=100, blank=True, verbose_name='MIME-тип')
 
     def __str__(self):
         return self.filename
@@ -131,26 +359,109 @@ class Document(models.Model):
     class Meta:
         verbose_name = 'Документ'
         verbose_name_plural = 'Документы'
+        constraints = [
+            # Одно и то же содержимое у выпускника — один документ (см. save_document)
+            models.UniqueConstraint(
+                fields=['graduate', 'sha256'],
+                condition=~models.Q(sha256=''),
+                name='document_graduate_unique_content',
+            ),
+        ]
+
+
+class DocumentBlob(models.Model):
+    """
+    Файл хранилища документов (documents.py). Строка блокируется на время
+    проверки и изменения файла — при сохранении документа и при удалении файла.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True, verbose_name='SHA-256')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создан')
+
+    def __str__(self):
+        return self.sha256
+
+    class Meta:
+        verbose_name = 'Файл хранилища'
+        verbose_name_plural = 'Файлы хранилища'
+
+
+class UploadSession(models.Model):
+    """Загрузка документа по частям: принятые байты лежат во временном файле (documents.py)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name='Пользователь'
+    )
+    filename = models.CharField(max_length=255, verbose_name='Имя файла')
+    doc_type = models.CharField(max_length=50, blank=True, choices=Document.DOC_TYPES, verbose_name='Тип документа')
+    size = models.BigIntegerField(verbose_name='Размер, байт')
+    # Ожидаемый SHA-256 всего файла (необязателен), проверяется при завершении
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name='SHA-256')
+    received = models.BigIntegerField(default=0, verbose_name='Принято байт')
+    # Пока запрос пишет часть, другой запрос этой же загрузки получает 409
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name='Занята до')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата начала')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Последняя часть')
+
+    def __str__(self):
+        return f"{self.filename}: {self.received}/{self.size}"
+
+    class Meta:
+        verbose_name = 'Загрузка по частям'
+        verbose_name_plural = 'Загрузки по частям'
+
+
+def feedback_digest(subject, message):
+    """Отпечаток сообщения обратной связи для отсева повторов"""
+    text = f"{' '.join(subject.split())}\n{' '.join(message.split())}".casefold()
+    return hashlib.sha256(text.encode()).hexdigest()
 
 
 class Feedback(models.Model):
+    # Сообщения гостей хранятся без пользователя — только с email отправителя
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        null=True,
+        blank=True,
         related_name='feedbacks',
         verbose_name='Пользователь'
     )
+    email = models.EmailField(blank=True, verbose_name='Email гостя')
+    digest = models.CharField(max_length=64, blank=True, editable=False, verbose_name='Отпечаток сообщения')
     subject = models.CharField(max_length=100, blank=True, verbose_name='Тема')
     message = models.TextField(verbose_name='Сообщение')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     is_read = models.BooleanField(default=False, verbose_name='Прочитано')
 
+    @property
+    def sender(self):
+        return self.user.username if self.user_id else self.email
+
     def __str__(self):
-        return f"Feedback from {self.user.username}"
+        return f"Feedback from {self.sender}"
 
     class Meta:
         verbose_name = 'Обратная связь'
         verbose_name_plural = 'Обратные связи'
+        indexes = [
+            # Входящие по убыванию даты (keyset по created_at, id); частичный — только новые
+            models.Index(
+                fields=['-created_at', '-id'], condition=models.Q(is_read=False), name='feedback_unread_idx'
+            ),
+            models.Index(fields=['-created_at', '-id'], name='feedback_created_idx'),
+            # Полнотекстовый GIN-индекс по теме и тексту создаётся миграцией 0013 только в PostgreSQL
+        ]
+        constraints = [
+            # Одно и то же сообщение от одного гостя сохраняется один раз
+            models.UniqueConstraint(
+                fields=['email', 'digest'],
+                condition=models.Q(user__isnull=True),
+                name='feedback_guest_unique_message',
+            ),
+        ]
 
 
 class Report(models.Model):
@@ -201,4 +512,66 @@ class RegistrationRequest(models.Model):
 
     class Meta:
         verbose_name = 'Заявка на регистрацию'
-        verbose_name_plural = 'Заявки на регистрацию'
\ No newline at end of file
+        verbose_name_plural = 'Заявки на регистрацию'
+
+
+# ========================
+# ЖУРНАЛ ИЗМЕНЕНИЙ (CDC)
+# ========================
+
+class ChangeEvent(models.Model):
+    """Событие журнала изменений: снимок записи после изменения (outbox)"""
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = [
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (DELETED, 'Удаление'),
+    ]
+
+    # id выдаётся при INSERT; номер в ленте (since=<position>) — после фиксации, см. outbox.sequence_events
+    id = models.BigAutoField(primary_key=True)
+    position = models.BigIntegerField(null=True, unique=True, editable=False, verbose_name='Номер в ленте')
+    entity = models.CharField(max_length=30, verbose_name='Сущность')
+    object_id = models.BigIntegerField(verbose_name='id записи')
+    action = models.CharField(max_length=10, choices=ACTIONS, verbose_name='Действие')
+    payload = models.JSONField(encoder=DjangoJSONEncoder, null=True, verbose_name='Данные')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Время события')
+
+    def __str__(self):
+        return f"#{self.id} {self.entity}:{self.object_id} {self.action}"
+
+    class Meta:
+        verbose_name = 'Событие журнала изменений'
+        verbose_name_plural = 'Журнал изменений'
+        indexes = [
+            # Ещё не пронумерованные события (частичный индекс, обычно почти пустой)
+            models.Index(fields=['id'], condition=models.Q(position__isnull=True), name='change_event_unsequenced'),
+        ]
+
+
+class ChangeFeedSequence(models.Model):
+    """Последний выданный номер ленты изменений; строка блокируется на время нумерации"""
+    position = models.BigIntegerField(default=0, verbose_name='Последний номер')
+
+    def __str__(self):
+        return str(self.position)
+
+    class Meta:
+        verbose_name = 'Нумерация ленты изменений'
+        verbose_name_plural = 'Нумерация ленты изменений'
+
+
+class ChangeFeedCursor(models.Model):
+    """Позиция потребителя ленты изменений: события до position получены"""
+    consumer = models.CharField(max_length=50, unique=True, verbose_name='Потребитель')
+    position = models.BigIntegerField(default=0, verbose_name='Последнее полученное событие')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+
+    def __str__(self):
+        return f"{self.consumer}: {self.position}"
+
+    class Meta:
+        verbose_name = 'Позиция потребителя ленты'
+        verbose_name_plural = 'Позиции потребителей ленты'
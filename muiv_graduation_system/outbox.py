@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ChangeEvent, ChangeFeedCursor, ChangeFeedSequence, Employer, Employment, Graduate
+
+
+# ========================
+# ЖУРНАЛ ИЗМЕНЕНИЙ (CDC OUTBOX)
+# ========================
+# Изменения выпускников, трудоустройства и работодателей пишутся в ChangeEvent
+# в той же транзакции, что и сама запись: save() — через post_save
+# (ChangeTrackedModel), удаление — через post_delete внутри транзакции Collector,
+# пакетные операции (bulk_create, UPDATE) — явным вызовом record_*.
+# Внешние системы читают ленту по номеру события (ChangeFeedView).
+#
+# id выдаётся при INSERT, а событие видно после COMMIT, поэтому событие долгой
+# транзакции может стать видимым позже события с большим id. Номер в ленте
+# (position) выдаётся уже зафиксированным событиям под блокировкой строки
+# ChangeFeedSequence: событие, зафиксированное позже, получает больший номер
+# и не окажется позади позиции, которую потребитель уже подтвердил.
+
+ENTITIES = {
+    Graduate: 'graduate',
+    Employment: 'employment',
+    Employer: 'employer',
+}
+
+RECORD_BATCH_SIZE = 1000
+
+
+def _snapshot(instance):
+    return {field.attname: field.value_from_object(instance) for field in instance._meta.concrete_fields}
+
+
+def record_change(instance, action):
+    """Событие для одной записи (вызывается из сигналов)"""
+    ChangeEvent.objects.create(
+        entity=ENTITIES[type(instance)],
+        object_id=instance.pk,
+        action=action,
+        payload=_snapshot(instance) if action != ChangeEvent.DELETED else None,
+    )
+
+
+def record_changes(objects, action, batch_size=RECORD_BATCH_SIZE):
+    """События для записей после bulk_create (pk уже заполнены)"""
+    ChangeEvent.objects.bulk_create([
+        ChangeEvent(entity=ENTITIES[type(obj)], object_id=obj.pk, action=action, payload=_snapshot(obj))
+        for obj in objects
+    ], batch_size=batch_size)
+
+
+def record_queryset(queryset, action, batch_size=RECORD_BATCH_SIZE):
+    """События для записей queryset после UPDATE; снимки читаются пачками через values()"""
+    entity = ENTITIES[queryset.model]
+    batch = []
+    for row in queryset.order_by('pk').values().iterator(chunk_size=batch_size):
+        batch.append(ChangeEvent(entity=entity, object_id=row['id'], action=action, payload=row))
+        if len(batch) >= batch_size:
+            ChangeEvent.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ChangeEvent.objects.bulk_create(batch)
+
+
+def sequence_events(batch_size):
+    """
+    Номера в ленте для видимых (зафиксированных) событий без номера, в порядке id.
+    Возвращает True, если пачка заполнена и события без номера могут остаться.
+    """
+    with transaction.atomic(savepoint=False):
+        sequence = ChangeFeedSequence.objects.select_for_update().order_by('pk').first()
+        if sequence is None:
+            sequence = ChangeFeedSequence.objects.create()
+        ids = list(
+            ChangeEvent.objects.filter(position__isnull=True).order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            # Номера растут вместе с id; пропуски между номерами допустимы
+            offset = sequence.position + 1 - ids[0]
+            ChangeEvent.objects.filter(id__in=ids).update(position=F('id') + offset)
+            sequence.position = ids[-1] + offset
+            sequence.save(update_fields=['position'])
+    return len(ids) == batch_size
+
+
+def changes_since(since, limit):
+    """Пачка событий с номером больше since: (события, есть ли ещё)"""
+    unsequenced = sequence_events(limit + 1)
+    events = list(ChangeEvent.objects.filter(position__gt=since).order_by('position')[:limit + 1])
+    return events[:limit], len(events) > limit or unsequenced
+
+
+def acknowledge(consumer, position):
+    """Потребитель получил события до position включительно — позиция только растёт"""
+    updated = ChangeFeedCursor.objects.filter(consumer=consumer, position__lt=position) \
+        .update(position=position, updated_at=timezone.now())
+    if not updated:
+        ChangeFeedCursor.objects.bulk_create(
+            [ChangeFeedCursor(consumer=consumer, position=position)], ignore_conflicts=True
+        )
+
+
+def compact(retention_days=None, batch_size=10000):
+    """
+    Удаление событий, полученных всеми потребителями CHANGE_FEED_CONSUMERS,
+    и событий старше retention_days (даже если их кто-то не забрал).
+    Удаляется пачками по batch_size. Возвращает число удалённых событий.
+    """
+    consumers = list(getattr(settings, 'CHANGE_FEED_CONSUMERS', {}))
+    positions = dict(ChangeFeedCursor.objects.filter(consumer__in=consumers).values_list('consumer', 'position'))
+    # Потребитель, ещё ни разу не читавший ленту, ничего не подтвердил
+    upto = min((positions.get(consumer, 0) for consumer in consumers), default=0)
+    condition = Q(position__lte=upto)
+
+    if retention_days is None:
+        retention_days = getattr(settings, 'CHANGE_FEED_RETENTION_DAYS', None)
+    if retention_days:
+        condition |= Q(created_at__lt=timezone.now() - timedelta(days=retention_days))
+
+    deleted = 0
+    while True:
+        ids = list(ChangeEvent.objects.filter(condition).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += ChangeEvent.objects.filter(id__in=ids).delete()[0]
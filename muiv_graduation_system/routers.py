@@ -0,0 +1,39 @@
+from contextvars import ContextVar
+
+
+# ========================
+# МАРШРУТИЗАЦИЯ ЧТЕНИЯ НА РЕПЛИКУ
+# ========================
+# Состояние текущего запроса задаёт ReplicaRoutingMiddleware: с какой БД
+# читать и была ли запись. Вне запроса (команды, фоновые потоки) всё идёт
+# в основную БД.
+
+REPLICA_ALIAS = 'replica'
+
+# Сессии всегда читаются с основной БД: только что созданная сессия
+# могла ещё не дойти до реплики
+PRIMARY_ONLY_APPS = ('sessions',)
+
+request_db_state = ContextVar('request_db_state', default=None)
+
+
+class ReplicaRouter:
+    """Чтение помеченных страниц — с реплики, любая запись — в основную БД"""
+
+    def db_for_read(self, model, **hints):
+        state = request_db_state.get()
+        if state is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return state['read_alias']
+
+    def db_for_write(self, model, **hints):
+        state = request_db_state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
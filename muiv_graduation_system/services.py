@@ -0,0 +1,318 @@
+from collections import namedtuple
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import bump_all_graduate_cards, reset_unread_feedback_count
+from .models import (
+    User, Role, RegistrationRequest, Graduate, Employer, Employment, Feedback, ChangeEvent,
+    feedback_digest, normalize_employer_name
+)
+from .outbox import record_changes, record_queryset
+
+
+# ========================
+# ЗАЯВКИ МЕНЕДЖЕРОВ
+# ========================
+
+ApprovalResult = namedtuple('ApprovalResult', ['approved', 'skipped'])
+
+APPROVAL_BATCH_SIZE = 500
+
+
+def _split_full_name(full_name):
+    """Разбор ФИО на фамилию и имя"""
+    parts = full_name.split() if full_name else []
+    last_name = parts[0] if len(parts) > 0 else ''
+    first_name = parts[1] if len(parts) > 1 else ''
+    return last_name, first_name
+
+
+def approve_registration_requests(requests, approved_by, batch_size=APPROVAL_BATCH_SIZE):
+    """
+    Массовое одобрение заявок менеджеров.
+
+    Все заявки обрабатываются в одной транзакции: роль загружается один раз,
+    пользователи создаются через bulk_create, заявки помечаются одним UPDATE.
+    Заявки, логин или email которых уже занят, пропускаются и остаются в ожидании.
+    Возвращает ApprovalResult со списками одобренных и пропущенных логинов.
+    """
+    with transaction.atomic():
+        pending = list(
+            requests.filter(is_approved=False)
+            .select_for_update()
+            .only('id', 'username', 'email', 'password_hash', 'full_name')
+        )
+        if not pending:
+            return ApprovalResult([], [])
+
+        manager_role = Role.objects.filter(name__iexact='manager').first()
+        if manager_role is None:
+            raise Role.DoesNotExist('Роль "manager" не найдена')
+
+        # Логины и email, которые уже заняты существующими пользователями
+        taken_usernames = set()
+        taken_emails = set()
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            taken = User.objects.filter(
+                Q(username__in=[r.username for r in chunk]) |
+                Q(email__in=[r.email for r in chunk])
+            ).values_list('username', 'email')
+            for username, email in taken:
+                taken_usernames.add(username)
+                taken_emails.add(email)
+
+        to_create = []
+        skipped = []
+        for req in pending:
+            if req.username in taken_usernames or req.email in taken_emails:
+                skipped.append(req.username)
+                continue
+            last_name, first_name = _split_full_name(req.full_name)
+            # Сигнал set_admin_permissions при bulk_create не вызывается —
+            # для роли менеджера он ничего не меняет.
+            to_create.append(User(
+                username=req.username,
+                email=req.email,
+                first_name=first_name,
+                last_name=last_name,
+                password=req.password_hash,
+                role=manager_role,
+                is_active=True,
+                is_staff=False,
+            ))
+
+        # ignore_conflicts защищает от гонки с параллельной регистрацией
+        User.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+
+        # Одобряем только те заявки, для которых пользователь действительно создан
+        created_pairs = set()
+        candidates = [(u.username, u.email) for u in to_create]
+        for start in range(0, len(candidates), batch_size):
+            chunk = candidates[start:start + batch_size]
+            created_pairs.update(User.objects.filter(
+                username__in=[username for username, _ in chunk],
+                role=manager_role,
+            ).values_list('username', 'email'))
+
+        approved_ids = []
+        approved = []
+        for req in pending:
+            if (req.username, req.email) in created_pairs:
+                approved_ids.append(req.id)
+                approved.append(req.username)
+            elif req.username not in skipped:
+                skipped.append(req.username)
+
+        for start in range(0, len(approved_ids), batch_size):
+            RegistrationRequest.objects.filter(id__in=approved_ids[start:start + batch_size]).update(
+                is_approved=True,
+                approved_by=approved_by,
+            )
+
+    return ApprovalResult(approved, skipped)
+
+
+# ========================
+# РАБОТОДАТЕЛИ
+# ========================
+
+EMPLOYER_MERGED_FIELDS = ('industry', 'contact_person', 'email', 'phone')
+
+
+def merge_employers(target, duplicates):
+    """
+    Слияние дублей работодателя в target.
+
+    Трудоустройства переносятся одним UPDATE, пустые контактные поля target
+    заполняются из дублей, сами дубли удаляются. Возвращает число перенесённых
+    Employment.
+    """
+    duplicates = [d for d in duplicates if d.pk != target.pk]
+    if not duplicates:
+        return 0
+
+    with transaction.atomic():
+        changed = []
+        for duplicate in duplicates:
+            for field in EMPLOYER_MERGED_FIELDS:
+                if not getattr(target, field) and getattr(duplicate, field):
+                    setattr(target, field, getattr(duplicate, field))
+                    changed.append(field)
+
+        duplicate_ids = [d.pk for d in duplicates]
+        moved_ids = list(Employment.objects.filter(employer_id__in=duplicate_ids).values_list('id', flat=True))
+        moved = Employment.objects.filter(id__in=moved_ids).update(employer_id=target.pk)
+        record_queryset(Employment.objects.filter(id__in=moved_ids), ChangeEvent.UPDATED)
+        Employer.objects.filter(pk__in=duplicate_ids).delete()
+
+        if changed or target.normalized_name != normalize_employer_name(target.name):
+            target.save()
+
+    Employer.objects.clear_cache()
+    transaction.on_commit(bump_all_graduate_cards)
+    return moved
+
+
+def find_duplicate_employers():
+    """Группы работодателей с одинаковым нормализованным названием (первый — самый ранний)"""
+    groups = {}
+    for employer in Employer.objects.order_by('id').iterator():
+        groups.setdefault(normalize_employer_name(employer.name), []).append(employer)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+# ========================
+# МАССОВОЕ ИЗМЕНЕНИЕ ТРУДОУСТРОЙСТВА
+# ========================
+
+BulkUpdateResult = namedtuple('BulkUpdateResult', ['updated', 'created'])
+
+UNCHANGED = object()
+
+BULK_UPDATE_BATCH_SIZE = 1000
+
+
+def bulk_update_employment(graduates, status_id=UNCHANGED, employer_id=UNCHANGED,
+                           batch_size=BULK_UPDATE_BATCH_SIZE):
+    """
+    Установка статуса и/или работодателя для набора выпускников.
+
+    graduates — queryset выпускников (например, результат поиска). Существующие
+    Employment меняются UPDATE по id пачками, недостающие создаются через
+    bulk_create; всё в одной транзакции. UNCHANGED — поле не трогать, None — очистить.
+    """
+    values = {}
+    if status_id is not UNCHANGED:
+        values['status_id'] = status_id
+    if employer_id is not UNCHANGED:
+        values['employer_id'] = employer_id
+    if not values:
+        return BulkUpdateResult(0, 0)
+
+    graduate_ids = graduates.order_by().values('id')
+
+    with transaction.atomic():
+        # id фиксируются до UPDATE: после него подзапрос (например, поиск по статусу)
+        # может вернуть другие строки, а журнал должен получить ровно изменённые
+        employment_ids = list(
+            Employment.objects.filter(graduate_id__in=graduate_ids).order_by('id').values_list('id', flat=True)
+        )
+        updated = 0
+        for start in range(0, len(employment_ids), batch_size):
+            chunk = employment_ids[start:start + batch_size]
+            updated += Employment.objects.filter(id__in=chunk).update(updated_at=timezone.now(), **values)
+            record_queryset(Employment.objects.filter(id__in=chunk), ChangeEvent.UPDATED)
+
+        created = 0
+        if any(value is not None for value in values.values()):
+            missing = Graduate.objects.filter(id__in=graduate_ids, employment__isnull=True) \
+                .values_list('id', flat=True).iterator(chunk_size=batch_size)
+            batch = []
+            for graduate_id in missing:
+                batch.append(Employment(graduate_id=graduate_id, **values))
+                if len(batch) >= batch_size:
+                    created += len(Employment.objects.bulk_create(batch))
+                    record_changes(batch, ChangeEvent.CREATED)
+                    batch = []
+            if batch:
+                created += len(Employment.objects.bulk_create(batch))
+                record_changes(batch, ChangeEvent.CREATED)
+
+    # UPDATE и bulk_create не отправляют сигналов; версия — после фиксации (см. signals.py)
+    transaction.on_commit(bump_all_graduate_cards)
+    return BulkUpdateResult(updated, created)
+
+
+# ========================
+# ГОСТЕВАЯ ОБРАТНАЯ СВЯЗЬ
+# ========================
+
+def save_guest_feedback(email, subject, message):
+    """
+    Сообщение гостя — сразу в БД одним INSERT, без буфера в памяти процесса:
+    сообщение не теряется при перезапуске или аварийном завершении воркера.
+    Повтор (тот же email и отпечаток текста) отсеивается уникальным индексом
+    (ON CONFLICT DO NOTHING).
+    """
+    subject = subject[:Feedback._meta.get_field('subject').max_length]
+    Feedback.objects.bulk_create([
+        Feedback(
+            email=email.lower(),
+            subject=subject,
+            message=message,
+            digest=feedback_digest(subject, message),
+        )
+    ], ignore_conflicts=True)
+    # bulk_create не отправляет post_save — счётчик непрочитанных сбрасываем сами
+    transaction.on_commit(reset_unread_feedback_count)
+
+
+# ========================
+# ВХОДЯЩИЕ ОБРАТНОЙ СВЯЗИ
+# ========================
+# Лента сообщений листается по ключу (created_at, id) без OFFSET и COUNT:
+# индексы feedback_created_idx и частичный feedback_unread_idx (только новые)
+# отдают следующую страницу без пересчёта всей таблицы.
+
+FEEDBACK_PAGE_SIZE = 50
+
+
+def search_feedback(queryset, query):
+    """
+    Поиск по теме и тексту. В PostgreSQL — полнотекстовый (GIN-индекс
+    feedback_search_idx, словарь russian), в остальных СУБД — icontains.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+        return queryset.alias(
+            search=SearchVector('subject', 'message', config='russian')
+        ).filter(search=SearchQuery(query, config='russian', search_type='websearch'))
+    return queryset.filter(Q(subject__icontains=query) | Q(message__icontains=query))
+
+
+def feedback_cursor(feedback):
+    """Курсор «до этого сообщения» для следующей страницы"""
+    return f'{feedback.created_at.isoformat()}_{feedback.id}'
+
+
+def _parse_feedback_cursor(cursor):
+    created_at, _, pk = (cursor or '').rpartition('_')
+    try:
+        return datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        return None
+
+
+def feedback_page(queryset, before=None, per_page=FEEDBACK_PAGE_SIZE):
+    """
+    Страница сообщений старше курсора before (новые сверху):
+    (сообщения, курсор следующей страницы или None).
+    Некорректный курсор — первая страница.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    position = _parse_feedback_cursor(before)
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    items = list(queryset[:per_page + 1])
+    if len(items) > per_page:
+        return items[:per_page], feedback_cursor(items[per_page - 1])
+    return items, None
+
+
+def mark_feedback(ids, is_read):
+    """
+    Отметка выбранных сообщений прочитанными (или новыми) одним UPDATE.
+    Затрагиваются только строки с другим статусом; возвращает их число.
+    """
+    updated = Feedback.objects.filter(id__in=ids).exclude(is_read=is_read).update(is_read=is_read)
+    if updated:
+        transaction.on_commit(reset_unread_feedback_count)
+    return updated
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+# ========================
+# ДВУХУРОВНЕВОЕ ХРАНЕНИЕ СЕССИЙ
+# ========================
+# Перед основным хранилищем (БД или файлы) стоит LRU-кеш в памяти процесса.
+# Запись живёт SESSION_FRONT_CACHE_TTL секунд: столько максимум другой
+# воркер может видеть устаревшие данные сессии (в том числе после выхода).
+# Неизменённая сессия не перезаписывается чаще SESSION_WRITE_INTERVAL секунд.
+
+class FrontCache:
+    """Потокобезопасный LRU-кеш сериализованных сессий с ограниченным временем жизни"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'SESSION_FRONT_CACHE_TTL', 10)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'SESSION_FRONT_CACHE_SIZE', 10000)
+
+    def get(self, session_key):
+        """(данные, момент синхронизации с хранилищем) или None"""
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] >= self.ttl:
+                del self._entries[session_key]
+                return None
+            self._entries.move_to_end(session_key)
+            return entry
+
+    def set(self, session_key, payload):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[session_key] = (payload, time.monotonic())
+            self._entries.move_to_end(session_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_key):
+        with self._lock:
+            self._entries.pop(session_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+front_cache = FrontCache()
+
+
+class TieredSessionMixin:
+    """
+    Примесь к SessionStore: чтение через front_cache и пропуск записи без изменений.
+
+    Данные в кеше хранятся сериализованными, поэтому запросы не делят
+    изменяемые объекты. Сессия сохраняется в хранилище, если её содержимое
+    изменилось или с последней синхронизации прошло SESSION_WRITE_INTERVAL
+    секунд (продление срока при SESSION_SAVE_EVERY_REQUEST).
+    """
+
+    _synced_payload = None
+    _synced_at = None
+
+    def _serialize(self, data):
+        return self.serializer().dumps(data)
+
+    def _remember(self, data):
+        self._synced_payload = self._serialize(data)
+        self._synced_at = time.monotonic()
+        front_cache.set(self.session_key, self._synced_payload)
+
+    def _load_from_front(self):
+        entry = front_cache.get(self.session_key) if self.session_key else None
+        if entry is None:
+            return None
+        self._synced_payload, self._synced_at = entry
+        return self.serializer().loads(self._synced_payload)
+
+    def _is_unchanged(self, data):
+        if self._synced_at is None:
+            return False
+        interval = getattr(settings, 'SESSION_WRITE_INTERVAL', 60)
+        return (time.monotonic() - self._synced_at < interval
+                and self._serialize(data) == self._synced_payload)
+
+    def load(self):
+        data = self._load_from_front()
+        if data is None:
+            data = super().load()
+            if self.session_key is not None:
+                self._remember(data)
+        return data
+
+    async def aload(self):
+        data = self._load_from_front()
+        if data is None:
+            data = await super().aload()
+            if self.session_key is not None:
+                self._remember(data)
+        return data
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if not must_create and self._is_unchanged(data):
+            return
+        super().save(must_create=must_create)
+        self._remember(data)
+
+    async def asave(self, must_create=False):
+        if self.session_key is None:
+            return await self.acreate()
+        data = await self._aget_session(no_load=must_create)
+        if not must_create and self._is_unchanged(data):
+            return
+        await super().asave(must_create=must_create)
+        self._remember(data)
+
+    def delete(self, session_key=None):
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            front_cache.delete(session_key)
+        super().delete(session_key)
+
+    async def adelete(self, session_key=None):
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            front_cache.delete(session_key)
+        await super().adelete(session_key)
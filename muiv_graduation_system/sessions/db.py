@@ -0,0 +1,36 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends import db
+from django.utils import timezone
+
+from . import TieredSessionMixin
+
+
+class SessionStore(TieredSessionMixin, db.SessionStore):
+    """Сессии в БД с кешем в памяти процесса"""
+
+    @classmethod
+    def clear_expired(cls):
+        """
+        Удаление истёкших сессий пачками по SESSION_CLEANUP_BATCH_SIZE.
+
+        Вызывается командой clearsessions. Короткие DELETE по первичному ключу
+        не держат долгих блокировок на django_session, в отличие от одного
+        DELETE по всей таблице.
+        """
+        model = cls.get_model_class()
+        batch_size = getattr(settings, 'SESSION_CLEANUP_BATCH_SIZE', 1000)
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+
+    @classmethod
+    async def aclear_expired(cls):
+        return await sync_to_async(cls.clear_expired)()
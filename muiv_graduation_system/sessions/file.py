@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import file
+
+from . import TieredSessionMixin
+
+
+class SessionStore(TieredSessionMixin, file.SessionStore):
+    """Сессии в файлах с кешем в памяти процесса"""
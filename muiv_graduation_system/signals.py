@@ -1,8 +1,17 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_migrate, post_save
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 
-from muiv_graduation_system.models import Employer
+from muiv_graduation_system.caching import bump_all_graduate_cards, bump_graduate_card, reset_unread_feedback_count
+from muiv_graduation_system.documents import remove_session_file, schedule_blob_cleanup
+from muiv_graduation_system.metrics import LOGINS
+from muiv_graduation_system.models import (
+    ChangeEvent, Document, Employer, EmploymentStatus, Faculty, Feedback, Graduate, Employment, Specialization,
+    UploadSession
+)
+from muiv_graduation_system.outbox import record_change
 
 User = get_user_model()
 
@@ -16,6 +25,75 @@ def set_admin_permissions(sender, instance, created, **kwargs):
             instance.save(update_fields=['is_superuser', 'is_staff'])
 
 
+@receiver([post_save, post_delete], sender=Employer)
+@receiver([post_save, post_delete], sender=Faculty)
+@receiver([post_save, post_delete], sender=Specialization)
+def reset_reference_cache(sender, **kwargs):
+    """Сброс кеша «название → id» при изменении или удалении записи справочника"""
+    sender.objects.clear_cache()
+
+
+@receiver(post_save, sender=Graduate)
+@receiver(post_save, sender=Employment)
+@receiver(post_save, sender=Employer)
+def record_saved(sender, instance, created, raw=False, **kwargs):
+    """Событие журнала изменений в транзакции save() (см. ChangeTrackedModel)"""
+    if not raw:
+        record_change(instance, ChangeEvent.CREATED if created else ChangeEvent.UPDATED)
+
+
+@receiver(post_delete, sender=Graduate)
+@receiver(post_delete, sender=Employment)
+@receiver(post_delete, sender=Employer)
+def record_deleted(sender, instance, **kwargs):
+    """Удаление (в том числе каскадное) — в транзакции Collector"""
+    record_change(instance, ChangeEvent.DELETED)
+
+
+@receiver(post_delete, sender=Document)
+def remove_document_file(sender, instance, **kwargs):
+    """Файл хранилища удаляется вместе с последним ссылающимся на него документом"""
+    schedule_blob_cleanup(instance)
+
+
+@receiver(post_delete, sender=UploadSession)
+def remove_upload_file(sender, instance, **kwargs):
+    """Временный файл загрузки по частям (отмена, истечение, удаление пользователя)"""
+    transaction.on_commit(lambda: remove_session_file(instance))
+
+
+@receiver([post_save, post_delete], sender=Graduate)
+def reset_graduate_card(sender, instance, **kwargs):
+    """
+    Новая версия закешированной карточки выпускника — после фиксации: иначе
+    параллельный запрос возьмёт новую версию, прочитает старые данные и
+    закеширует их под новым ключом (pk запоминаем сразу — после delete() он None)
+    """
+    graduate_id = instance.pk
+    transaction.on_commit(lambda: bump_graduate_card(graduate_id))
+
+
+@receiver([post_save, post_delete], sender=Employment)
+def reset_employment_card(sender, instance, **kwargs):
+    graduate_id = instance.graduate_id
+    transaction.on_commit(lambda: bump_graduate_card(graduate_id))
+
+
+@receiver([post_save, post_delete], sender=Employer)
+@receiver([post_save, post_delete], sender=EmploymentStatus)
+@receiver([post_save, post_delete], sender=Faculty)
+@receiver([post_save, post_delete], sender=Specialization)
+def reset_all_cards(sender, **kwargs):
+    """Название работодателя, статуса или факультета есть во многих карточках — сбрасываем все"""
+    transaction.on_commit(bump_all_graduate_cards)
+
+
+@receiver([post_save, post_delete], sender=Feedback)
+def reset_feedback_counter(sender, **kwargs):
+    """Счётчик непрочитанных пересчитывается после фиксации изменения"""
+    transaction.on_commit(reset_unread_feedback_count)
+
+
 @receiver(post_migrate)
 def init_demo_data(sender, **kwargs):
     if sender.name != 'muiv_graduation_system':
@@ -59,8 +137,8 @@ def init_demo_data(sender, **kwargs):
             user=grad_user,
             full_name="Иванов Иван Иванович",
             graduation_year=2024,
-            faculty="Факультет информационных технологий",
-            specialization="Бизнес-информатика",
+            faculty_id=Faculty.objects.id_for_name("Факультет информационных технологий"),
+            specialization_id=Specialization.objects.id_for_name("Бизнес-информатика"),
             phone="+79001234567",
             email="graduate@muiv.ru"
         )
@@ -143,3 +221,9 @@ def init_demo_data(sender, **kwargs):
             Employer.objects.create(**employer_data)
 
     print("✅ Демо-данные успешно созданы")
+
+
+@receiver(user_logged_in)
+def count_login(sender, **kwargs):
+    """Счётчик успешных входов для /metrics"""
+    LOGINS.inc()
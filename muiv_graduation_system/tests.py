@@ -1,3 +1,1692 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import warnings
+from unittest import mock
+from collections import namedtuple
+from datetime import timedelta
+from types import SimpleNamespace
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import admin
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections
+from django.db.models import QuerySet
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from . import async_views, urls as app_urls
+from .backends import ROLE_SESSION_KEY
+from .caching import (
+    bump_graduate_card, bump_reference_generation, graduate_card_versions, reset_unread_feedback_count,
+    unread_feedback_count
+)
+from .checks import check_shared_cache_versions
+from .importers import GraduateImporter, ImportFormatError, iter_import_rows
+from .documents import blob_path, documents_root, save_document, start_upload, temp_file, write_chunk
+from .middleware import REPLICA_PIN_COOKIE, PrecompressedStaticMiddleware
+from .models import (
+    User, Graduate, ChangeEvent, ChangeFeedCursor, Employer, Employment, EmploymentStatus, Document, DocumentBlob,
+    Faculty, Feedback, Report, RegistrationRequest, Role, UploadSession
+)
+from .outbox import compact
+from .routers import REPLICA_ALIAS
+from .services import (
+    UNCHANGED, approve_registration_requests, bulk_update_employment, feedback_cursor, feedback_page, merge_employers
+)
+from .sessions import front_cache
+from .sessions.db import SessionStore
+
+
+# ========================
+# БЮДЖЕТ SQL-ЗАПРОСОВ
+# ========================
+# Каждый маршрут из urls.py и каждый changelist админки выполняется на двух
+# объёмах данных. Число запросов не должно зависеть от объёма (нет N+1)
+# и не должно превышать бюджета из QUERY_BUDGETS.
+
+DATA_SIZES = (5, 40)
+
+# role: None — аноним, иначе логин демо-пользователя ('graduate' — последний
+# сгенерированный выпускник). kwargs, data и headers — функции от фикстур объёма.
+Case = namedtuple(
+    'Case', ['name', 'url_name', 'role', 'method', 'kwargs', 'data', 'headers'], defaults=('get', None, None, None)
+)
+
+CHANGE_FEED_TOKEN = 'query-budget-token'
+
+CASES = [
+    Case('index', 'index', None),
+    Case('about', 'about', None),
+    Case('contacts', 'contacts', None),
+    Case('feedback', 'feedback', None),
+    Case('feedback[post]', 'feedback', 'graduate', 'post',
+         data=lambda fx: {'subject': 'Вопрос', 'message': f'Сообщение {fx.size}'}),
+    Case('feedback[post, guest]', 'feedback', None, 'post',
+         data=lambda fx: {'email': f'guest{fx.size}@example.ru', 'subject': 'Вопрос', 'message': 'Текст'}),
+    Case('login', 'login', None),
+    Case('login[post]', 'login', None, 'post',
+         data=lambda fx: {'username': fx.graduate.user.username, 'password': 'load12345'}),
+    Case('logout', 'logout', 'manager'),
+    Case('register', 'register', None),
+    Case('register_as', 'register_as', None, kwargs=lambda fx: {'role': 'graduate'}),
+    Case('register_as[post, graduate]', 'register_as', None, 'post',
+         kwargs=lambda fx: {'role': 'graduate'},
+         data=lambda fx: {
+             'last_name': 'Новый', 'first_name': 'Выпускник', 'graduation_year': '2024',
+             'email': f'new{fx.size}@example.ru', 'username': f'new{fx.size}', 'password': 'pass12345',
+         }),
+    Case('register_as[post, manager]', 'register_as', None, 'post',
+         kwargs=lambda fx: {'role': 'manager'},
+         data=lambda fx: {
+             'username': f'newmgr{fx.size}', 'email': f'newmgr{fx.size}@example.ru',
+             'password': 'pass12345', 'full_name': 'Новый Менеджер',
+         }),
+    Case('activate_account', 'activate_account', None, kwargs=lambda fx: fx.activation),
+    Case('activate_account[post]', 'activate_account', None, 'post',
+         kwargs=lambda fx: fx.activation,
+         data=lambda fx: {'password': 'Activated-12345', 'password_confirm': 'Activated-12345'}),
+    Case('profile[graduate]', 'profile', 'graduate'),
+    Case('profile[manager]', 'profile', 'manager'),
+    Case('profile[admin]', 'profile', 'admin'),
+    Case('edit_graduate', 'edit_graduate', 'graduate'),
+    Case('edit_graduate[post]', 'edit_graduate', 'graduate', 'post',
+         data=lambda fx: {
+             'full_name': 'Изменённый Выпускник', 'graduation_year': '2020', 'email': fx.graduate.email,
+             'faculty': 'Факультет управления', 'specialization': 'Менеджмент', 'phone': '+79000000000',
+             'employment_status': fx.status.id, 'employer_name': f'ООО «Работа {fx.size}»', 'job_title': 'Аналитик',
+             'salary': '90000', 'start_date': '2021-09-01',
+         }),
+    Case('export_my_data_docx', 'export_my_data_docx', 'graduate'),
+    Case('my_documents', 'my_documents', 'graduate'),
+    Case('upload_document[post]', 'upload_document', 'graduate', 'post',
+         data=lambda fx: {'doc_type': 'resume', 'file': SimpleUploadedFile(f'cv{fx.size}.pdf', b'%PDF cv')}),
+    Case('download_document', 'download_document', 'graduate', kwargs=lambda fx: {'document_id': fx.document.id}),
+    Case('download_document[manager]', 'download_document', 'manager',
+         kwargs=lambda fx: {'document_id': fx.document.id}),
+    Case('start_upload[post]', 'start_upload', 'graduate', 'post',
+         data=lambda fx: {'filename': 'scan.pdf', 'size': 1024, 'doc_type': 'diploma'}),
+    Case('upload_chunk', 'upload_chunk', 'graduate', kwargs=lambda fx: {'upload_id': fx.upload.pk}),
+    Case('upload_chunk[put]', 'upload_chunk', 'graduate', 'put',
+         kwargs=lambda fx: {'upload_id': fx.upload.pk}, data=lambda fx: b'scan',
+         headers=lambda fx: {'Upload-Offset': '0', 'Upload-Checksum': hashlib.sha256(b'scan').hexdigest()}),
+    Case('finish_upload[post]', 'finish_upload', 'graduate', 'post',
+         kwargs=lambda fx: {'upload_id': fx.finished_upload.pk}),
+    Case('manager_graduates', 'manager_graduates', 'manager'),
+    Case('edit_graduate_by_manager', 'edit_graduate_by_manager', 'manager',
+         kwargs=lambda fx: {'grad_id': fx.graduate.id}),
+    Case('edit_graduate_by_manager[post]', 'edit_graduate_by_manager', 'manager', 'post',
+         kwargs=lambda fx: {'grad_id': fx.graduate.id},
+         data=lambda fx: {
+             'full_name': 'Изменён Менеджером', 'graduation_year': '2019', 'email': fx.graduate.email,
+             'faculty': 'Факультет управления', 'specialization': 'Менеджмент', 'phone': '+79000000001',
+             'employment_status': fx.status.name, 'employer_name': f'АО «Работа {fx.size}»',
+         }),
+    Case('bulk_update_graduates[post]', 'bulk_update_graduates', 'manager', 'post',
+         data=lambda fx: {'scope': 'all', 'query': '', 'status_id': fx.status.id}),
+    Case('search_graduates', 'search_graduates', 'manager', data=lambda fx: {'query': 'ов'}),
+    Case('export_search_results[docx]', 'export_search_results', 'manager',
+         kwargs=lambda fx: {'format': 'docx'}, data=lambda fx: {'query': 'ов'}),
+    Case('export_search_results[xlsx]', 'export_search_results', 'manager',
+         kwargs=lambda fx: {'format': 'xlsx'}, data=lambda fx: {'query': 'ов'}),
+    Case('reports', 'reports', 'manager'),
+    Case('admin_users', 'admin_users', 'admin'),
+    Case('admin_create_user', 'admin_create_user', 'admin'),
+    Case('admin_create_user[post]', 'admin_create_user', 'admin', 'post',
+         data=lambda fx: {
+             'username': f'created{fx.size}', 'email': f'created{fx.size}@example.ru',
+             'password': 'pass12345', 'role_id': fx.manager.role_id,
+         }),
+    Case('pending_requests', 'pending_requests', 'admin'),
+    Case('pending_requests[post]', 'pending_requests', 'admin', 'post',
+         data=lambda fx: {'request_ids': [fx.pending[1].id]}),
+    Case('approve_request[post]', 'approve_request', 'admin', 'post',
+         kwargs=lambda fx: {'request_id': fx.pending[0].id}),
+    Case('feedback_inbox', 'feedback_inbox', 'admin', data=lambda fx: {'q': 'сообщ'}),
+    Case('feedback_inbox[all, before]', 'feedback_inbox', 'admin',
+         data=lambda fx: {'show': 'all', 'before': feedback_cursor(fx.feedback[0])}),
+    Case('feedback_inbox[post]', 'feedback_inbox', 'admin', 'post',
+         data=lambda fx: {'feedback_ids': [f.id for f in fx.feedback], 'action': 'read'}),
+    Case('rate_limit_stats', 'rate_limit_stats', 'admin'),
+    Case('change_feed', 'change_feed', None, data=lambda fx: {'since': 1, 'limit': 100},
+         headers=lambda fx: {'Authorization': f'Bearer {CHANGE_FEED_TOKEN}'}),
+] + [
+    Case(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist',
+         f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist', 'admin')
+    for model in admin.site._registry
+]
+
+QUERY_BUDGETS = {
+    'index': 0,
+    'about': 0,
+    'contacts': 0,
+    'feedback': 0,
+    'feedback[post]': 3,
+    'feedback[post, guest]': 2,
+    'login': 0,
+    'login[post]': 9,
+    'logout': 4,
+    'register': 0,
+    'register_as': 0,
+    'register_as[post, graduate]': 6,
+    'register_as[post, manager]': 3,
+    'activate_account': 1,
+    'activate_account[post]': 2,
+    'profile[graduate]': 4,
+    'profile[manager]': 2,
+    'profile[admin]': 5,
+    'edit_graduate': 9,
+    'edit_graduate[post]': 19,
+    'export_my_data_docx': 6,
+    'my_documents': 4,
+    'upload_document[post]': 7,
+    'download_document': 3,
+    'download_document[manager]': 3,
+    'start_upload[post]': 7,
+    'upload_chunk': 3,
+    'upload_chunk[put]': 5,
+    'finish_upload[post]': 12,
+    'manager_graduates': 5,
+    'edit_graduate_by_manager': 9,
+    'edit_graduate_by_manager[post]': 16,
+    'bulk_update_graduates[post]': 12,
+    'search_graduates': 5,
+    'export_search_results[docx]': 5,
+    'export_search_results[xlsx]': 5,
+    'reports': 2,
+    'admin_users': 4,
+    'admin_create_user': 3,
+    'admin_create_user[post]': 7,
+    'pending_requests': 4,
+    'pending_requests[post]': 10,
+    'approve_request[post]': 11,
+    'feedback_inbox': 3,
+    'feedback_inbox[all, before]': 3,
+    'feedback_inbox[post]': 3,
+    'rate_limit_stats': 2,
+    'change_feed': 7,
+}
+
+ADMIN_CHANGELIST_BUDGET = 8
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    # Сессия читается из БД на каждом запросе — число запросов не зависит от кеша
+    SESSION_FRONT_CACHE_TTL=0,
+    RATE_LIMITS={},
+    SERVER_TIMING_SAMPLE_RATE=0,
+    CHANGE_FEED_CONSUMERS={'budget': CHANGE_FEED_TOKEN},
+)
+class QueryBudgetTests(TestCase):
+    """Число SQL-запросов каждого маршрута и changelist не растёт с объёмом данных"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Отчёты пишутся в BASE_DIR/static/reports
+        work_dir = tempfile.mkdtemp(prefix='query_budget_')
+        cls.addClassCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        cls.enterClassContext(override_settings(BASE_DIR=work_dir, DOCUMENTS_ROOT=os.path.join(work_dir, 'documents')))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.results = {case.name: [] for case in CASES}
+        for size in DATA_SIZES:
+            fixtures = cls._seed(size)
+            for case in CASES:
+                cls.results[case.name].append(cls._measure(case, fixtures))
+
+    @classmethod
+    def _seed(cls, size):
+        """Догенерация данных до size выпускников; фикстуры для маршрутов"""
+        missing = size - Graduate.objects.count()
+        with open(os.devnull, 'w') as devnull:
+            call_command(
+                'generate_load_data', graduates=missing, employers=missing, feedback=missing,
+                prefix=f'qc{size}', stdout=devnull,
+            )
+
+        admin_user = User.objects.get(username='admin')
+        graduates = list(Graduate.objects.select_related('user', 'employment').order_by('-id')[:missing])
+        Document.objects.bulk_create([
+            Document(graduate=g, filename=f'{g.id}.pdf', filepath=f'docs/{g.id}.pdf', doc_type='diploma')
+            for g in graduates
+        ])
+        Report.objects.bulk_create([
+            Report(title=f'Отчёт {g.id}', generated_by=g.user, format='xlsx', filepath=f'reports/{g.id}.xlsx')
+            for g in graduates
+        ])
+        RegistrationRequest.objects.bulk_create([
+            RegistrationRequest(
+                username=f'req{size}_{i}', email=f'req{size}_{i}@example.ru', password_hash='!',
+                full_name='Заявитель', is_approved=i % 2 == 1, approved_by=admin_user if i % 2 else None,
+            ) for i in range(missing + 4)
+        ])
+
+        # У выпускника есть запись о трудоустройстве — ветки формы одинаковы на всех объёмах
+        graduate = next(g for g in graduates if hasattr(g, 'employment'))
+        inactive = next(g for g in graduates if g != graduate).user
+        inactive.set_unusable_password()
+        inactive.save(update_fields=['password'])
+
+        content = f'diploma {size}'.encode()
+        with temp_file() as f:
+            f.write(content)
+        document, _ = save_document(
+            graduate, f'diploma{size}.pdf', f.name, hashlib.sha256(content).hexdigest(), len(content), 'diploma'
+        )
+
+        finished_upload = start_upload(graduate.user, 'ready.pdf', 4)
+        write_chunk(graduate.user, finished_upload.pk, 0, io.BytesIO(b'scan'), 4)
+        return SimpleNamespace(
+            size=size,
+            graduate=graduate,
+            document=document,
+            upload=start_upload(graduate.user, 'scan.pdf', 4),
+            finished_upload=finished_upload,
+            manager=User.objects.get(username='manager'),
+            admin=admin_user,
+            status=EmploymentStatus.objects.order_by('id').first(),
+            pending=list(RegistrationRequest.objects.filter(
+                username__startswith=f'req{size}_', is_approved=False
+            ).order_by('id')[:2]),
+            feedback=list(Feedback.objects.filter(is_read=False).order_by('-created_at', '-id')[:2]),
+            activation={
+                'uidb64': urlsafe_base64_encode(force_bytes(inactive.pk)),
+                'token': default_token_generator.make_token(inactive),
+            },
+        )
+
+    @classmethod
+    def _measure(cls, case, fx):
+        client = Client()
+        if case.role:
+            user = fx.graduate.user if case.role == 'graduate' else getattr(fx, case.role)
+            client.force_login(user)
+            # Роль уже в сессии, как после первого запроса: меряется установившийся режим
+            session = client.session
+            session[ROLE_SESSION_KEY] = [user.role_id, user.role.name]
+            session.save()
+        # Счётчик непрочитанной обратной связи (меню администратора) уже в кеше
+        reset_unread_feedback_count()
+        unread_feedback_count()
+
+        url = reverse(
+            case.url_name if case.url_name.startswith('admin:') else f'muiv_graduation_system:{case.url_name}',
+            kwargs=case.kwargs(fx) if case.kwargs else None,
+        )
+        data = case.data(fx) if case.data else None
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, case.method)(url, data, headers=case.headers(fx) if case.headers else None)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        response.close()
+        return response.status_code, len(queries)
+
+    def test_every_url_is_covered(self):
+        covered = {case.url_name for case in CASES}
+        for pattern in app_urls.urlpatterns:
+            with self.subTest(url=pattern.name):
+                self.assertIn(pattern.name, covered, 'Добавьте маршрут в CASES и QUERY_BUDGETS')
+
+    def test_responses_succeed(self):
+        for name, results in self.results.items():
+            for size, (status, _) in zip(DATA_SIZES, results):
+                with self.subTest(case=name, size=size):
+                    self.assertIn(status, (200, 201, 302))
+
+    def test_query_count_does_not_grow_with_data(self):
+        for name, results in self.results.items():
+            counts = [count for _, count in results]
+            with self.subTest(case=name):
+                self.assertEqual(len(set(counts)), 1, f'Запросов при {DATA_SIZES}: {counts}')
+
+    def test_query_count_within_budget(self):
+        for name, results in self.results.items():
+            budget = QUERY_BUDGETS.get(name, ADMIN_CHANGELIST_BUDGET if name.startswith('admin:') else None)
+            with self.subTest(case=name):
+                self.assertIsNotNone(budget, 'Не задан бюджет запросов')
+                self.assertLessEqual(max(count for _, count in results), budget)
+
+
+# ========================
+# ASGI: ЦЕПОЧКА MIDDLEWARE
+# ========================
+
+@override_settings(DEBUG=True, SERVER_TIMING_SAMPLE_RATE=1, RATE_LIMITS={})
+class AsyncMiddlewareChainTests(TestCase):
+    """Под ASGI ни одно middleware не переводит цепочку в sync_to_async"""
+
+    async def test_chain_is_not_adapted(self):
+        # При DEBUG Django пишет в django.request о каждой адаптации
+        # (и о MiddlewareNotUsed — поэтому лог не пустой)
+        with self.assertLogs('django.request', 'DEBUG') as logs, \
+                self.assertLogs('muiv_graduation_system.timing', 'INFO'):
+            response = await AsyncClient().get(reverse('muiv_graduation_system:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Server-Timing', response)
+        self.assertEqual([line for line in logs.output if 'adapted for middleware' in line], [])
+
+    def test_static_middleware_is_async_capable(self):
+        # При DEBUG = True это middleware отключается, проверяем его отдельно
+        async def get_response(request):
+            return None
+
+        with override_settings(DEBUG=False, STATIC_ROOT=tempfile.gettempdir()):
+            self.assertTrue(iscoroutinefunction(PrecompressedStaticMiddleware(get_response)))
+
+
+# ========================
+# ASGI: АСИНХРОННЫЕ ПРЕДСТАВЛЕНИЯ
+# ========================
+# urls.py выбирает асинхронные классы по настройкам при импорте, поэтому
+# тесты подключают их своим urlconf: ROOT_URLCONF = этот модуль.
+
+ASYNC_VIEWS = {
+    'login': async_views.AsyncLoginView,
+    'register_as': async_views.AsyncRegisterAsView,
+    'admin_create_user': async_views.AsyncAdminCreateUserView,
+    'profile': async_views.AsyncProfileView,
+    'manager_graduates': async_views.AsyncManagerGraduatesView,
+    'search_graduates': async_views.AsyncSearchGraduatesView,
+}
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include(([
+        path(str(pattern.pattern), ASYNC_VIEWS[pattern.name].as_view(), name=pattern.name)
+        if pattern.name in ASYNC_VIEWS else pattern
+        for pattern in app_urls.urlpatterns
+    ], 'muiv_graduation_system'))),
+]
+
+async_urls = override_settings(ROOT_URLCONF=__name__, RATE_LIMITS={})
+
+
+@async_urls
+class AsyncAuthViewsTests(TestCase):
+    """Вход, регистрация и создание пользователя асинхронными представлениями"""
+
+    def test_async_views_are_mounted(self):
+        for name, view in ASYNC_VIEWS.items():
+            with self.subTest(view=name):
+                url = reverse(f'muiv_graduation_system:{name}', kwargs={'role': 'graduate'} if name == 'register_as' else None)
+                self.assertIs(resolve(url).func.view_class, view)
+
+    async def test_login(self):
+        url = reverse('muiv_graduation_system:login')
+        response = await self.async_client.post(url, {'username': 'graduate', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Неверный логин или пароль')
+
+        response = await self.async_client.post(url, {'username': 'graduate', 'password': 'grad123'})
+        self.assertRedirects(response, reverse('muiv_graduation_system:profile'), fetch_redirect_response=False)
+        response = await self.async_client.get(url)
+        self.assertRedirects(response, reverse('muiv_graduation_system:profile'), fetch_redirect_response=False)
+
+    async def test_register_graduate(self):
+        url = reverse('muiv_graduation_system:register_as', kwargs={'role': 'graduate'})
+        data = {
+            'last_name': 'Новиков', 'first_name': 'Илья', 'email': 'novikov@example.ru',
+            'username': 'novikov', 'password': 'pass12345',
+        }
+        for year in ('', 'двадцать', '1990'):
+            with self.subTest(year=year):
+                response = await self.async_client.post(url, {**data, 'graduation_year': year})
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Год выпуска должен быть числом')
+        self.assertFalse(await User.objects.filter(username='novikov').aexists())
+
+        response = await self.async_client.post(url, {**data, 'graduation_year': ' 2024 '})
+        self.assertRedirects(response, reverse('muiv_graduation_system:login'), fetch_redirect_response=False)
+        graduate = await Graduate.objects.select_related('user').aget(user__username='novikov')
+        self.assertEqual((graduate.full_name, graduate.graduation_year), ('Новиков Илья', 2024))
+        self.assertTrue(graduate.user.check_password('pass12345'))
+
+        response = await self.async_client.post(url, {**data, 'graduation_year': '2024'})
+        self.assertContains(response, 'Логин занят')
+
+    async def test_register_manager_request(self):
+        url = reverse('muiv_graduation_system:register_as', kwargs={'role': 'manager'})
+        data = {'username': 'newmgr', 'email': 'newmgr@example.ru', 'password': 'pass12345', 'full_name': 'Новый'}
+        response = await self.async_client.post(url, data)
+        self.assertRedirects(response, reverse('muiv_graduation_system:index'), fetch_redirect_response=False)
+        self.assertTrue(await RegistrationRequest.objects.filter(username='newmgr', is_approved=False).aexists())
+
+        response = await self.async_client.post(url, data)
+        self.assertContains(response, 'Логин или email уже используется')
+
+    async def test_admin_create_user(self):
+        url = reverse('muiv_graduation_system:admin_create_user')
+        manager_role = await Role.objects.aget(name='manager')
+        graduate_role = await Role.objects.aget(name='graduate')
+        data = {'username': 'created', 'email': 'created@example.ru', 'password': 'pass12345'}
+
+        await self.async_client.aforce_login(await User.objects.aget(username='manager'))
+        response = await self.async_client.post(url, {**data, 'role_id': manager_role.pk})
+        self.assertRedirects(response, reverse('muiv_graduation_system:index'), fetch_redirect_response=False)
+
+        await self.async_client.aforce_login(await User.objects.aget(username='admin'))
+        self.assertEqual((await self.async_client.get(url)).status_code, 200)
+        for role_id in ('', 'x', graduate_role.pk, 10 ** 6):
+            with self.subTest(role_id=role_id):
+                response = await self.async_client.post(url, {**data, 'role_id': role_id})
+                self.assertContains(response, 'Выберите роль')
+        self.assertFalse(await User.objects.filter(username='created').aexists())
+
+        response = await self.async_client.post(url, {**data, 'role_id': manager_role.pk})
+        self.assertRedirects(response, reverse('muiv_graduation_system:admin_users'), fetch_redirect_response=False)
+        user = await User.objects.aget(username='created')
+        self.assertEqual(user.role_id, manager_role.pk)
+
+
+@async_urls
+@override_settings(SHARED_CACHE_VERSIONS=True)
+class AsyncReadViewsTests(TestCase):
+    """Списки, поиск и профиль асинхронными представлениями: страницы и 304"""
+
+    def setUp(self):
+        cache.clear()
+
+    @sync_to_async
+    def save_graduate(self):
+        # Соединение с БД у потока sync_to_async своё: on_commit ловим там же
+        with self.captureOnCommitCallbacks(execute=True):
+            Graduate.objects.get(user__username='graduate').save()
+
+    async def get(self, username, url_name, **kwargs):
+        await self.async_client.aforce_login(await User.objects.aget(username=username))
+        url = reverse(f'muiv_graduation_system:{url_name}')
+        await self.async_client.get(url, kwargs)  # первый ответ ставит CSRF-cookie, она входит в ETag
+        response = await self.async_client.get(url, kwargs)
+        self.assertEqual(response.status_code, 200)
+        return url, response
+
+    async def test_list_and_search(self):
+        for url_name, query in (('manager_graduates', {}), ('search_graduates', {'query': 'Иванов Иван'})):
+            with self.subTest(url=url_name):
+                url, response = await self.get('manager', url_name, **query)
+                self.assertContains(response, 'Иванов Иван')
+                total = 1 if query else min(await Graduate.objects.acount(), 25)
+                self.assertEqual(len(response.context['graduates']), total)
+                etag = response['ETag']
+                revalidated = await self.async_client.get(url, query, headers={'If-None-Match': etag})
+                self.assertEqual(revalidated.status_code, 304)
+
+                await self.save_graduate()
+                response = await self.async_client.get(url, query, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    async def test_bad_page_is_404(self):
+        url, _ = await self.get('manager', 'manager_graduates')
+        for page in ('abc', '999'):
+            with self.subTest(page=page):
+                self.assertEqual((await self.async_client.get(url, {'page': page})).status_code, 404)
+
+    async def test_list_forbidden_for_graduate(self):
+        await self.async_client.aforce_login(await User.objects.aget(username='graduate'))
+        response = await self.async_client.get(reverse('muiv_graduation_system:manager_graduates'))
+        self.assertRedirects(response, reverse('muiv_graduation_system:index'), fetch_redirect_response=False)
+
+    async def test_graduate_profile_validators(self):
+        url, response = await self.get('graduate', 'profile')
+        self.assertContains(response, 'Иванов Иван')
+        self.assertIn('Last-Modified', response)
+        self.assertEqual((await self.async_client.get(url, headers={'If-None-Match': response['ETag']})).status_code, 304)
+        response = await self.async_client.get(url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_other_profiles_without_validators(self):
+        for username in ('manager', 'admin'):
+            with self.subTest(username=username):
+                _, response = await self.get(username, 'profile')
+                self.assertNotIn('ETag', response)
+                self.assertNotIn('Last-Modified', response)
+        self.assertEqual(response.context['stats']['total_graduates'], await Graduate.objects.acount())
+
+    async def test_profile_requires_login(self):
+        response = await self.async_client.get(reverse('muiv_graduation_system:profile'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('muiv_graduation_system:login'), response['Location'])
+
+
+# ========================
+# ИМПОРТ ВЫПУСКНИКОВ
+# ========================
+
+IMPORT_HEADER = ['ФИО', 'Год выпуска', 'Email', 'Статус', 'Работодатель', 'Зарплата', 'Дата начала работы']
+
+
+def _csv_file(rows, delimiter=';'):
+    text = '\n'.join(delimiter.join(str(cell) for cell in row) for row in rows)
+    return io.BytesIO(text.encode('utf-8-sig'))
+
+
+def _xlsx_file(rows):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    for row in rows:
+        wb.active.append(row)
+    out = io.BytesIO()
+    wb.save(out)
+    out.seek(0)
+    return out
+
+
+class ImportParsingTests(SimpleTestCase):
+    """Разбор файлов импорта: заголовки, разделители, форматы"""
+
+    def test_csv_header_found_after_title_rows(self):
+        fileobj = _csv_file([
+            ['Выгрузка выпускников', '', ''], ['', '', ''], ['фио', 'email', 'год'], ['Иванов Иван', 'a@b.ru', '2020'],
+        ])
+        self.assertEqual(
+            list(iter_import_rows(fileobj, 'list.CSV')),
+            [(4, {'full_name': 'Иванов Иван', 'email': 'a@b.ru', 'graduation_year': '2020'})],
+        )
+
+    def test_csv_comma_delimiter_and_empty_rows(self):
+        fileobj = _csv_file([['full_name', 'graduation_year', 'email'], ['', '', ''], ['Петров', '2021', 'p@b.ru']], ',')
+        self.assertEqual([number for number, _ in iter_import_rows(fileobj, 'list.csv')], [3])
+
+    def test_xlsx_values_keep_types(self):
+        fileobj = _xlsx_file([IMPORT_HEADER[:3], ['Сидорова Анна', 2022, 's@b.ru']])
+        (number, row), = iter_import_rows(fileobj, 'list.xlsx')
+        self.assertEqual(number, 2)
+        self.assertEqual(row['graduation_year'], 2022)
+
+    def test_rejected_files(self):
+        with self.assertRaises(ImportFormatError):
+            iter_import_rows(io.BytesIO(b''), 'list.xls')
+        with self.assertRaises(ImportFormatError):
+            list(iter_import_rows(_csv_file([['Имя', 'Почта'], ['Иванов', 'a@b.ru']]), 'list.csv'))
+
+
+class GraduateImportTests(TestCase):
+    """Импорт пачками: созданные записи и ошибки по номерам строк"""
+
+    def run_import(self, rows, filename='list.csv', **kwargs):
+        fileobj = _xlsx_file(rows) if filename.endswith('.xlsx') else _csv_file(rows)
+        with self.captureOnCommitCallbacks(execute=True):
+            return GraduateImporter(**kwargs).run(fileobj, filename)
+
+    def test_rows_created_with_employment(self):
+        result = self.run_import([
+            IMPORT_HEADER,
+            ['Иванов Иван', '2020', 'Ivanov@Example.ru', 'трудоустроен', 'ООО «Ромашка»', '120 000', '01.09.2020'],
+            ['Петров Пётр', '2021', 'petrov@example.ru', '', '', '', ''],
+            ['Сидоров Сидор', '2021', 'sidorov@example.ru', 'трудоустроен', 'ооо ромашка', '', '2021-02-01'],
+        ], batch_size=2, with_activations=True)
+
+        self.assertEqual((result.created, result.errors), (3, []))
+        self.assertEqual(len(result.activations), 3)
+        ivanov = Graduate.objects.select_related('employment__employer', 'user').get(email='ivanov@example.ru')
+        self.assertEqual(ivanov.user.username, 'ivanov@example.ru')
+        self.assertFalse(ivanov.user.has_usable_password())
+        self.assertEqual(ivanov.employment.salary, 120000)
+        self.assertEqual(ivanov.employment.start_date.isoformat(), '2020-09-01')
+        self.assertEqual(Employer.objects.filter(normalized_name='ооо ромашка').count(), 1)
+        self.assertFalse(Employment.objects.filter(graduate__email='petrov@example.ru').exists())
+        self.assertEqual(
+            ChangeEvent.objects.filter(entity='graduate', object_id=ivanov.pk, action=ChangeEvent.CREATED).count(), 1
+        )
+
+    def test_row_errors_reported_by_line(self):
+        existing = Graduate.objects.get(user__username='graduate').user.email
+        result = self.run_import([
+            IMPORT_HEADER,
+            ['', '2020', 'a@example.ru'],
+            ['Иванов', 'двадцатый', 'b@example.ru'],
+            ['Иванов', '1990', 'c@example.ru'],
+            ['Иванов', '2020', 'не-почта'],
+            ['Иванов', '2020', 'd@example.ru', '', '', 'много'],
+            ['Иванов', '2020', 'e@example.ru', '', '', '', '31.02.2020'],
+            ['Иванов', '2020', existing],
+            ['Иванов', '2020', 'f@example.ru', 'на пенсии'],
+            ['Иванов', '2020', 'g@example.ru'],
+            ['Иванов', '2020', 'G@example.ru'],
+        ], filename='list.xlsx')
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.errors], [2, 3, 4, 5, 6, 7, 8, 9, 11])
+        self.assertIn('уже используется', dict(result.errors)[8])
+        self.assertIn('на пенсии', dict(result.errors)[9])
+
+    def test_concurrent_registration_fails_only_its_row(self):
+        role = Role.objects.get(name='graduate')
+        save = GraduateImporter._save
+        raced = []
+
+        def racing_save(importer, rows):
+            # Email занят параллельной регистрацией между проверкой и транзакцией пачки
+            if not raced:
+                raced.append(User.objects.create(username='petrov', email='petrov@example.ru', role=role))
+            return save(importer, rows)
+
+        with mock.patch.object(GraduateImporter, '_save', autospec=True, side_effect=racing_save):
+            result = self.run_import([
+                IMPORT_HEADER,
+                ['Иванов Иван', '2020', 'ivanov@example.ru', 'трудоустроен', '', '', ''],
+                ['Петров Пётр', '2021', 'petrov@example.ru', '', '', '', ''],
+                ['Сидоров Сидор', '2021', 'sidorov@example.ru', '', '', '', ''],
+            ], with_activations=True)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([number for number, _ in result.errors], [3])
+        self.assertIn('уже заняты', result.errors[0][1])
+        self.assertEqual([username for username, *_ in result.activations], ['ivanov@example.ru', 'sidorov@example.ru'])
+        self.assertEqual(set(Graduate.objects.filter(graduation_year__in=[2020, 2021], email__endswith='@example.ru')
+                             .values_list('email', flat=True)), {'ivanov@example.ru', 'sidorov@example.ru'})
+        self.assertTrue(Employment.objects.filter(graduate__email='ivanov@example.ru').exists())
+        self.assertFalse(Graduate.objects.filter(user=raced[0]).exists())
+
+
+# ========================
+# ЗАЯВКИ МЕНЕДЖЕРОВ
+# ========================
+
+class ApproveRegistrationRequestsTests(TestCase):
+    """Массовое одобрение: занятые логины и email пропускаются, заявки остаются в ожидании"""
+
+    def setUp(self):
+        self.admin = User.objects.get(username='admin')
+        for username, email in (('mgr1', 'mgr1@example.ru'), ('mgr2', 'mgr2@example.ru'),
+                                ('graduate', 'free@example.ru'), ('mgr3', 'graduate@example.ru')):
+            RegistrationRequest.objects.create(username=username, email=email, password_hash='x',
+                                               full_name=f'Фамилия {username}')
+        User.objects.filter(username='graduate').update(email='graduate@example.ru')
+
+    def assert_pending(self, *usernames):
+        self.assertEqual(
+            set(RegistrationRequest.objects.filter(is_approved=False).values_list('username', flat=True)),
+            set(usernames),
+        )
+
+    def test_taken_username_or_email_skipped(self):
+        result = approve_registration_requests(RegistrationRequest.objects.all(), self.admin)
+
+        self.assertEqual(sorted(result.approved), ['mgr1', 'mgr2'])
+        self.assertEqual(sorted(result.skipped), ['graduate', 'mgr3'])
+        self.assert_pending('graduate', 'mgr3')
+        user = User.objects.select_related('role').get(username='mgr1')
+        self.assertEqual((user.role.name, user.last_name, user.first_name, user.password), ('manager', 'Фамилия', 'mgr1', 'x'))
+        self.assertEqual(RegistrationRequest.objects.get(username='mgr1').approved_by, self.admin)
+        self.assertEqual(approve_registration_requests(RegistrationRequest.objects.all(), self.admin), ([], ['graduate', 'mgr3']))
+
+    def test_concurrent_registration_leaves_request_pending(self):
+        graduate_role = Role.objects.get(name='graduate')
+        bulk_create = QuerySet.bulk_create
+
+        def racing_bulk_create(queryset, objs, *args, **kwargs):
+            # Логин занят параллельной регистрацией между проверкой и INSERT
+            if queryset.model is User:
+                User.objects.create(username='mgr2', email='race@example.ru', role=graduate_role)
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=racing_bulk_create):
+            result = approve_registration_requests(RegistrationRequest.objects.filter(username__startswith='mgr'), self.admin)
+
+        self.assertEqual(result.approved, ['mgr1'])
+        self.assertEqual(sorted(result.skipped), ['mgr2', 'mgr3'])
+        self.assert_pending('graduate', 'mgr2', 'mgr3')
+        self.assertEqual(User.objects.get(username='mgr2').email, 'race@example.ru')
+
+    def test_bulk_approve_view(self):
+        self.client.force_login(self.admin)
+        url = reverse('muiv_graduation_system:pending_requests')
+        ids = list(RegistrationRequest.objects.filter(username__in=['mgr1', 'mgr3']).values_list('id', flat=True))
+        response = self.client.post(url, {'request_ids': ids}, follow=True)
+        self.assertContains(response, 'Менеджер mgr1 успешно добавлен')
+        self.assertContains(response, 'заявки пропущены: 1')
+        self.assert_pending('graduate', 'mgr2', 'mgr3')
+
+        self.client.post(url, {'approve_all': '1'})
+        self.assert_pending('graduate', 'mgr3')
+
+
+# ========================
+# РАБОТОДАТЕЛИ
+# ========================
+
+class EmployerUpsertMergeTests(TestCase):
+    """Работодатель по названию создаётся один раз, дубли сливаются"""
+
+    def setUp(self):
+        Employer.objects.clear_cache()
+
+    def test_names_resolved_to_one_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = Employer.objects.ids_for_names(['ООО «Ромашка»', '  ооо   ромашка ', 'ООО "РОМАШКА"', '', 'Лютик'])
+        self.assertEqual(len(set(ids.values())), 2)
+        self.assertNotIn('', ids)
+        self.assertEqual(Employer.objects.get(pk=ids['Лютик']).name, 'Лютик')
+        self.assertEqual(ChangeEvent.objects.filter(
+            entity='employer', object_id__in=ids.values(), action=ChangeEvent.CREATED
+        ).count(), 2)
+
+        count = Employer.objects.count()
+        self.assertEqual(Employer.objects.id_for_name('ооо ромашка'), ids['ООО «Ромашка»'])
+        self.assertEqual(Employer.objects.count(), count)
+
+    def test_duplicate_name_rejected_by_validation(self):
+        Employer.objects.create(name='ООО «Ромашка»')
+        with self.assertRaises(ValidationError):
+            Employer(name='ооо ромашка').full_clean()
+        with self.assertRaises(IntegrityError):
+            Employer.objects.create(name='ООО Ромашка')
+
+    def test_merge_moves_employments_and_fills_contacts(self):
+        target = Employer.objects.create(name='Ромашка')
+        duplicate = Employer.objects.create(name='Ромашка (филиал)', phone='+7 900 000-00-00', email='hr@example.ru')
+        graduate = Graduate.objects.get(user__username='graduate')
+        Employment.objects.update_or_create(graduate=graduate, defaults={'employer': duplicate})
+
+        self.assertEqual(merge_employers(target, [target, duplicate]), 1)
+
+        target.refresh_from_db()
+        self.assertEqual((target.phone, target.email), ('+7 900 000-00-00', 'hr@example.ru'))
+        self.assertFalse(Employer.objects.filter(pk=duplicate.pk).exists())
+        self.assertEqual(Employment.objects.get(graduate=graduate).employer_id, target.pk)
+        self.assertTrue(ChangeEvent.objects.filter(
+            entity='employment', object_id=graduate.employment.pk, action=ChangeEvent.UPDATED,
+            payload__employer_id=target.pk,
+        ).exists())
+
+    def test_merge_without_duplicates(self):
+        target = Employer.objects.create(name='Ромашка')
+        self.assertEqual(merge_employers(target, [target]), 0)
+
+
+# ========================
+# МАССОВОЕ ИЗМЕНЕНИЕ ТРУДОУСТРОЙСТВА
+# ========================
+
+class BulkUpdateEmploymentTests(TestCase):
+    """UNCHANGED — поле не трогать, None — очистить; недостающие Employment создаются"""
+
+    def setUp(self):
+        self.employer = Employer.objects.create(name='Ромашка')
+        self.status, self.other_status = EmploymentStatus.objects.order_by('id')[:2]
+        self.employed = Graduate.objects.get(user__username='graduate')
+        Employment.objects.update_or_create(graduate=self.employed, defaults={
+            'status': self.status, 'employer': self.employer, 'job_title': 'Инженер',
+        })
+        user = User.objects.create(username='other', email='other@example.ru', role=self.employed.user.role)
+        self.unemployed = Graduate.objects.create(user=user, full_name='Петров Пётр', graduation_year=2020,
+                                                  email='other@example.ru')
+        Employment.objects.filter(graduate=self.unemployed).delete()
+        self.graduates = Graduate.objects.filter(pk__in=[self.employed.pk, self.unemployed.pk])
+
+    def employment(self, graduate):
+        return Employment.objects.filter(graduate=graduate).values('status_id', 'employer_id', 'job_title').first()
+
+    def test_status_only_keeps_employer_and_creates_missing(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            result = bulk_update_employment(self.graduates, status_id=self.other_status.pk)
+        self.assertEqual(result, (1, 1))
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.employment(self.employed),
+                         {'status_id': self.other_status.pk, 'employer_id': self.employer.pk, 'job_title': 'Инженер'})
+        self.assertEqual(self.employment(self.unemployed),
+                         {'status_id': self.other_status.pk, 'employer_id': None, 'job_title': None})
+        self.assertEqual(ChangeEvent.objects.filter(entity='employment', action=ChangeEvent.CREATED,
+                                                    payload__graduate_id=self.unemployed.pk).count(), 1)
+
+    def test_none_clears_without_creating(self):
+        self.assertEqual(bulk_update_employment(self.graduates, employer_id=None), (1, 0))
+        self.assertEqual(self.employment(self.employed),
+                         {'status_id': self.status.pk, 'employer_id': None, 'job_title': 'Инженер'})
+        self.assertIsNone(self.employment(self.unemployed))
+
+    def test_nothing_to_change(self):
+        self.assertEqual(bulk_update_employment(self.graduates, status_id=UNCHANGED, employer_id=UNCHANGED), (0, 0))
+        self.assertIsNone(self.employment(self.unemployed))
+
+    def test_view(self):
+        self.client.force_login(User.objects.get(username='manager'))
+        url = reverse('muiv_graduation_system:bulk_update_graduates')
+
+        response = self.client.post(url, {'graduate_ids': [self.unemployed.pk], 'status_id': 'abc'}, follow=True)
+        self.assertContains(response, 'статус трудоустройства не найден')
+        response = self.client.post(url, {'graduate_ids': [self.unemployed.pk]}, follow=True)
+        self.assertContains(response, 'Укажите статус или работодателя')
+        self.assertIsNone(self.employment(self.unemployed))
+
+        response = self.client.post(url, {'scope': 'all', 'query': 'Петров', 'employer_name': ' ромашка '}, follow=True)
+        self.assertContains(response, 'Обновлено записей о трудоустройстве: 0, создано новых: 1')
+        self.assertEqual(self.employment(self.unemployed)['employer_id'], self.employer.pk)
+
+        self.client.post(url, {'graduate_ids': [self.employed.pk, self.unemployed.pk], 'status_id': 'clear'})
+        self.assertEqual(Employment.objects.filter(graduate__in=self.graduates, status__isnull=True).count(), 2)
+        self.assertEqual(self.employment(self.employed)['employer_id'], self.employer.pk)
+
+
+# ========================
+# ОГРАНИЧЕНИЕ ЧАСТОТЫ ЗАПРОСОВ
+# ========================
+
+@override_settings(RATE_LIMITS={'feedback': {'ip': '2/m', 'email': '1/h'}})
+class RateLimitTests(TestCase):
+    """429 и Retry-After при превышении лимита по адресу или полю формы"""
+
+    def post(self, email, ip='10.0.0.1', **headers):
+        return self.client.post(
+            reverse('muiv_graduation_system:feedback'),
+            {'email': email, 'subject': 'Вопрос', 'message': f'Текст от {email}'},
+            REMOTE_ADDR=ip, headers=headers,
+        )
+
+    def assert_limited(self, response, max_retry_after):
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= max_retry_after)
+
+    def check_limits(self):
+        self.assertEqual(self.post('a@example.ru').status_code, 302)
+        self.assert_limited(self.post('a@example.ru', ip='10.0.0.2'), 3600)
+        self.assertEqual(self.post('b@example.ru').status_code, 302)
+        self.assert_limited(self.post('c@example.ru'), 60)
+        self.assertEqual(self.post('d@example.ru', ip='10.0.0.3').status_code, 302)
+        self.assertEqual(self.client.get(reverse('muiv_graduation_system:feedback')).status_code, 200)
+
+    def test_process_buckets(self):
+        self.check_limits()
+
+    @override_settings(RATE_LIMIT_CACHE='default')
+    def test_shared_cache_buckets(self):
+        cache.clear()
+        self.check_limits()
+
+    @override_settings(RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_client_ip_from_proxy_header(self):
+        # Прокси разные, клиент один
+        for email, proxy in (('a@example.ru', '10.0.0.1'), ('b@example.ru', '10.0.0.2')):
+            self.assertEqual(self.post(email, proxy, **{'X-Forwarded-For': f'192.0.2.1, {proxy}'}).status_code, 302)
+        self.assert_limited(self.post('c@example.ru', '10.0.0.3', **{'X-Forwarded-For': '192.0.2.1'}), 60)
+        self.assertEqual(self.post('d@example.ru', '10.0.0.3', **{'X-Forwarded-For': '192.0.2.2'}).status_code, 302)
+
+
+# ========================
+# СЕССИИ: КЕШ В ПАМЯТИ ПРОЦЕССА
+# ========================
+
+@override_settings(SESSION_FRONT_CACHE_TTL=10, SESSION_WRITE_INTERVAL=60)
+class SessionFrontCacheTests(TestCase):
+    """Чтение сессии через кеш процесса, сброс при удалении, пропуск записи без изменений"""
+
+    def setUp(self):
+        front_cache.clear()
+        self.addCleanup(front_cache.clear)
+        session = SessionStore()
+        session['role'] = 'graduate'
+        session.save()
+        self.key = session.session_key
+
+    def change_in_storage(self):
+        # Запись другого воркера: кеш этого процесса о ней не знает
+        Session.objects.filter(pk=self.key).update(session_data=SessionStore().encode({'role': 'manager'}))
+
+    def test_read_from_front_cache_within_ttl(self):
+        self.change_in_storage()
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.key)['role'], 'graduate')
+
+    @override_settings(SESSION_FRONT_CACHE_TTL=0)
+    def test_storage_read_without_front_cache(self):
+        self.change_in_storage()
+        self.assertEqual(SessionStore(self.key)['role'], 'manager')
+
+    def test_delete_invalidates_front_cache(self):
+        SessionStore(self.key).delete()
+        self.assertNotIn('role', SessionStore(self.key))
+
+    def test_unchanged_session_not_rewritten(self):
+        session = SessionStore(self.key)
+        session.load()
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_session_written_through(self):
+        session = SessionStore(self.key)
+        session['role'] = 'admin'
+        session.save()
+        front_cache.clear()
+        self.assertEqual(SessionStore(self.key)['role'], 'admin')
+
+    @override_settings(SESSION_FRONT_CACHE_SIZE=2)
+    def test_front_cache_is_bounded(self):
+        for key in ('a', 'b', 'c'):
+            front_cache.set(key, key)
+        self.assertIsNone(front_cache.get('a'))
+        self.assertIsNone(front_cache.get(self.key))
+        self.assertEqual(front_cache.get('c')[0], 'c')
+
+
+# ========================
+# ЧТЕНИЕ С РЕПЛИКИ
+# ========================
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Страницы из REPLICA_READ_VIEWS читают с реплики, запись ставит cookie,
+    и с ней браузер читает только основную БД. Реплика — TEST MIRROR основной
+    БД: отдельное соединение, поэтому тест транзакционный.
+    """
+    serialized_rollback = True
+
+    @classmethod
+    def setUpClass(cls):
+        replica = {**connections['default'].settings_dict}
+        replica['TEST'] = {**replica['TEST'], 'MIRROR': 'default'}
+        connections.settings[REPLICA_ALIAS] = replica
+        cls.addClassCleanup(cls._drop_replica)
+        # Псевдоним появляется только здесь: проверки test runner не должны его искать
+        cls.databases = {'default', REPLICA_ALIAS}
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # «Overriding setting DATABASES…»
+            cls.enterClassContext(override_settings(
+                DATABASES={**settings.DATABASES, REPLICA_ALIAS: replica},
+                DATABASE_ROUTERS=['muiv_graduation_system.routers.ReplicaRouter'],
+                RATE_LIMITS={},
+            ))
+        super().setUpClass()
+
+    @classmethod
+    def _drop_replica(cls):
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.get(username='manager'))
+
+    def get(self, url_name):
+        with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica, \
+                CaptureQueriesContext(connections['default']) as primary:
+            response = self.client.get(reverse(f'muiv_graduation_system:{url_name}'))
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in replica], [q['sql'] for q in primary]
+
+    def test_listed_views_read_from_replica(self):
+        response, replica, primary = self.get('manager_graduates')
+        self.assertTrue(any('graduate' in sql for sql in replica))
+        self.assertFalse(any('graduate' in sql for sql in primary))
+        # Сессия — только с основной БД
+        self.assertFalse(any('django_session' in sql for sql in replica))
+        self.assertTrue(any('django_session' in sql for sql in primary))
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+        _, replica, _ = self.get('profile')
+        self.assertEqual(replica, [])
+
+    def test_write_pins_reads_to_primary(self):
+        graduate = Graduate.objects.get(user__username='graduate')
+        status = EmploymentStatus.objects.order_by('-id').first()
+        with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            response = self.client.post(reverse('muiv_graduation_system:bulk_update_graduates'), {
+                'graduate_ids': [graduate.pk], 'status_id': status.pk,
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(replica), 0)
+        self.assertEqual(response.cookies[REPLICA_PIN_COOKIE]['max-age'], settings.REPLICA_STICKY_SECONDS)
+        self.assertEqual(Employment.objects.get(graduate=graduate).status_id, status.pk)
+
+        response, replica, primary = self.get('manager_graduates')
+        self.assertEqual(replica, [])
+        self.assertTrue(any('graduate' in sql for sql in primary))
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+        # Cookie истекла — чтение снова с реплики
+        del self.client.cookies[REPLICA_PIN_COOKIE]
+        _, replica, _ = self.get('search_graduates')
+        self.assertTrue(replica)
+
+
+# ========================
+# ЛЕНТА ИЗМЕНЕНИЙ
+# ========================
+
+@override_settings(CHANGE_FEED_CONSUMERS={'crm': 'crm-token', 'bi': 'bi-token'}, CHANGE_FEED_RETENTION_DAYS=30)
+class ChangeFeedTests(TestCase):
+    """Порядок выдачи, подтверждение и очистка журнала"""
+
+    def setUp(self):
+        self.since = self.fetch('crm')['next']
+
+    def fetch(self, consumer, since=0, limit=100, expected_status=200):
+        response = self.client.get(
+            reverse('muiv_graduation_system:change_feed'), {'since': since, 'limit': limit},
+            headers={'Authorization': f'Bearer {consumer}-token'},
+        )
+        self.assertEqual(response.status_code, expected_status)
+        return response.json()
+
+    def event(self, pk, object_id):
+        return ChangeEvent.objects.create(id=pk, entity='employer', object_id=object_id, action=ChangeEvent.UPDATED)
+
+    def test_late_committed_event_is_delivered(self):
+        self.event(10 ** 6, object_id=2)
+        first = self.fetch('crm', self.since)
+        self.assertEqual([e['object_id'] for e in first['events']], [2])
+
+        # Транзакция с меньшим id зафиксирована после выдачи события с большим id
+        self.event(10 ** 6 - 1, object_id=1)
+        second = self.fetch('crm', first['next'])
+
+        self.assertEqual([e['object_id'] for e in second['events']], [1])
+        self.assertGreater(second['events'][0]['sequence'], first['next'])
+
+    def test_paging(self):
+        for object_id in range(3):
+            self.event(10 ** 6 + object_id, object_id)
+
+        page = self.fetch('crm', self.since, limit=2)
+        self.assertEqual([e['object_id'] for e in page['events']], [0, 1])
+        self.assertTrue(page['has_more'])
+        page = self.fetch('crm', page['next'], limit=2)
+        self.assertEqual([e['object_id'] for e in page['events']], [2])
+        self.assertFalse(page['has_more'])
+
+    def test_acknowledged_by_all_consumers_is_compacted(self):
+        self.event(10 ** 6, object_id=1)
+        position = self.fetch('crm', self.since)['next']
+        self.fetch('crm', position)
+        self.assertEqual(compact(), 0)  # bi ещё ничего не подтвердил
+
+        self.fetch('bi', position)
+        self.assertEqual(ChangeFeedCursor.objects.get(consumer='bi').position, position)
+        self.assertGreater(compact(), 0)
+        self.assertFalse(ChangeEvent.objects.filter(position__lte=position).exists())
+
+    def test_acknowledgement_does_not_go_back(self):
+        position = self.since
+        self.fetch('crm', position)
+        self.fetch('crm', 1)
+        self.assertEqual(ChangeFeedCursor.objects.get(consumer='crm').position, position)
+
+    def test_expired_events_are_compacted(self):
+        old = self.event(10 ** 6, object_id=1)
+        ChangeEvent.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=31))
+        fresh = self.event(10 ** 6 + 1, object_id=2)
+
+        compact()
+
+        self.assertFalse(ChangeEvent.objects.filter(pk=old.pk).exists())
+        self.assertTrue(ChangeEvent.objects.filter(pk=fresh.pk).exists())
+
+    def test_rejected_requests(self):
+        self.fetch('unknown', expected_status=401)
+        response = self.client.get(
+            reverse('muiv_graduation_system:change_feed'), {'since': 'x'},
+            headers={'Authorization': 'Bearer crm-token'},
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+# ========================
+# КЕШ «НАЗВАНИЕ → ID» СПРАВОЧНИКОВ
+# ========================
+
+class ReferenceIdCacheTests(TestCase):
+    """Кеш id справочников в памяти процесса не переживает правку из другого воркера"""
+
+    def setUp(self):
+        cache.clear()
+        Employer.objects.clear_cache()
+        Faculty.objects.clear_cache()
+
+    def lookup(self, model, name):
+        # В кеш id попадают после фиксации транзакции
+        with self.captureOnCommitCallbacks(execute=True):
+            return model.objects.id_for_name(name)
+
+    def rename_elsewhere(self, model, pk):
+        # Правка в другом воркере: сигналы этого процесса её не видят
+        model.objects.filter(pk=pk).update(normalized_name='переименовано')
+
+    @override_settings(SHARED_CACHE_VERSIONS=True)
+    def test_cached_until_generation_changes(self):
+        for model in (Employer, Faculty):
+            with self.subTest(model=model.__name__):
+                first = self.lookup(model, 'ООО «Ромашка»')
+                self.rename_elsewhere(model, first)
+                self.assertEqual(self.lookup(model, 'ООО Ромашка'), first)
+
+                bump_reference_generation(model._meta.label_lower)
+                self.assertNotEqual(self.lookup(model, 'ООО Ромашка'), first)
+
+    @override_settings(SHARED_CACHE_VERSIONS=True)
+    def test_generation_changes_after_commit(self):
+        employer_id = self.lookup(Employer, 'ООО Ромашка')
+        with self.captureOnCommitCallbacks(execute=True):
+            Employer.objects.filter(pk=employer_id).delete()
+            Employer.objects.clear_cache()
+            # Другой воркер, прочитавший поколение до фиксации, кеширует ещё старые данные
+            type(Employer.objects)._id_cache['ооо ромашка'] = employer_id
+        self.assertNotEqual(self.lookup(Employer, 'ООО Ромашка'), employer_id)
+
+    @override_settings(SHARED_CACHE_VERSIONS=False)
+    def test_not_cached_without_shared_cache(self):
+        first = self.lookup(Employer, 'ООО Ромашка')
+        self.rename_elsewhere(Employer, first)
+        self.assertNotEqual(self.lookup(Employer, 'ООО Ромашка'), first)
+
+
+# ========================
+# КЕШ КАРТОЧЕК ВЫПУСКНИКОВ
+# ========================
+
+class GraduateCardCacheTests(TestCase):
+    """Карточки кешируются только при общем для воркеров кеше версий"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.get(username='manager'))
+        self.graduate = Graduate.objects.get(user__username='graduate')
+        self.url = reverse('muiv_graduation_system:manager_graduates')
+
+    def rename(self):
+        # update() не отправляет сигналов — версия карточки остаётся прежней
+        Graduate.objects.filter(pk=self.graduate.pk).update(full_name='Новое Имя')
+
+    @override_settings(SHARED_CACHE_VERSIONS=True)
+    def test_card_cached_until_version_changes(self):
+        self.assertContains(self.client.get(self.url), self.graduate.full_name)
+        self.rename()
+        self.assertNotContains(self.client.get(self.url), 'Новое Имя')
+
+        bump_graduate_card(self.graduate.pk)
+        self.assertContains(self.client.get(self.url), 'Новое Имя')
+
+    @override_settings(SHARED_CACHE_VERSIONS=True)
+    def test_version_changes_after_commit(self):
+        for change in (
+            lambda: self.graduate.save(),
+            lambda: Employment.objects.update_or_create(graduate=self.graduate, defaults={'job_title': 'Аналитик'}),
+            lambda: EmploymentStatus.objects.first().save(),
+        ):
+            before = graduate_card_versions([self.graduate.pk])
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+                # До фиксации параллельный запрос должен видеть прежнюю версию
+                self.assertEqual(graduate_card_versions([self.graduate.pk]), before)
+            self.assertNotEqual(graduate_card_versions([self.graduate.pk]), before)
+
+    @override_settings(SHARED_CACHE_VERSIONS=False)
+    def test_not_cached_without_shared_cache(self):
+        self.client.get(self.url)
+        self.rename()
+        self.assertContains(self.client.get(self.url), 'Новое Имя')
+
+    def test_deploy_check_rejects_process_cache(self):
+        with override_settings(SHARED_CACHE_VERSIONS=True):
+            errors = check_shared_cache_versions(None)
+        self.assertEqual([e.id for e in errors], ['muiv_graduation_system.E001'])
+        with override_settings(SHARED_CACHE_VERSIONS=False):
+            self.assertEqual(check_shared_cache_versions(None), [])
+
+
+# ========================
+# УСЛОВНЫЕ GET (ETag)
+# ========================
+
+class ConditionalGetTests(TestCase):
+    """304 по ETag только при общем для воркеров кеше версий"""
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_revalidated(self, username, url_name, expected):
+        self.client.force_login(User.objects.get(username=username))
+        url = reverse(f'muiv_graduation_system:{url_name}')
+        self.client.get(url)  # первый ответ ставит CSRF-cookie, она входит в ETag
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers.get('ETag')
+        self.assertEqual(etag is not None, expected == 304)
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag or '*x'}).status_code, expected)
+
+    @override_settings(SHARED_CACHE_VERSIONS=True)
+    def test_not_modified_with_shared_cache(self):
+        self.assert_revalidated('manager', 'manager_graduates', 304)
+        self.assert_revalidated('graduate', 'profile', 304)
+
+    @override_settings(SHARED_CACHE_VERSIONS=True)
+    def test_etag_served_during_transaction_expires_on_commit(self):
+        graduate = Graduate.objects.get(user__username='graduate')
+        status = EmploymentStatus.objects.first()
+        import_file = _csv_file([IMPORT_HEADER[:3], ['Новиков Илья', '2022', 'novikov@example.ru']])
+        for username, url_name, change in (
+            ('manager', 'manager_graduates', lambda: graduate.save()),
+            ('manager', 'manager_graduates', lambda: GraduateImporter().run(import_file, 'list.csv')),
+            # Переименование статуса меняет только поколение карточек
+            ('graduate', 'profile', lambda: status.save()),
+        ):
+            with self.subTest(url=url_name):
+                self.client.force_login(User.objects.get(username=username))
+                url = reverse(f'muiv_graduation_system:{url_name}')
+                self.client.get(url)
+                with self.captureOnCommitCallbacks(execute=True):
+                    change()
+                    # Запрос между изменением и фиксацией
+                    etag = self.client.get(url)['ETag']
+                self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    @override_settings(SHARED_CACHE_VERSIONS=False)
+    def test_no_validators_without_shared_cache(self):
+        self.assert_revalidated('manager', 'manager_graduates', 200)
+        self.assert_revalidated('graduate', 'profile', 200)
+
+
+# ========================
+# ДОСТУП К /metrics
+# ========================
+
+@override_settings(
+    METRICS_TOKEN='metrics-token', METRICS_ALLOWED_IPS=['10.0.0.5'], RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR',
+)
+class MetricsAccessTests(TestCase):
+    """Запросы через локальный прокси (REMOTE_ADDR 127.0.0.1) не получают метрики без токена"""
+
+    def test_local_proxy_address_is_not_trusted(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 403)
+
+    def test_wrong_token_is_rejected(self):
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer wrong'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_token(self):
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer metrics-token'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_allowed_client_behind_proxy(self):
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='127.0.0.1', headers={'X-Forwarded-For': '10.0.0.5, 127.0.0.1'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+# ========================
+# АДМИНКА
+# ========================
+
+class ReportAdminTests(TestCase):
+    """Список отчётов с записями (generated_by_link читает только generated_by)"""
+
+    def test_changelist_links_author(self):
+        admin_user = User.objects.get(username='admin')
+        Report.objects.create(title='Отчёт', generated_by=admin_user, format='xlsx', filepath='reports/1.xlsx')
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse('admin:muiv_graduation_system_report_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse('admin:muiv_graduation_system_user_change', args=[admin_user.id]))
+
+
+# ========================
+# ГОСТЕВАЯ ОБРАТНАЯ СВЯЗЬ
+# ========================
+
+class GuestFeedbackTests(TestCase):
+    """Сообщение гостя записывается сразу, повтор отсеивается"""
+
+    def test_written_immediately_and_deduplicated(self):
+        url = reverse('muiv_graduation_system:feedback')
+        data = {'email': 'Guest@Example.ru', 'subject': 'Вопрос', 'message': 'Как  обновить место работы?'}
+
+        self.assertEqual(self.client.post(url, data).status_code, 302)
+        self.assertEqual(self.client.post(url, {**data, 'message': 'как обновить  место работы?'}).status_code, 302)
+
+        feedback = Feedback.objects.get()
+        self.assertIsNone(feedback.user_id)
+        self.assertEqual(feedback.email, 'guest@example.ru')
+
+
+# ========================
+# ВХОДЯЩИЕ ОБРАТНОЙ СВЯЗИ
+# ========================
+
+class FeedbackPagingTests(TestCase):
+    """Постраничный просмотр по курсору (created_at, id) без пропусков и повторов"""
+
+    def setUp(self):
+        Feedback.objects.all().delete()
+        user = User.objects.get(username='graduate')
+        self.items = [Feedback.objects.create(user=user, subject='Вопрос', message=str(i)) for i in range(5)]
+        # Одинаковое время у части сообщений: порядок внутри секунды задаёт id
+        same_time = self.items[0].created_at
+        Feedback.objects.filter(pk__in=[f.pk for f in self.items[1:4]]).update(created_at=same_time)
+        self.expected = list(Feedback.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def test_pages_cover_all_items_once(self):
+        seen = []
+        cursor = None
+        while True:
+            items, cursor = feedback_page(Feedback.objects.all(), cursor, per_page=2)
+            seen.extend(item.id for item in items)
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_last_full_page_has_no_cursor(self):
+        items, cursor = feedback_page(Feedback.objects.all(), per_page=5)
+        self.assertEqual((len(items), cursor), (5, None))
+
+    def test_invalid_cursor_returns_first_page(self):
+        items, _ = feedback_page(Feedback.objects.all(), 'не-курсор', per_page=2)
+        self.assertEqual([item.id for item in items], self.expected[:2])
+
+    def test_inbox_view_pages(self):
+        self.client.force_login(User.objects.get(username='admin'))
+        url = reverse('muiv_graduation_system:feedback_inbox')
+        first = self.client.get(url, {'show': 'all'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([f.id for f in first.context['feedback_list']], self.expected)
+        self.assertIsNone(first.context['next_cursor'])
+
+        before = feedback_cursor(Feedback.objects.get(pk=self.expected[1]))
+        second = self.client.get(url, {'show': 'all', 'before': before})
+        self.assertEqual([f.id for f in second.context['feedback_list']], self.expected[2:])
+        self.assertFalse(second.context['is_first_page'])
+
+
+# ========================
+# ХРАНИЛИЩЕ ДОКУМЕНТОВ
+# ========================
+
+def _received_file(content):
+    """Временный файл, как после приёма загрузки: (путь, sha256)"""
+    with temp_file() as f:
+        f.write(content)
+    return f.name, hashlib.sha256(content).hexdigest()
+
+
+class DocumentStorageTests(TestCase):
+    """Общий файл содержимого: создание, повторное использование и удаление под блокировкой"""
+
+    @classmethod
+    def setUpClass(cls):
+        work_dir = tempfile.mkdtemp(prefix='documents_')
+        cls.addClassCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        cls.enterClassContext(override_settings(DOCUMENTS_ROOT=work_dir))
+        super().setUpClass()
+
+    def setUp(self):
+        self.graduate = Graduate.objects.get(user__username='graduate')
+        other = User.objects.create(username='other', email='other@example.ru', role=self.graduate.user.role)
+        self.other = Graduate.objects.create(user=other, full_name='Петров Пётр', graduation_year=2020,
+                                             email='other@example.ru')
+
+    def save(self, graduate, content=b'diploma'):
+        path, sha256 = _received_file(content)
+        return save_document(graduate, 'diploma.pdf', path, sha256, len(content), 'diploma')
+
+    def test_same_content_is_stored_once(self):
+        first, created = self.save(self.graduate)
+        again, created_again = self.save(self.graduate)
+        shared, _ = self.save(self.other)
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.pk, first.pk)
+        self.assertEqual(shared.filepath, first.filepath)
+        self.assertEqual(DocumentBlob.objects.filter(sha256=first.sha256).count(), 1)
+        self.assertEqual(os.listdir(documents_root() / 'tmp'), [])
+
+    def test_missing_file_is_recreated(self):
+        document, _ = self.save(self.graduate)
+        os.remove(documents_root() / document.filepath)
+
+        again, created = self.save(self.graduate)
+
+        self.assertFalse(created)
+        self.assertTrue((documents_root() / again.filepath).exists())
+
+    def test_file_removed_with_last_document(self):
+        document, _ = self.save(self.graduate)
+        shared, _ = self.save(self.other)
+        path = documents_root() / blob_path(document.sha256)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            document.delete()
+        self.assertTrue(path.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            shared.delete()
+        self.assertFalse(path.exists())
+        self.assertFalse(DocumentBlob.objects.filter(sha256=document.sha256).exists())
+
+    def test_upload_before_cleanup_keeps_file(self):
+        # Удаление зафиксировано, очистка ещё не выполнена, а то же содержимое уже загружают снова
+        document, _ = self.save(self.graduate)
+        with self.captureOnCommitCallbacks() as cleanup:
+            document.delete()
+        uploaded, _ = self.save(self.other)
+
+        for callback in cleanup:
+            callback()
+
+        self.assertTrue((documents_root() / uploaded.filepath).exists())
+
+    def test_one_document_per_content(self):
+        document, _ = self.save(self.graduate)
+        with self.assertRaises(IntegrityError):
+            Document.objects.create(graduate=self.graduate, filename='copy.pdf', filepath=document.filepath,
+                                    sha256=document.sha256)
+
+
+class DocumentDownloadTests(TestCase):
+    """Скачивание: Range, If-Range, 416 и проверка прав"""
+
+    @classmethod
+    def setUpClass(cls):
+        work_dir = tempfile.mkdtemp(prefix='downloads_')
+        cls.addClassCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        cls.enterClassContext(override_settings(DOCUMENTS_ROOT=work_dir, DOCUMENTS_SENDFILE=None))
+        super().setUpClass()
+
+    def setUp(self):
+        graduate = Graduate.objects.get(user__username='graduate')
+        path, sha256 = _received_file(b'0123456789')
+        self.document, _ = save_document(graduate, 'diploma.pdf', path, sha256, 10, 'diploma')
+        self.etag = f'"{sha256}"'
+        self.url = reverse('muiv_graduation_system:download_document', args=[self.document.pk])
+        self.client.force_login(graduate.user)
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_whole_file(self):
+        response, body = self.get()
+        self.assertEqual((response.status_code, body), (200, b'0123456789'))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], self.etag)
+
+    def test_byte_ranges(self):
+        for header, content_range, body in (
+            ('bytes=2-5', 'bytes 2-5/10', b'2345'),
+            ('bytes=7-', 'bytes 7-9/10', b'789'),
+            ('bytes=-3', 'bytes 7-9/10', b'789'),
+            ('bytes=8-100', 'bytes 8-9/10', b'89'),
+        ):
+            with self.subTest(range=header):
+                response, content = self.get(Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'], str(len(body)))
+                self.assertEqual(content, body)
+
+    def test_if_range(self):
+        response, body = self.get(Range='bytes=0-1', **{'If-Range': self.etag})
+        self.assertEqual((response.status_code, body), (206, b'01'))
+        # Файл у клиента другой версии — отдаётся целиком
+        response, body = self.get(Range='bytes=0-1', **{'If-Range': '"old"'})
+        self.assertEqual((response.status_code, body), (200, b'0123456789'))
+
+    def test_unsatisfiable_range(self):
+        for header in ('bytes=10-', 'bytes=5-2'):
+            with self.subTest(range=header):
+                response, _ = self.get(Range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_unsupported_range_returns_whole_file(self):
+        response, body = self.get(Range='bytes=0-1,4-5')
+        self.assertEqual((response.status_code, body), (200, b'0123456789'))
+
+    def test_not_modified(self):
+        response, _ = self.get(**{'If-None-Match': self.etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_foreign_document_is_not_found(self):
+        other = User.objects.create(username='other', email='other@example.ru', role=self.document.graduate.user.role)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(DOCUMENTS_SENDFILE='nginx', DOCUMENTS_ACCEL_PREFIX='/protected/')
+    def test_sendfile_delegated_to_web_server(self):
+        response, body = self.get(Range='bytes=0-1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.document.filepath}')
+        self.assertEqual(body, b'')
+
+
+# ========================
+# ЗАГРУЗКА ПО ЧАСТЯМ
+# ========================
+
+class ResumableUploadTests(TestCase):
+    """Протокол загрузки по частям: смещения, контрольные суммы, захват, срок жизни"""
+
+    @classmethod
+    def setUpClass(cls):
+        work_dir = tempfile.mkdtemp(prefix='uploads_')
+        cls.addClassCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        cls.enterClassContext(override_settings(DOCUMENTS_ROOT=work_dir))
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.get(username='graduate')
+        self.client.force_login(self.user)
+        self.upload = start_upload(self.user, 'scan.pdf', 8)
+
+    def put(self, offset, body, **headers):
+        return self.client.put(
+            reverse('muiv_graduation_system:upload_chunk', args=[self.upload.pk]), body,
+            content_type='application/octet-stream', headers={'Upload-Offset': str(offset), **headers},
+        )
+
+    def offset(self):
+        response = self.client.get(reverse('muiv_graduation_system:upload_chunk', args=[self.upload.pk]))
+        self.assertEqual(response.status_code, 200)
+        return response.json()['offset']
+
+    def finish(self):
+        return self.client.post(reverse('muiv_graduation_system:finish_upload', args=[self.upload.pk]))
+
+    def test_chunks_assembled_into_document(self):
+        self.assertEqual(self.put(0, b'scan', **{'Upload-Checksum': hashlib.sha256(b'scan').hexdigest()}).json(),
+                         {'offset': 4})
+        self.assertEqual(self.put(4, b'.pdf').json(), {'offset': 8})
+
+        response = self.finish()
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()['created'])
+        document = Document.objects.get(pk=response.json()['document_id'])
+        self.assertEqual(document.sha256, hashlib.sha256(b'scan.pdf').hexdigest())
+        self.assertFalse(UploadSession.objects.filter(pk=self.upload.pk).exists())
+
+    def test_offset_mismatch_conflict(self):
+        self.put(0, b'scan')
+        for offset in (0, 6):
+            with self.subTest(offset=offset):
+                response = self.put(offset, b'.p')
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.json()['offset'], 4)
+        self.assertEqual(self.offset(), 4)
+
+    def test_checksum_mismatch_discards_chunk(self):
+        self.put(0, b'scan')
+        response = self.put(4, b'.pdf', **{'Upload-Checksum': hashlib.sha256(b'.doc').hexdigest()})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['offset'], 4)
+        self.assertEqual(self.offset(), 4)
+        self.assertEqual(os.path.getsize(documents_root() / 'tmp' / f'resumable_{self.upload.pk}'), 4)
+
+        # Повтор той же части с верной суммой принимается
+        self.assertEqual(self.put(4, b'.pdf').status_code, 200)
+
+    def test_chunk_beyond_declared_size(self):
+        response = self.put(4, b'.pdf.pdf')
+        self.assertEqual(response.status_code, 409)
+        self.put(0, b'scan')
+        response = self.put(4, b'.pdf.pdf')
+        self.assertEqual((response.status_code, response.json()['offset']), (400, 4))
+
+    def test_upload_claimed_by_another_request(self):
+        UploadSession.objects.filter(pk=self.upload.pk).update(locked_until=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(self.put(0, b'scan').status_code, 409)
+        # Захват упавшего воркера истекает
+        UploadSession.objects.filter(pk=self.upload.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.put(0, b'scan').status_code, 200)
+
+    def test_finish_incomplete_upload(self):
+        self.put(0, b'scan')
+        response = self.finish()
+        self.assertEqual((response.status_code, response.json()['offset']), (409, 4))
+
+    def test_file_checksum_mismatch(self):
+        upload = start_upload(self.user, 'scan.pdf', 4, sha256=hashlib.sha256(b'scan').hexdigest())
+        write_chunk(self.user, upload.pk, 0, io.BytesIO(b'SCAN'), 4)
+        response = self.client.post(reverse('muiv_graduation_system:finish_upload', args=[upload.pk]))
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(UploadSession.objects.filter(pk=upload.pk).exists())
+
+    def test_foreign_upload_not_found(self):
+        other = User.objects.create(username='other', email='other@example.ru', role=self.user.role)
+        Graduate.objects.create(user=other, full_name='Петров Пётр', graduation_year=2020, email='other@example.ru')
+        self.client.force_login(other)
+        self.assertEqual(self.put(0, b'scan').status_code, 404)
+
+    def test_upload_without_graduate_profile(self):
+        url = reverse('muiv_graduation_system:start_upload')
+        Graduate.objects.filter(user=self.user).delete()
+        response = self.client.post(url, {'filename': 'scan.pdf', 'size': 8})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(UploadSession.objects.filter(user=self.user).count(), 1)
+
+        # Профиль удалён, пока шла загрузка
+        self.put(0, b'scan.pdf')
+        self.assertEqual(self.finish().status_code, 404)
+        self.assertEqual(self.offset(), 8)
+
+    def test_expired_upload_is_gone(self):
+        UploadSession.objects.filter(pk=self.upload.pk).update(updated_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(self.put(0, b'scan').status_code, 410)
+        self.assertEqual(
+            self.client.get(reverse('muiv_graduation_system:upload_chunk', args=[self.upload.pk])).status_code, 410
+        )
+        self.assertEqual(
+            self.client.post(reverse('muiv_graduation_system:finish_upload', args=[self.upload.pk])).status_code,
+            410,
+        )
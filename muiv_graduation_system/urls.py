@@ -1,8 +1,31 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'muiv_graduation_system'
 
+# Под ASGI вход и регистрация обслуживаются асинхронными версиями представлений
+if getattr(settings, 'ASYNC_AUTH_VIEWS', False):
+    from . import async_views
+    login_view = async_views.AsyncLoginView
+    register_as_view = async_views.AsyncRegisterAsView
+    admin_create_user_view = async_views.AsyncAdminCreateUserView
+else:
+    login_view = views.LoginView
+    register_as_view = views.RegisterAsView
+    admin_create_user_view = views.AdminCreateUserView
+
+# Списки выпускников и профиль — асинхронные версии с async ORM
+if getattr(settings, 'ASYNC_READ_VIEWS', False):
+    from . import async_views
+    profile_view = async_views.AsyncProfileView
+    manager_graduates_view = async_views.AsyncManagerGraduatesView
+    search_graduates_view = async_views.AsyncSearchGraduatesView
+else:
+    profile_view = views.ProfileView
+    manager_graduates_view = views.ManagerGraduatesView
+    search_graduates_view = views.SearchGraduatesView
+
 urlpatterns = [
     # === Основные страницы ===
     path('', views.IndexView.as_view(), name='index'),
@@ -11,26 +34,45 @@ urlpatterns = [
     path('feedback/', views.FeedbackView.as_view(), name='feedback'),
 
     # === Авторизация ===
-    path('login/', views.LoginView.as_view(), name='login'),
+    path('login/', login_view.as_view(), name='login'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
     path('register/', views.RegisterView.as_view(), name='register'),
-    path('register/<str:role>/', views.RegisterAsView.as_view(), name='register_as'),
+    path('register/<str:role>/', register_as_view.as_view(), name='register_as'),
+    path('activate/<str:uidb64>/<str:token>/', views.ActivateAccountView.as_view(), name='activate_account'),
 
     # === Профиль ===
-    path('profile/', views.ProfileView.as_view(), name='profile'),
+    path('profile/', profile_view.as_view(), name='profile'),
 
     # === Выпускник ===
     path('graduate/edit/', views.EditGraduateView.as_view(), name='edit_graduate'),
     path('graduate/export/docx/', views.ExportMyDataView.as_view(), name='export_my_data_docx'),
+    path('graduate/documents/', views.MyDocumentsView.as_view(), name='my_documents'),
+    path('graduate/documents/upload/', views.UploadDocumentView.as_view(), name='upload_document'),
+    path('graduate/documents/uploads/', views.StartUploadView.as_view(), name='start_upload'),
+    path('graduate/documents/uploads/<uuid:upload_id>/', views.UploadChunkView.as_view(), name='upload_chunk'),
+    path('graduate/documents/uploads/<uuid:upload_id>/finish/', views.FinishUploadView.as_view(), name='finish_upload'),
+    path('documents/<int:document_id>/', views.DownloadDocumentView.as_view(), name='download_document'),
 
     # === Менеджер: выпускники ===
-    path('manager/graduates/', views.ManagerGraduatesView.as_view(), name='manager_graduates'),
+    path('manager/graduates/', manager_graduates_view.as_view(), name='manager_graduates'),
     path('manager/graduates/<int:grad_id>/edit/', views.EditGraduateByManagerView.as_view(), name='edit_graduate_by_manager'),
+    path('manager/graduates/bulk/', views.BulkUpdateGraduatesView.as_view(), name='bulk_update_graduates'),
 
     # === Поиск и экспорт ===
-    path('manager/search/', views.SearchGraduatesView.as_view(), name='search_graduates'),
+    path('manager/search/', search_graduates_view.as_view(), name='search_graduates'),
     path('manager/export/<str:format>/', views.ExportSearchResultsView.as_view(), name='export_search_results'),
 
     # === Отчёты ===
     path('reports/', views.ReportsView.as_view(), name='reports'),
+
+    # === Администратор ===
+    path('panel/users/', views.AdminUsersView.as_view(), name='admin_users'),
+    path('panel/users/create/', admin_create_user_view.as_view(), name='admin_create_user'),
+    path('panel/requests/', views.PendingRequestsView.as_view(), name='pending_requests'),
+    path('panel/requests/<int:request_id>/approve/', views.ApproveRequestView.as_view(), name='approve_request'),
+    path('panel/feedback/', views.FeedbackInboxView.as_view(), name='feedback_inbox'),
+    path('panel/ratelimit/', views.RateLimitStatsView.as_view(), name='rate_limit_stats'),
+
+    # Лента изменений для внешних систем
+    path('api/changes/', views.ChangeFeedView.as_view(), name='change_feed'),
 ]
\ No newline at end of file
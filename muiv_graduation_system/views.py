@@ -1,3 +1,5 @@
+import hashlib
+import hmac
 import os
 import re
 from datetime import datetime
@@ -7,21 +9,40 @@ from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import FileResponse
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.conf import settings
 from django.db.models import Q, Count
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
 from django.views.generic import TemplateView, ListView, FormView, DetailView, UpdateView
-from django.urls import reverse_lazy
-
-
-from docx import Document
-from docx.shared import RGBColor
-from openpyxl import Workbook
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.http import url_has_allowed_host_and_scheme, urlsafe_base64_decode
 
 from .models import (
-    User, Role, Graduate, Employer, Employment, EmploymentStatus,
-    Feedback, Report, RegistrationRequest
+    User, Role, Graduate, Employer, Employment, EmploymentStatus, Faculty, Specialization,
+    Feedback, Report, RegistrationRequest, Document
+)
+from .backends import get_role_name
+from .documents import (
+    ALLOWED_EXTENSIONS, DocumentUploadHandler, UploadError, cancel_upload, document_response, finish_upload,
+    get_upload, start_upload, store_upload, write_chunk
+)
+from .exports import get_export_engine
+from .metrics import observe_report_file, render_metrics, track_report
+from .caching import (
+    card_cache_timeout, graduate_card_versions, graduate_generation, graduate_list_version, versions_shared
+)
+from .middleware import client_ip, rate_limit_counters
+from .outbox import acknowledge, changes_since
+from .services import (
+    approve_registration_requests, bulk_update_employment, feedback_page, mark_feedback, save_guest_feedback,
+    search_feedback, UNCHANGED
 )
 
 
@@ -36,15 +57,74 @@ class RoleRequiredMixin(UserPassesTestMixin):
     def test_func(self):
         if not self.request.user.is_authenticated:
             return False
-        if hasattr(self.request.user, 'role') and self.request.user.role:
-            return self.request.user.role.name in self.allowed_roles
-        return False
+        return get_role_name(self.request) in self.allowed_roles
 
     def handle_no_permission(self):
         messages.error(self.request, "У вас недостаточно прав для доступа к этой странице.")
         return redirect('muiv_graduation_system:index')
 
 
+def _page_state(request):
+    """
+    Общая часть ETag: пользователь и CSRF-cookie (токен зашит в формы страницы).
+    None — есть непоказанные сообщения, ответ 304 их бы потерял.
+    """
+    if len(messages.get_messages(request)):
+        return None
+    return f"{request.user.pk}:{request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')}"
+
+
+def _etag(*parts):
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _graduate_profile_validators(request):
+    """
+    (ETag, Last-Modified) профиля выпускника по одному запросу к updated_at.
+
+    Результат запоминается в request: его используют и etag_func, и last_modified_func.
+    """
+    if not hasattr(request, '_profile_validators'):
+        validators = (None, None)
+        state = _page_state(request) if request.user.is_authenticated else None
+        if state is not None and get_role_name(request) == 'graduate':
+            row = Graduate.objects.filter(user_id=request.user.pk) \
+                .values_list('updated_at', 'employment__updated_at').first()
+            validators = _profile_row_validators(state, row)
+        request._profile_validators = validators
+    return request._profile_validators
+
+
+def _profile_row_validators(state, row):
+    """(ETag, Last-Modified) по строке (Graduate.updated_at, Employment.updated_at)"""
+    # Без общего кеша поколение у каждого воркера своё — ответы без валидаторов
+    if row is None or not versions_shared():
+        return None, None
+    last_modified = max(dt for dt in row if dt is not None)
+    return _etag(state, *row, graduate_generation()), last_modified
+
+
+def _graduate_list_etag(request, *args, **kwargs):
+    """ETag списков выпускников: версия данных + параметры страницы, без запросов к БД"""
+    state = _page_state(request) if request.user.is_authenticated else None
+    if state is None or not versions_shared():
+        return None
+    return _etag(state, graduate_list_version(), request.get_full_path())
+
+
+class GraduateCardCacheMixin:
+    """Версии карточек выпускников текущей страницы для {% cache %} в шаблоне"""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        graduates = context['object_list']
+        versions = graduate_card_versions([grad.id for grad in graduates])
+        for grad in graduates:
+            grad.card_version = versions[grad.id]
+        context['card_cache_timeout'] = card_cache_timeout()
+        return context
+
+
 # ========================
 # ОСНОВНЫЕ СТРАНИЦЫ
 # ========================
@@ -95,7 +175,7 @@ class FeedbackView(View):
             messages.error(request, "Пожалуйста, укажите email.")
             return render(request, self.template_name)
 
-        if not re.match(r"[^@]+@[^@]+\.[^@]+", email):
+        if len(email) > 254 or not re.match(r"[^@]+@[^@]+\.[^@]+", email):
             messages.error(request, "Некорректный адрес email.")
             return render(request, self.template_name)
 
@@ -107,23 +187,8 @@ class FeedbackView(View):
             )
             return render(request, self.template_name)
 
-        # Если email свободен — создаём временного пользователя
-        try:
-            role, _ = Role.objects.get_or_create(name='graduate')
-            username = f"guest_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
-            user = User.objects.create(
-                username=username,
-                email=email,
-                password=make_password('guest123'),
-                role=role
-            )
-        except Exception as e:
-            # На случай, если что-то пошло не так при создании (например, дубль username)
-            messages.error(request, "Не удалось создать временного пользователя. Попробуйте позже.")
-            return render(request, self.template_name)
-
-        # Сохраняем обратную связь
-        Feedback.objects.create(user=user, subject=subject, message=message)
+        # Гостевое сообщение сохраняется без учётной записи — только с email
+        save_guest_feedback(email, subject, message)
         messages.success(request, "Ваше сообщение отправлено! Спасибо за обратную связь.")
         return redirect('muiv_graduation_system:index')
 
@@ -132,6 +197,14 @@ class FeedbackView(View):
 # АВТОРИЗАЦИЯ
 # ========================
 
+def _graduation_year(value):
+    """Год выпуска из формы; None — не число или вне 2000–2030"""
+    value = (value or '').strip()
+    if not value.isdigit() or not 2000 <= int(value) <= 2030:
+        return None
+    return int(value)
+
+
 class LoginView(View):
     """Вход в систему"""
     template_name = 'login.html'
@@ -151,11 +224,10 @@ class LoginView(View):
             login(request, user)
             display_name = user.username
 
-            # Получаем полное имя для выпускника
+            # Профиль выпускника загружен бэкендом тем же запросом
             if user.role and user.role.name == 'graduate':
                 try:
-                    grad = Graduate.objects.get(user=user)
-                    display_name = grad.full_name
+                    display_name = user.graduate_profile.full_name
                 except Graduate.DoesNotExist:
                     pass
 
@@ -175,6 +247,53 @@ class LogoutView(View):
         return redirect('muiv_graduation_system:index')
 
 
+class ActivateAccountView(View):
+    """Активация импортированного аккаунта: установка пароля по ссылке"""
+    template_name = 'activate.html'
+
+    def _get_user(self, uidb64, token):
+        try:
+            user_id = urlsafe_base64_decode(uidb64).decode()
+            user = User.objects.get(pk=user_id)
+        except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+            return None
+        if not default_token_generator.check_token(user, token):
+            return None
+        return user
+
+    def get(self, request, uidb64, token):
+        user = self._get_user(uidb64, token)
+        if user is None:
+            messages.error(request, "Ссылка активации недействительна или уже использована")
+            return redirect('muiv_graduation_system:login')
+        return render(request, self.template_name, {'account': user})
+
+    def post(self, request, uidb64, token):
+        user = self._get_user(uidb64, token)
+        if user is None:
+            messages.error(request, "Ссылка активации недействительна или уже использована")
+            return redirect('muiv_graduation_system:login')
+
+        password = request.POST.get('password', '')
+        password_confirm = request.POST.get('password_confirm', '')
+        if not password or password != password_confirm:
+            messages.error(request, "Пароли не совпадают")
+            return render(request, self.template_name, {'account': user})
+
+        try:
+            validate_password(password, user)
+        except ValidationError as e:
+            for error in e.messages:
+                messages.error(request, error)
+            return render(request, self.template_name, {'account': user})
+
+        user.set_password(password)
+        user.save(update_fields=['password'])
+
+        messages.success(request, "Аккаунт активирован! Войдите в систему.")
+        return redirect('muiv_graduation_system:login')
+
+
 class RegisterView(TemplateView):
     """Выбор роли при регистрации"""
     template_name = 'register.html'
@@ -216,6 +335,11 @@ class RegisterAsView(View):
             messages.error(request, "Фамилия и имя обязательны")
             return render(request, 'register_graduate.html')
 
+        grad_year = _graduation_year(grad_year)
+        if grad_year is None:
+            messages.error(request, "Год выпуска должен быть числом от 2000 до 2030")
+            return render(request, 'register_graduate.html')
+
         if not re.match(r"[^@]+@[^@]+\.[^@]+", email):
             messages.error(request, "Некорректный email")
             return render(request, 'register_graduate.html')
@@ -242,7 +366,7 @@ class RegisterAsView(View):
         Graduate.objects.create(
             user=user,
             full_name=full_name,
-            graduation_year=int(grad_year),
+            graduation_year=grad_year,
             email=email
         )
 
@@ -278,19 +402,22 @@ class RegisterAsView(View):
 # ПРОФИЛЬ
 # ========================
 
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+@method_decorator(condition(
+    etag_func=lambda request: _graduate_profile_validators(request)[0],
+    last_modified_func=lambda request: _graduate_profile_validators(request)[1],
+), name='get')
 class ProfileView(LoginRequiredMixin, View):
     """Профиль пользователя (роутер по ролям)"""
     login_url = 'muiv_graduation_system:login'
 
     def get(self, request):
-        user = request.user
+        role_name = get_role_name(request)
 
-        if not hasattr(user, 'role') or not user.role:
+        if not role_name:
             messages.error(request, "У пользователя не назначена роль")
             return redirect('muiv_graduation_system:index')
 
-        role_name = user.role.name
-
         if role_name == 'graduate':
             return self._graduate_profile(request)
         elif role_name == 'manager':
@@ -303,8 +430,9 @@ class ProfileView(LoginRequiredMixin, View):
     def _graduate_profile(self, request):
         """Профиль выпускника"""
         try:
-            graduate = Graduate.objects.select_related('employment__employer', 'employment__status').get(
-                user=request.user)
+            graduate = Graduate.objects.select_related(
+                'faculty', 'specialization', 'employment__employer', 'employment__status'
+            ).get(user=request.user)
         except Graduate.DoesNotExist:
             messages.error(request, "Профиль выпускника не найден")
             return redirect('muiv_graduation_system:index')
@@ -335,7 +463,7 @@ class EditGraduateView(RoleRequiredMixin, View):
     template_name = 'graduate/edit.html'
 
     def get(self, request):
-        graduate = get_object_or_404(Graduate, user=request.user)
+        graduate = get_object_or_404(Graduate.objects.select_related('faculty', 'specialization'), user=request.user)
         employment = getattr(graduate, 'employment', None)
         statuses = EmploymentStatus.objects.all()
         employer_name = employment.employer.name if employment and employment.employer else ''
@@ -345,12 +473,14 @@ class EditGraduateView(RoleRequiredMixin, View):
             'employment': employment,
             'statuses': statuses,
             'employer_name': employer_name,
+            'faculties': Faculty.objects.all(),
+            'specializations': Specialization.objects.all(),
             'errors': {},
             'form_data': {},
         })
 
     def post(self, request):
-        graduate = get_object_or_404(Graduate, user=request.user)
+        graduate = get_object_or_404(Graduate.objects.select_related('faculty', 'specialization'), user=request.user)
         employment = getattr(graduate, 'employment', None)
 
         # === Сбор данных из формы ===
@@ -433,6 +563,8 @@ class EditGraduateView(RoleRequiredMixin, View):
                 'employment': employment,
                 'statuses': statuses,
                 'employer_name': employer_name,
+                'faculties': Faculty.objects.all(),
+                'specializations': Specialization.objects.all(),
                 'errors': errors,
                 'form_data': request.POST,
             })
@@ -440,8 +572,8 @@ class EditGraduateView(RoleRequiredMixin, View):
         # === Сохранение личных данных ===
         graduate.full_name = full_name
         graduate.graduation_year = int(graduation_year_str)
-        graduate.faculty = faculty
-        graduate.specialization = specialization
+        graduate.faculty_id = Faculty.objects.id_for_name(faculty)
+        graduate.specialization_id = Specialization.objects.id_for_name(specialization)
         graduate.email = email
         graduate.phone = phone
         graduate.save()
@@ -462,11 +594,7 @@ class EditGraduateView(RoleRequiredMixin, View):
                 employment.start_date = None
 
             employer_name = request.POST.get('employer_name', '').strip()
-            if employer_name:
-                employer, _ = Employer.objects.get_or_create(name=employer_name)
-                employment.employer = employer
-            else:
-                employment.employer = None
+            employment.employer_id = Employer.objects.id_for_name(employer_name)
 
             employment.save()
 
@@ -479,168 +607,190 @@ class ExportMyDataView(RoleRequiredMixin, View):
     allowed_roles = ['graduate']
 
     def get(self, request):
-        graduate = get_object_or_404(Graduate, user=request.user)
-        employment = getattr(graduate, 'employment', None)
-
-        doc = Document()
-
-        # Заголовок документа
-        title = doc.add_heading('Персональный отчёт о трудоустройстве', 0)
-        title.alignment = 1  # Центрирование
-
-        # Информация о выпускнике
-        doc.add_paragraph(f'Выпускник: {graduate.full_name}', style='Heading 2')
-        doc.add_paragraph(f'Дата формирования: {datetime.now().strftime("%d.%m.%Y %H:%M")}')
-        doc.add_paragraph('')  # Пустая строка
-
-        # ========================
-        # ЛИЧНЫЕ ДАННЫЕ
-        # ========================
-        doc.add_heading('📋 Личные данные', level=1)
-
-        # Таблица с личными данными
-        personal_table = doc.add_table(rows=6, cols=2)
-        personal_table.style = 'Light Grid Accent 1'
-
-        personal_data = [
-            ('ФИО', graduate.full_name),
-            ('Год выпуска', str(graduate.graduation_year)),
-            ('Факультет', graduate.faculty or 'Не указан'),
-            ('Специальность', graduate.specialization or 'Не указана'),
-            ('Email', graduate.email),
-            ('Телефон', graduate.phone or 'Не указан'),
-        ]
-
-        for i, (label, value) in enumerate(personal_data):
-            row = personal_table.rows[i]
-            row.cells[0].text = label
-            row.cells[1].text = value
-            # Жирный шрифт для лейблов
-            row.cells[0].paragraphs[0].runs[0].bold = True
-
-        doc.add_paragraph('')  # Пустая строка
-
-        # ========================
-        # ТРУДОУСТРОЙСТВО
-        # ========================
-        doc.add_heading('💼 Информация о трудоустройстве', level=1)
-
-        if employment:
-            # Статус трудоустройства
-            status_para = doc.add_paragraph()
-            status_para.add_run('Статус: ').bold = True
-
-            if employment.status:
-                status_run = status_para.add_run(employment.status.name)
-                status_run.font.size = 12
-                # Цвет в зависимости от статуса
-                if employment.status.name.lower() == 'трудоустроен':
-                    status_run.font.color.rgb = RGBColor(34, 139, 34)  # Зелёный
-                elif employment.status.name.lower() == 'в поиске':
-                    status_run.font.color.rgb = RGBColor(255, 165, 0)  # Оранжевый
-                else:
-                    status_run.font.color.rgb = RGBColor(220, 20, 60)  # Красный
-            else:
-                status_para.add_run('Не указан')
-
-            doc.add_paragraph('')
-
-            # Таблица с данными о работе
-            employment_table = doc.add_table(rows=5, cols=2)
-            employment_table.style = 'Light Grid Accent 1'
-
-            employment_data = [
-                ('Работодатель', employment.employer.name if employment.employer else 'Не указан'),
-                ('Должность', employment.job_title or 'Не указана'),
-                ('Зарплата', f'{employment.salary:,} ₽/мес.' if employment.salary else 'Не указана'),
-                ('Дата начала работы',
-                 employment.start_date.strftime('%d.%m.%Y') if employment.start_date else 'Не указана'),
-                ('Стаж работы',
-                 self._calculate_work_experience(employment.start_date) if employment.start_date else '—'),
-            ]
-
-            for i, (label, value) in enumerate(employment_data):
-                row = employment_table.rows[i]
-                row.cells[0].text = label
-                row.cells[1].text = str(value)
-                row.cells[0].paragraphs[0].runs[0].bold = True
-        else:
-            # Если трудоустройство не указано
-            no_employment = doc.add_paragraph()
-            no_employment.add_run('ℹ️ Информация о трудоустройстве отсутствует').italic = True
-            no_employment.alignment = 1  # Центрирование
-
-            doc.add_paragraph('')
-            doc.add_paragraph('Рекомендации:')
-            recommendations = [
-                'Обновите информацию о трудоустройстве в личном кабинете',
-                'Обратитесь в отдел по трудоустройству для консультации',
-                'Воспользуйтесь карьерными услугами университета'
-            ]
-            for rec in recommendations:
-                doc.add_paragraph(f'  • {rec}', style='List Bullet')
-
-        # ========================
-        # ФУТЕР
-        # ========================
-        doc.add_paragraph('')
-        doc.add_paragraph('_' * 60)
-        footer = doc.add_paragraph(
-            f'Документ сформирован автоматически системой учёта трудоустройства выпускников МУ им. С.Ю. Витте'
+        graduate = get_object_or_404(
+            Graduate.objects.select_related('faculty', 'specialization', 'employment__employer', 'employment__status'),
+            user=request.user
         )
-        footer.alignment = 1
-        footer.runs[0].font.size = 8
-        footer.runs[0].italic = True
+        employment = getattr(graduate, 'employment', None)
 
-        # Сохранение файла
         filename = f"personal_report_{graduate.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
         filepath = os.path.join(settings.BASE_DIR, 'static', 'reports', filename)
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        doc.save(filepath)
+        with track_report('personal', 'docx'):
+            get_export_engine('docx').personal_report(graduate, employment, filepath)
+        observe_report_file('personal', 'docx', filepath)
 
         return FileResponse(open(filepath, 'rb'), as_attachment=True, filename=filename)
 
-    def _calculate_work_experience(self, start_date):
-        """Вычисление стажа работы"""
-        if not start_date:
-            return '—'
-
-        from datetime import date
-        today = date.today()
-        delta = today - start_date
-
-        years = delta.days // 365
-        months = (delta.days % 365) // 30
-        days = (delta.days % 365) % 30
-
-        parts = []
-        if years > 0:
-            parts.append(f'{years} {self._pluralize(years, "год", "года", "лет")}')
-        if months > 0:
-            parts.append(f'{months} {self._pluralize(months, "месяц", "месяца", "месяцев")}')
-        if not parts and days > 0:
-            parts.append(f'{days} {self._pluralize(days, "день", "дня", "дней")}')
-
-        return ' '.join(parts) if parts else 'Менее месяца'
-
-    def _pluralize(self, n, form1, form2, form5):
-        """Склонение слов по числам"""
-        n = abs(n) % 100
-        if n >= 5 and n <= 20:
-            return form5
-        n = n % 10
-        if n == 1:
-            return form1
-        if n >= 2 and n <= 4:
-            return form2
-        return form5
+
+# ========================
+# ДОКУМЕНТЫ ВЫПУСКНИКА
+# ========================
+
+class MyDocumentsView(RoleRequiredMixin, View):
+    """Документы выпускника: список и форма загрузки"""
+    allowed_roles = ['graduate']
+
+    def get(self, request):
+        graduate = get_object_or_404(Graduate, user=request.user)
+        return render(request, 'graduate/documents.html', {
+            'documents': graduate.documents.order_by('-uploaded_at'),
+            'doc_types': Document.DOC_TYPES,
+            'allowed_extensions': ','.join(ALLOWED_EXTENSIONS),
+            'max_size_mb': settings.DOCUMENTS_MAX_SIZE // (1024 * 1024),
+        })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class UploadDocumentView(RoleRequiredMixin, View):
+    """
+    Загрузка документа выпускника (потоком на диск, см. DocumentUploadHandler).
+    Обработчик загрузки подменяется до разбора тела, поэтому CSRF проверяется
+    здесь, а не в middleware (она прочитала бы тело стандартными обработчиками).
+    """
+    allowed_roles = ['graduate']
+
+    def post(self, request):
+        handler = DocumentUploadHandler(request)
+        request.upload_handlers = [handler]
+        try:
+            return self._upload(request)
+        finally:
+            handler.discard()
+
+    @method_decorator(csrf_protect)
+    def _upload(self, request):
+        uploaded = request.FILES.get('file')
+        if getattr(request, 'upload_too_large', False):
+            messages.error(request, f"Файл больше {settings.DOCUMENTS_MAX_SIZE // (1024 * 1024)} МБ")
+        elif getattr(request, 'upload_rejected', False):
+            messages.error(request, f"Допустимые типы файлов: {', '.join(ALLOWED_EXTENSIONS)}")
+        elif uploaded is None or not uploaded.size:
+            messages.error(request, "Выберите файл для загрузки")
+        else:
+            graduate = get_object_or_404(Graduate, user=request.user)
+            doc_type = request.POST.get('doc_type', '')
+            if doc_type not in dict(Document.DOC_TYPES):
+                doc_type = ''
+            document, created = store_upload(graduate, uploaded, doc_type)
+            if created:
+                messages.success(request, f"Документ «{document.filename}» загружен")
+            else:
+                messages.info(request, f"Этот файл уже загружен как «{document.filename}»")
+        return redirect('muiv_graduation_system:my_documents')
+
+
+class DownloadDocumentView(LoginRequiredMixin, View):
+    """Скачивание документа: владелец-выпускник, менеджер или администратор"""
+    login_url = 'muiv_graduation_system:login'
+
+    def get(self, request, document_id):
+        document = get_object_or_404(Document.objects.select_related('graduate'), pk=document_id)
+        if get_role_name(request) not in ('manager', 'admin') and document.graduate.user_id != request.user.pk:
+            # Чужой документ неотличим от несуществующего
+            raise Http404
+        return document_response(request, document)
+
+
+# ========================
+# ДОКУМЕНТЫ: ЗАГРУЗКА ПО ЧАСТЯМ (JSON)
+# ========================
+
+def _upload_error(error):
+    return JsonResponse({'error': str(error), 'offset': error.offset}, status=error.status)
+
+
+def _upload_state(session):
+    return {
+        'upload_id': str(session.pk),
+        'offset': session.received,
+        'size': session.size,
+        'chunk_size': settings.DOCUMENTS_UPLOAD_CHUNK_SIZE,
+    }
+
+
+class StartUploadView(RoleRequiredMixin, View):
+    """Начало загрузки по частям: POST filename, size, sha256 (необязательно), doc_type"""
+    allowed_roles = ['graduate']
+
+    def post(self, request):
+        try:
+            size = int(request.POST.get('size', ''))
+        except ValueError:
+            return JsonResponse({'error': 'size должен быть целым числом'}, status=400)
+        try:
+            session = start_upload(
+                request.user, request.POST.get('filename', ''), size,
+                request.POST.get('sha256', '').strip().lower(), request.POST.get('doc_type', ''),
+            )
+        except UploadError as error:
+            return _upload_error(error)
+        return JsonResponse(_upload_state(session), status=201)
+
+
+class UploadChunkView(RoleRequiredMixin, View):
+    """
+    Загрузка по частям: GET — принятое смещение (для продолжения после обрыва),
+    PUT — часть в теле запроса с заголовками Upload-Offset и Upload-Checksum
+    (SHA-256 части), DELETE — отмена.
+    """
+    allowed_roles = ['graduate']
+
+    def get(self, request, upload_id):
+        try:
+            session = get_upload(request.user, upload_id)
+        except UploadError as error:
+            return _upload_error(error)
+        return JsonResponse(_upload_state(session))
+
+    def put(self, request, upload_id):
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return JsonResponse({'error': 'Нужен заголовок Upload-Offset'}, status=400)
+        try:
+            # Тело читается потоком прямо в файл, request.body не трогается
+            received = write_chunk(
+                request.user, upload_id, offset, request, length, request.headers.get('Upload-Checksum', '')
+            )
+        except UploadError as error:
+            return _upload_error(error)
+        return JsonResponse({'offset': received})
+
+    def delete(self, request, upload_id):
+        try:
+            cancel_upload(request.user, upload_id)
+        except UploadError as error:
+            return _upload_error(error)
+        return HttpResponse(status=204)
+
+
+class FinishUploadView(RoleRequiredMixin, View):
+    """Завершение загрузки по частям: проверка SHA-256 и перенос файла в хранилище"""
+    allowed_roles = ['graduate']
+
+    def post(self, request, upload_id):
+        try:
+            document, created = finish_upload(request.user, upload_id)
+        except UploadError as error:
+            return _upload_error(error)
+        return JsonResponse({
+            'document_id': document.id,
+            'created': created,
+            'filename': document.filename,
+            'sha256': document.sha256,
+            'url': reverse('muiv_graduation_system:download_document', args=[document.id]),
+        }, status=201 if created else 200)
 
 
 # ========================
 # МЕНЕДЖЕР: УПРАВЛЕНИЕ ВЫПУСКНИКАМИ
 # ========================
 
-class ManagerGraduatesView(RoleRequiredMixin, ListView):
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+@method_decorator(condition(etag_func=_graduate_list_etag), name='get')
+class ManagerGraduatesView(RoleRequiredMixin, GraduateCardCacheMixin, ListView):
     """Список выпускников для менеджера"""
     allowed_roles = ['manager', 'admin']
     template_name = 'manager/graduates.html'
@@ -649,10 +799,17 @@ class ManagerGraduatesView(RoleRequiredMixin, ListView):
 
     def get_queryset(self):
         return Graduate.objects.select_related(
+            'faculty',
+            'specialization',
             'employment__employer',
             'employment__status'
         ).all()
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['statuses'] = EmploymentStatus.objects.all()
+        return context
+
 
 class EditGraduateByManagerView(RoleRequiredMixin, View):
     """Редактирование выпускника менеджером"""
@@ -660,7 +817,7 @@ class EditGraduateByManagerView(RoleRequiredMixin, View):
     template_name = 'manager/edit_graduate.html'
 
     def get(self, request, grad_id):
-        graduate = get_object_or_404(Graduate, id=grad_id)
+        graduate = get_object_or_404(Graduate.objects.select_related('faculty', 'specialization'), id=grad_id)
         employment = getattr(graduate, 'employment', None)
         statuses = EmploymentStatus.objects.all()
         employer_name = employment.employer.name if employment and employment.employer else ''
@@ -669,7 +826,9 @@ class EditGraduateByManagerView(RoleRequiredMixin, View):
             'graduate': graduate,
             'employment': employment,
             'statuses': statuses,
-            'employer_name': employer_name
+            'employer_name': employer_name,
+            'faculties': Faculty.objects.all(),
+            'specializations': Specialization.objects.all(),
         })
 
     def post(self, request, grad_id):
@@ -679,8 +838,8 @@ class EditGraduateByManagerView(RoleRequiredMixin, View):
         # Обновление данных (аналогично EditGraduateView)
         graduate.full_name = request.POST.get('full_name', '')
         graduate.graduation_year = int(request.POST.get('graduation_year', 0))
-        graduate.faculty = request.POST.get('faculty', '') or None
-        graduate.specialization = request.POST.get('specialization', '') or None
+        graduate.faculty_id = Faculty.objects.id_for_name(request.POST.get('faculty', ''))
+        graduate.specialization_id = Specialization.objects.id_for_name(request.POST.get('specialization', ''))
         graduate.phone = request.POST.get('phone', '') or None
         graduate.email = request.POST.get('email', '')
         graduate.save()
@@ -706,11 +865,7 @@ class EditGraduateByManagerView(RoleRequiredMixin, View):
                     employment.start_date = None
 
             employer_name = request.POST.get('employer_name', '')
-            if employer_name:
-                employer, _ = Employer.objects.get_or_create(name=employer_name)
-                employment.employer = employer
-            else:
-                employment.employer = None
+            employment.employer_id = Employer.objects.id_for_name(employer_name)
 
             employment.save()
 
@@ -718,11 +873,75 @@ class EditGraduateByManagerView(RoleRequiredMixin, View):
         return redirect('muiv_graduation_system:manager_graduates')
 
 
+class BulkUpdateGraduatesView(RoleRequiredMixin, View):
+    """Массовое изменение статуса и работодателя выпускников"""
+    allowed_roles = ['manager', 'admin']
+
+    def post(self, request):
+        next_url = request.POST.get('next', '')
+        if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+            next_url = reverse('muiv_graduation_system:manager_graduates')
+
+        # === Какие выпускники: выбранные или весь результат поиска ===
+        if request.POST.get('scope') == 'all':
+            graduates = _search_graduates(Graduate.objects.all(), request.POST.get('query', '').strip())
+        else:
+            ids = [i for i in request.POST.getlist('graduate_ids') if i.isdigit()]
+            if not ids:
+                messages.warning(request, "Не выбрано ни одного выпускника")
+                return redirect(next_url)
+            graduates = Graduate.objects.filter(id__in=ids)
+
+        # === Что меняем: пустое значение — не менять ===
+        status_id = UNCHANGED
+        status_value = request.POST.get('status_id', '')
+        if status_value == 'clear':
+            status_id = None
+        elif status_value:
+            status = EmploymentStatus.objects.filter(id=status_value).first() if status_value.isdigit() else None
+            if status is None:
+                messages.error(request, "Выбранный статус трудоустройства не найден.")
+                return redirect(next_url)
+            status_id = status.id
+
+        employer_id = UNCHANGED
+        if request.POST.get('clear_employer'):
+            employer_id = None
+        elif request.POST.get('employer_name', '').strip():
+            employer_id = Employer.objects.id_for_name(request.POST['employer_name'])
+
+        if status_id is UNCHANGED and employer_id is UNCHANGED:
+            messages.warning(request, "Укажите статус или работодателя для изменения")
+            return redirect(next_url)
+
+        result = bulk_update_employment(graduates, status_id=status_id, employer_id=employer_id)
+        messages.success(
+            request,
+            f"Обновлено записей о трудоустройстве: {result.updated}, создано новых: {result.created}"
+        )
+        return redirect(next_url)
+
+
 # ========================
 # ПОИСК И ЭКСПОРТ
 # ========================
 
-class SearchGraduatesView(RoleRequiredMixin, ListView):
+def _search_graduates(graduates, query):
+    """Фильтр выпускников по поисковой строке (ФИО, факультет, работодатель и т.д.)"""
+    if not query:
+        return graduates
+    return graduates.filter(
+        Q(full_name__icontains=query) |
+        Q(specialization__name__icontains=query) |
+        Q(faculty__name__icontains=query) |
+        Q(employment__employer__name__icontains=query) |
+        Q(employment__job_title__icontains=query)
+    ).distinct()
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+@method_decorator(condition(etag_func=_graduate_list_etag), name='get')
+class SearchGraduatesView(RoleRequiredMixin, GraduateCardCacheMixin, ListView):
     """Поиск выпускников"""
     allowed_roles = ['manager', 'admin']
     template_name = 'manager/search.html'
@@ -732,24 +951,17 @@ class SearchGraduatesView(RoleRequiredMixin, ListView):
     def get_queryset(self):
         query = self.request.GET.get('query', '').strip()
         graduates = Graduate.objects.select_related(
+            'faculty',
+            'specialization',
             'employment__employer',
             'employment__status'
         )
-
-        if query:
-            graduates = graduates.filter(
-                Q(full_name__icontains=query) |
-                Q(specialization__icontains=query) |
-                Q(faculty__icontains=query) |
-                Q(employment__employer__name__icontains=query) |
-                Q(employment__job_title__icontains=query)
-            )
-
-        return graduates.distinct()
+        return _search_graduates(graduates, query).distinct()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['query'] = self.request.GET.get('query', '')
+        context['statuses'] = EmploymentStatus.objects.all()
         return context
 
 
@@ -758,32 +970,28 @@ class ExportSearchResultsView(RoleRequiredMixin, View):
     allowed_roles = ['manager', 'admin']
 
     def get(self, request, format):
+        engine = get_export_engine(format)
+        if engine is None:
+            messages.error(request, "Неподдерживаемый формат отчёта")
+            return redirect('muiv_graduation_system:search_graduates')
+
         query = request.GET.get('query', '').strip()
-        graduates = Graduate.objects.select_related('employment__employer', 'employment__status')
-
-        if query:
-            graduates = graduates.filter(
-                Q(full_name__icontains=query) |
-                Q(specialization__icontains=query) |
-                Q(faculty__icontains=query) |
-                Q(employment__employer__name__icontains=query) |
-                Q(employment__job_title__icontains=query)
-            ).distinct()
-        else:
-            graduates = graduates.all()
+        graduates = _search_graduates(
+            Graduate.objects.select_related(
+                'faculty', 'specialization', 'employment__employer', 'employment__status'
+            ),
+            query
+        )
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"graduates_report_{timestamp}.{format}"
         filepath = os.path.join(settings.BASE_DIR, 'static', 'reports', filename)
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
-        if format == 'docx':
-            self._export_docx(graduates, filepath, query)
-        elif format == 'xlsx':
-            self._export_xlsx(graduates, filepath, query)
-        else:
-            messages.error(request, "Неподдерживаемый формат отчёта")
-            return redirect('muiv_graduation_system:search_graduates')
+        with track_report('search', format):
+            engine.search_report(graduates, filepath, query)
+        # Выборка уже загружена экспортом — count() без запроса к БД
+        observe_report_file('search', format, filepath, rows=graduates.count())
 
         # Сохранение в базу
         Report.objects.create(
@@ -795,215 +1003,6 @@ class ExportSearchResultsView(RoleRequiredMixin, View):
 
         return FileResponse(open(filepath, 'rb'), as_attachment=True, filename=filename)
 
-    def _export_docx(self, graduates, filepath, query):
-        """Экспорт в DOCX с красивым форматированием"""
-        from docx.shared import Pt, RGBColor, Inches
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-
-        doc = Document()
-
-        # Заголовок
-        title = doc.add_heading('Отчёт по выпускникам', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Информация о поиске
-        if query:
-            search_info = doc.add_paragraph()
-            search_info.add_run('🔍 Поисковый запрос: ').bold = True
-            search_info.add_run(f'"{query}"')
-            search_info.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Метаданные
-        meta = doc.add_paragraph()
-        meta.add_run(f'📅 Дата формирования: {datetime.now().strftime("%d.%m.%Y %H:%M")}\n')
-        meta.add_run(f'👥 Найдено выпускников: {graduates.count()}')
-        meta.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        doc.add_paragraph('')  # Пустая строка
-
-        # Статистика
-        doc.add_heading('📊 Статистика', level=1)
-
-        employed_count = sum(1 for g in graduates if hasattr(g, 'employment') and g.employment and g.employment.status)
-        unemployed_count = graduates.count() - employed_count
-
-        stats_table = doc.add_table(rows=3, cols=2)
-        stats_table.style = 'Light List Accent 1'
-
-        stats_data = [
-            ('Всего выпускников', str(graduates.count())),
-            ('С указанным трудоустройством', str(employed_count)),
-            ('Без информации о трудоустройстве', str(unemployed_count)),
-        ]
-
-        for i, (label, value) in enumerate(stats_data):
-            row = stats_table.rows[i]
-            row.cells[0].text = label
-            row.cells[1].text = value
-            row.cells[0].paragraphs[0].runs[0].bold = True
-
-        doc.add_paragraph('')
-
-        # Таблица выпускников
-        doc.add_heading('📋 Список выпускников', level=1)
-
-        # Заголовки таблицы
-        table = doc.add_table(rows=1, cols=10)
-        table.style = 'Light Grid Accent 1'
-
-        headers = ['№', 'ФИО', 'Год', 'Факультет', 'Специальность', 'Email', 'Телефон', 'Статус', 'Работодатель',
-                   'Должность']
-        hdr_cells = table.rows[0].cells
-
-        for i, header in enumerate(headers):
-            hdr_cells[i].text = header
-            hdr_cells[i].paragraphs[0].runs[0].bold = True
-            hdr_cells[i].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Данные
-        for idx, g in enumerate(graduates, 1):
-            emp = getattr(g, 'employment', None)
-
-            row_cells = table.add_row().cells
-            row_cells[0].text = str(idx)
-            row_cells[1].text = g.full_name or '—'
-            row_cells[2].text = str(g.graduation_year) if g.graduation_year else '—'
-            row_cells[3].text = g.faculty or '—'
-            row_cells[4].text = g.specialization or '—'
-            row_cells[5].text = g.email or '—'
-            row_cells[6].text = g.phone or '—'
-
-            # Статус с цветом
-            if emp and emp.status:
-                status_para = row_cells[7].paragraphs[0]
-                status_run = status_para.add_run(emp.status.name)
-                if emp.status.name.lower() == 'трудоустроен':
-                    status_run.font.color.rgb = RGBColor(34, 139, 34)
-                elif emp.status.name.lower() == 'в поиске':
-                    status_run.font.color.rgb = RGBColor(255, 165, 0)
-                status_run.bold = True
-            else:
-                row_cells[7].text = 'Не указан'
-
-            row_cells[8].text = emp.employer.name if emp and emp.employer else '—'
-            row_cells[9].text = emp.job_title if emp and emp.job_title else '—'
-
-            # Центрирование номера
-            row_cells[0].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Футер
-        doc.add_paragraph('')
-        doc.add_paragraph('_' * 100)
-        footer = doc.add_paragraph(
-            'Документ сформирован автоматически системой учёта трудоустройства выпускников МУ им. С.Ю. Витте'
-        )
-        footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        footer.runs[0].font.size = Pt(8)
-        footer.runs[0].italic = True
-
-        doc.save(filepath)
-
-    def _export_xlsx(self, graduates, filepath, query):
-        """Экспорт в XLSX с форматированием"""
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-        from openpyxl.utils import get_column_letter
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Выпускники"
-
-        # Заголовок
-        ws.merge_cells('A1:J1')
-        title_cell = ws['A1']
-        title_cell.value = 'ОТЧЁТ ПО ВЫПУСКНИКАМ'
-        title_cell.font = Font(size=16, bold=True, color='FFFFFF')
-        title_cell.fill = PatternFill(start_color='940101', end_color='940101', fill_type='solid')
-        title_cell.alignment = Alignment(horizontal='center', vertical='center')
-        ws.row_dimensions[1].height = 30
-
-        # Метаданные
-        ws.merge_cells('A2:J2')
-        meta_cell = ws['A2']
-        meta_text = f'Дата формирования: {datetime.now().strftime("%d.%m.%Y %H:%M")}'
-        if query:
-            meta_text += f' | Поисковый запрос: "{query}"'
-        meta_text += f' | Найдено: {graduates.count()}'
-        meta_cell.value = meta_text
-        meta_cell.alignment = Alignment(horizontal='center')
-        meta_cell.font = Font(italic=True)
-
-        # Пустая строка
-        ws.row_dimensions[3].height = 5
-
-        # Заголовки таблицы
-        headers = ['№', 'ФИО', 'Год выпуска', 'Факультет', 'Специальность', 'Email', 'Телефон', 'Статус',
-                   'Работодатель', 'Должность']
-        header_fill = PatternFill(start_color='D3D3D3', end_color='D3D3D3', fill_type='solid')
-        header_font = Font(bold=True, size=11)
-
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=4, column=col_num, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-        ws.row_dimensions[4].height = 30
-
-        # Данные
-        for idx, g in enumerate(graduates, 1):
-            emp = getattr(g, 'employment', None)
-            row_num = idx + 4
-
-            data = [
-                idx,
-                g.full_name or '—',
-                g.graduation_year if g.graduation_year else '—',
-                g.faculty or '—',
-                g.specialization or '—',
-                g.email or '—',
-                g.phone or '—',
-                emp.status.name if emp and emp.status else 'Не указан',
-                emp.employer.name if emp and emp.employer else '—',
-                emp.job_title if emp and emp.job_title else '—'
-            ]
-
-            for col_num, value in enumerate(data, 1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.alignment = Alignment(horizontal='left' if col_num > 1 else 'center', vertical='center',
-                                           wrap_text=True)
-                cell.border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-
-                # Цвет для статуса
-                if col_num == 8 and emp and emp.status:
-                    if emp.status.name.lower() == 'трудоустроен':
-                        cell.font = Font(color='228B22', bold=True)
-                    elif emp.status.name.lower() == 'в поиске':
-                        cell.font = Font(color='FFA500', bold=True)
-                    else:
-                        cell.font = Font(color='DC143C', bold=True)
-
-        # Автоподбор ширины колонок (исправленная версия)
-        column_widths = [5, 30, 12, 25, 25, 25, 15, 15, 30, 25]
-        for i, width in enumerate(column_widths, 1):
-            column_letter = get_column_letter(i)
-            ws.column_dimensions[column_letter].width = width
-
-        # Замораживание заголовков
-        ws.freeze_panes = 'A5'
-
-        wb.save(filepath)
-
 
 # ========================
 # ОТЧЁТЫ
@@ -1045,7 +1044,9 @@ class AdminCreateUserView(RoleRequiredMixin, View):
         password = request.POST.get('password', '')
         role_id = request.POST.get('role_id', '')
 
-        if User.objects.filter(username=username).exists():
+        if not role_id.isdigit() or not Role.objects.exclude(name='graduate').filter(pk=role_id).exists():
+            messages.error(request, "Выберите роль")
+        elif User.objects.filter(username=username).exists():
             messages.error(request, "Логин занят")
         elif User.objects.filter(email=email).exists():
             messages.error(request, "Email уже используется")
@@ -1073,6 +1074,19 @@ class PendingRequestsView(RoleRequiredMixin, ListView):
     def get_queryset(self):
         return RegistrationRequest.objects.filter(is_approved=False).order_by('-created_at')
 
+    def post(self, request):
+        """Массовое одобрение выбранных (или всех) заявок"""
+        if request.POST.get('approve_all'):
+            queryset = RegistrationRequest.objects.filter(is_approved=False)
+        else:
+            ids = [i for i in request.POST.getlist('request_ids') if i.isdigit()]
+            if not ids:
+                messages.warning(request, "Не выбрано ни одной заявки")
+                return redirect('muiv_graduation_system:pending_requests')
+            queryset = RegistrationRequest.objects.filter(id__in=ids)
+
+        return _approve_requests(request, queryset)
+
 
 class ApproveRequestView(RoleRequiredMixin, View):
     """Одобрение заявки"""
@@ -1085,17 +1099,139 @@ class ApproveRequestView(RoleRequiredMixin, View):
             messages.warning(request, "Заявка уже одобрена")
             return redirect('muiv_graduation_system:pending_requests')
 
-        role = Role.objects.get(name='manager')
-        User.objects.create(
-            username=req.username,
-            email=req.email,
-            password=req.password_hash,
-            role=role
-        )
+        return _approve_requests(request, RegistrationRequest.objects.filter(id=req.id))
 
-        req.is_approved = True
-        req.approved_by = request.user
-        req.save()
 
-        messages.success(request, f"Менеджер {req.username} успешно добавлен!")
+def _approve_requests(request, queryset):
+    """Одобрение заявок через общий сервис и вывод результата"""
+    try:
+        result = approve_registration_requests(queryset, request.user)
+    except Role.DoesNotExist:
+        messages.error(request, "Роль менеджера не найдена")
         return redirect('muiv_graduation_system:pending_requests')
+
+    if len(result.approved) == 1:
+        messages.success(request, f"Менеджер {result.approved[0]} успешно добавлен!")
+    elif result.approved:
+        messages.success(request, f"Одобрено заявок: {len(result.approved)}")
+    if result.skipped:
+        messages.warning(request, f"Логин или email уже заняты, заявки пропущены: {len(result.skipped)}")
+    return redirect('muiv_graduation_system:pending_requests')
+
+
+class FeedbackInboxView(RoleRequiredMixin, View):
+    """Входящие обратной связи: поиск, постраничный просмотр по курсору, массовые отметки"""
+    allowed_roles = ['admin']
+    template_name = 'admin/feedback.html'
+
+    def get(self, request):
+        show_all = request.GET.get('show') == 'all'
+        query = request.GET.get('q', '').strip()
+
+        feedback = Feedback.objects.select_related('user')
+        if not show_all:
+            feedback = feedback.filter(is_read=False)
+        items, next_cursor = feedback_page(search_feedback(feedback, query), request.GET.get('before'))
+
+        return render(request, self.template_name, {
+            'feedback_list': items,
+            'next_cursor': next_cursor,
+            'show_all': show_all,
+            'query': query,
+            'is_first_page': not request.GET.get('before'),
+        })
+
+    def post(self, request):
+        """Отметка выбранных сообщений прочитанными или новыми"""
+        next_url = request.POST.get('next', '')
+        if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+            next_url = reverse('muiv_graduation_system:feedback_inbox')
+
+        ids = [i for i in request.POST.getlist('feedback_ids') if i.isdigit()]
+        if not ids:
+            messages.warning(request, "Не выбрано ни одного сообщения")
+            return redirect(next_url)
+
+        is_read = request.POST.get('action') != 'unread'
+        updated = mark_feedback(ids, is_read)
+        status = "прочитанными" if is_read else "новыми"
+        messages.success(request, f"Отмечено {status}: {updated}")
+        return redirect(next_url)
+
+
+class RateLimitStatsView(RoleRequiredMixin, View):
+    """Счётчики ограничения частоты запросов текущего воркера (JSON)"""
+    allowed_roles = ['admin']
+
+    def get(self, request):
+        return JsonResponse(rate_limit_counters.snapshot())
+
+
+def _bearer_token(request):
+    """Токен из заголовка Authorization: Bearer <токен> (или пустая строка)"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    return token.strip() if scheme.lower() == 'bearer' else ''
+
+
+class MetricsView(View):
+    """
+    Метрики Prometheus: с токеном METRICS_TOKEN или с адресов METRICS_ALLOWED_IPS.
+    Адрес клиента за прокси берётся из RATE_LIMIT_IP_HEADER (client_ip).
+    """
+
+    def get(self, request):
+        expected = getattr(settings, 'METRICS_TOKEN', '')
+        token = _bearer_token(request)
+        if not (expected and token and hmac.compare_digest(token.encode(), expected.encode())) \
+                and client_ip(request) not in getattr(settings, 'METRICS_ALLOWED_IPS', ()):
+            return HttpResponseForbidden()
+        body, content_type = render_metrics()
+        return HttpResponse(body, content_type=content_type)
+
+
+class ChangeFeedView(View):
+    """
+    Лента изменений для внешних систем (JSON).
+    GET ?since=<номер>&limit=<размер> с заголовком Authorization: Bearer <токен>;
+    since — последний полученный номер, он же подтверждение для очистки журнала.
+    """
+
+    def _consumer(self, request):
+        token = _bearer_token(request)
+        if not token:
+            return None
+        for consumer, expected in getattr(settings, 'CHANGE_FEED_CONSUMERS', {}).items():
+            if hmac.compare_digest(token.encode(), expected.encode()):
+                return consumer
+        return None
+
+    def get(self, request):
+        consumer = self._consumer(request)
+        if consumer is None:
+            return JsonResponse({'error': 'unauthorized'}, status=401)
+
+        try:
+            since = max(int(request.GET.get('since', 0)), 0)
+            limit = int(request.GET.get('limit', settings.CHANGE_FEED_BATCH_SIZE))
+        except ValueError:
+            return JsonResponse({'error': 'since и limit должны быть целыми числами'}, status=400)
+        limit = min(max(limit, 1), settings.CHANGE_FEED_MAX_BATCH_SIZE)
+
+        if since:
+            acknowledge(consumer, since)
+        events, has_more = changes_since(since, limit)
+        return JsonResponse({
+            'events': [
+                {
+                    'sequence': event.position,
+                    'entity': event.entity,
+                    'object_id': event.object_id,
+                    'action': event.action,
+                    'payload': event.payload,
+                    'created_at': event.created_at,
+                }
+                for event in events
+            ],
+            'next': events[-1].position if events else since,
+            'has_more': has_more,
+        })
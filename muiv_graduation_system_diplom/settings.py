@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,9 +42,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'muiv_graduation_system.middleware.MetricsMiddleware',
+    'muiv_graduation_system.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'muiv_graduation_system.middleware.PrecompressedStaticMiddleware',
+    'muiv_graduation_system.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'muiv_graduation_system.middleware.RateLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -54,7 +60,8 @@ ROOT_URLCONF = 'muiv_graduation_system_diplom.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени рендера для Server-Timing
+        'BACKEND': 'muiv_graduation_system.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates']
         ,
         'APP_DIRS': True,
@@ -63,28 +70,80 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'muiv_graduation_system.context_processors.user_role',
+                'muiv_graduation_system.context_processors.unread_feedback',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'muiv_graduation_system_diplom.wsgi.application'
+ASGI_APPLICATION = 'muiv_graduation_system_diplom.asgi.application'
+
+# Асинхронные представления входа и регистрации (включать при запуске под ASGI)
+ASYNC_AUTH_VIEWS = False
+
+# Асинхронные списки выпускников и профиль (async ORM; включать при запуске под ASGI)
+ASYNC_READ_VIEWS = False
+
+# Размер пула потоков для хеширования паролей (None — по числу CPU)
+PASSWORD_HASHING_WORKERS = None
 
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
+# Пул соединений psycopg 3 (DB_POOL_MAX_SIZE — соединений на воркер; 0 — без пула,
+# тогда соединения живут CONN_MAX_AGE секунд с проверкой перед использованием)
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))
+
+
+def _database(host, port):
+    config = {
         "ENGINE": 'django.db.backends.postgresql_psycopg2',
         "NAME": 'muivgs',
         "USER": 'postgres',
         "PASSWORD": '1111',
-        "HOST": 'localhost',
-        "PORT": 5432,
+        "HOST": host,
+        "PORT": port,
     }
+    if DB_POOL_MAX_SIZE:
+        from psycopg_pool import ConnectionPool
+
+        config["OPTIONS"] = {
+            "pool": {
+                "min_size": 1,
+                "max_size": DB_POOL_MAX_SIZE,
+                "timeout": 10,
+                "check": ConnectionPool.check_connection,
+            },
+        }
+    else:
+        config["CONN_MAX_AGE"] = 60
+        config["CONN_HEALTH_CHECKS"] = True
+    return config
+
+
+DATABASES = {
+    "default": _database('localhost', 5432),
 }
 
+# Реплика для чтения (поиск, списки, экспорт, счётчики в админке).
+# Задаётся переменными DB_REPLICA_HOST / DB_REPLICA_PORT.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES["replica"] = _database(os.environ['DB_REPLICA_HOST'], int(os.environ.get('DB_REPLICA_PORT', 5432)))
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_ROUTERS = ['muiv_graduation_system.routers.ReplicaRouter']
+
+REPLICA_READ_VIEWS = [
+    'muiv_graduation_system:manager_graduates',
+    'muiv_graduation_system:search_graduates',
+    'muiv_graduation_system:export_search_results',
+    'admin:*_changelist',
+]
+# Сколько секунд после собственной записи пользователь читает только с основной БД
+REPLICA_STICKY_SECONDS = 15
+
 
 
 
@@ -120,6 +179,101 @@ USE_TZ = True
 
 AUTH_USER_MODEL = "muiv_graduation_system.User"
 
+# Пользователь загружается вместе с ролью и профилем выпускника одним запросом
+AUTHENTICATION_BACKENDS = ['muiv_graduation_system.backends.RoleModelBackend']
+
+# Сессии: кеш в памяти процесса поверх БД (или muiv_graduation_system.sessions.file).
+# Истёкшие сессии удаляются командой clearsessions пачками (запускать по cron).
+SESSION_ENGINE = 'muiv_graduation_system.sessions.db'
+SESSION_FRONT_CACHE_TTL = 10
+SESSION_FRONT_CACHE_SIZE = 10000
+SESSION_WRITE_INTERVAL = 60
+SESSION_CLEANUP_BATCH_SIZE = 1000
+
+# Счётчик непрочитанной обратной связи в меню администратора кешируется на это время (сек);
+# новые сообщения, отметки и удаления сбрасывают его сразу
+UNREAD_FEEDBACK_CACHE_TIMEOUT = 60
+
+# Кеш: Redis (REDIS_URL) общий для всех воркеров; без него — память процесса.
+# Кеш карточек выпускников и RATE_LIMIT_CACHE при нескольких воркерах требуют Redis.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        "default": {
+            "BACKEND": 'django.core.cache.backends.redis.RedisCache',
+            "LOCATION": os.environ['REDIS_URL'],
+        }
+    }
+
+# Токены версий (кеш карточек выпускников, ETag списков) хранятся в кеше по умолчанию
+# и должны быть общими для всех воркеров. Без Redis включаются только в DEBUG (один
+# процесс runserver); check --deploy не пропустит их с кешем в памяти процесса.
+SHARED_CACHE_VERSIONS = DEBUG or bool(os.environ.get('REDIS_URL'))
+
+# Время жизни закешированных карточек выпускников (версия меняется при изменении данных)
+GRADUATE_CARD_CACHE_TIMEOUT = 3600
+
+# Дополнительные форматы экспорта: {'pdf': 'путь.к.КлассуДвижка'} (см. muiv_graduation_system.exports)
+EXPORT_ENGINES = {}
+
+# Доля запросов с замерами (заголовок Server-Timing и строка лога muiv_graduation_system.timing)
+SERVER_TIMING_SAMPLE_RATE = 1.0 if DEBUG else 0.05
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'muiv_graduation_system.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Доступ к /metrics (Prometheus): заголовок Authorization: Bearer METRICS_TOKEN
+# или адрес из METRICS_ALLOWED_IPS. За обратным прокси все запросы приходят
+# с 127.0.0.1, поэтому локальные адреса не разрешены по умолчанию, а адрес
+# клиента берётся из RATE_LIMIT_IP_HEADER.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [*filter(None, os.environ.get('METRICS_ALLOWED_IPS', '').split(','))]
+
+# Документы выпускников: хранилище вне static, файлы по SHA-256 содержимого
+DOCUMENTS_ROOT = os.environ.get('DOCUMENTS_ROOT') or BASE_DIR / 'documents'
+DOCUMENTS_MAX_SIZE = 50 * 1024 * 1024
+# Отдача файлов веб-сервером: None — сам Django, 'nginx' — X-Accel-Redirect,
+# 'apache' — X-Sendfile. Для nginx: location DOCUMENTS_ACCEL_PREFIX { internal; alias DOCUMENTS_ROOT/; }
+DOCUMENTS_SENDFILE = os.environ.get('DOCUMENTS_SENDFILE') or None
+DOCUMENTS_ACCEL_PREFIX = '/protected/documents/'
+# Загрузка по частям: рекомендуемый и наибольший размер части, число
+# незавершённых загрузок на пользователя, срок жизни незавершённой загрузки
+# (потом её удаляет cleanup_uploads) и блокировка загрузки на время записи части
+DOCUMENTS_UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+DOCUMENTS_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+DOCUMENTS_MAX_ACTIVE_UPLOADS = 3
+DOCUMENTS_UPLOAD_TTL_HOURS = 24
+DOCUMENTS_UPLOAD_LEASE_SECONDS = 300
+
+# Лента изменений /api/changes/: потребители и их токены в формате имя:токен,имя:токен
+CHANGE_FEED_CONSUMERS = dict(
+    item.split(':', 1) for item in os.environ.get('CHANGE_FEED_CONSUMERS', '').split(',') if ':' in item
+)
+# Размер пачки событий по умолчанию и максимальный
+CHANGE_FEED_BATCH_SIZE = 500
+CHANGE_FEED_MAX_BATCH_SIZE = 5000
+# События старше этого срока удаляются compact_change_feed, даже если их не забрали
+CHANGE_FEED_RETENTION_DAYS = 30
+
+# Ограничение частоты POST-запросов по имени URL: 'ip' — адрес клиента,
+# остальные ключи — поля формы. Формат лимита: число/период (s, m, h, d).
+RATE_LIMITS = {
+    'login': {'ip': '30/m', 'username': '10/m'},
+    'register_as': {'ip': '10/h', 'username': '5/h'},
+    'feedback': {'ip': '10/m', 'email': '5/h'},
+}
+# Алиас кеша (Redis/Memcached) для общих счётчиков всех воркеров; None — в памяти процесса
+RATE_LIMIT_CACHE = None
+# Заголовок с адресом клиента за обратным прокси, например 'HTTP_X_FORWARDED_FOR'
+RATE_LIMIT_IP_HEADER = None
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
@@ -127,5 +281,9 @@ STATIC_URL = "static/"
 STATIC_ROOT = ''
 STATICFILES_DIRS = ["static"]
 if not DEBUG:
-    STATICFILES_DIRS = []
-    STATIC_ROOT = 'static/'
\ No newline at end of file
+    # Сборка: python manage.py build_static (хеши в именах, копии .gz/.br)
+    STATIC_ROOT = BASE_DIR / 'staticfiles'
+    STORAGES = {
+        "default": {"BACKEND": 'django.core.files.storage.FileSystemStorage'},
+        "staticfiles": {"BACKEND": 'muiv_graduation_system.storage.CompressedManifestStaticFilesStorage'},
+    }
\ No newline at end of file
@@ -5,8 +5,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from muiv_graduation_system.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path('', include('muiv_graduation_system.urls', namespace='muiv_graduation_system')),
 ]
 
@@ -0,0 +1,173 @@
+// Загрузка документа по частям с продолжением после обрыва.
+// Форма #document-upload-form отправляется обычным POST, если браузер не умеет fetch/Blob.slice.
+(function () {
+    'use strict';
+
+    var form = document.getElementById('document-upload-form');
+    if (!form || !window.fetch || !window.Blob || !Blob.prototype.slice) {
+        return;
+    }
+
+    var MAX_RETRIES = 8;
+    var progress = document.getElementById('document-upload-progress');
+    var bar = progress ? progress.querySelector('.progress-bar') : null;
+    var errorBox = document.getElementById('document-upload-error');
+    var csrfToken = form.querySelector('[name=csrfmiddlewaretoken]').value;
+    var startUrl = form.dataset.startUrl;
+
+    function storageKey(file) {
+        return 'document-upload:' + file.name + ':' + file.size + ':' + file.lastModified;
+    }
+
+    function showProgress(offset, size) {
+        if (!bar) {
+            return;
+        }
+        var percent = size ? Math.floor(offset * 100 / size) : 0;
+        progress.classList.remove('d-none');
+        bar.style.width = percent + '%';
+        bar.textContent = percent + '%';
+    }
+
+    function showError(message) {
+        errorBox.textContent = message;
+        errorBox.classList.remove('d-none');
+    }
+
+    function sleep(ms) {
+        return new Promise(function (resolve) { setTimeout(resolve, ms); });
+    }
+
+    function hex(buffer) {
+        return Array.prototype.map.call(new Uint8Array(buffer), function (b) {
+            return ('0' + b.toString(16)).slice(-2);
+        }).join('');
+    }
+
+    // SHA-256 части; crypto.subtle есть только в защищённом контексте — без него сумма не передаётся
+    function checksum(blob) {
+        if (!window.crypto || !crypto.subtle) {
+            return Promise.resolve('');
+        }
+        return blob.arrayBuffer().then(function (data) {
+            return crypto.subtle.digest('SHA-256', data);
+        }).then(hex);
+    }
+
+    function request(url, options) {
+        options.headers = Object.assign({'X-CSRFToken': csrfToken}, options.headers || {});
+        options.credentials = 'same-origin';
+        return fetch(url, options).then(function (response) {
+            return response.json().catch(function () { return {}; }).then(function (body) {
+                return {status: response.status, body: body};
+            });
+        });
+    }
+
+    function uploadUrl(uploadId) {
+        return startUrl + uploadId + '/';
+    }
+
+    // Начатая ранее загрузка этого же файла или новая
+    function openUpload(file) {
+        var saved = localStorage.getItem(storageKey(file));
+        var resume = saved
+            ? request(uploadUrl(saved), {method: 'GET'})
+            : Promise.resolve({status: 404});
+        return resume.then(function (result) {
+            if (result.status === 200) {
+                return result.body;
+            }
+            var data = new FormData();
+            data.append('filename', file.name);
+            data.append('size', file.size);
+            data.append('doc_type', form.querySelector('[name=doc_type]').value);
+            return request(startUrl, {method: 'POST', body: data}).then(function (created) {
+                if (created.status !== 201) {
+                    throw new Error(created.body.error || 'Не удалось начать загрузку');
+                }
+                localStorage.setItem(storageKey(file), created.body.upload_id);
+                return created.body;
+            });
+        });
+    }
+
+    function sendChunks(file, upload) {
+        var offset = upload.offset;
+        var failures = 0;
+
+        function next() {
+            showProgress(offset, file.size);
+            if (offset >= file.size) {
+                return Promise.resolve();
+            }
+            var chunk = file.slice(offset, Math.min(offset + upload.chunk_size, file.size));
+            return checksum(chunk).then(function (sum) {
+                var headers = {'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream'};
+                if (sum) {
+                    headers['Upload-Checksum'] = sum;
+                }
+                return request(uploadUrl(upload.upload_id), {method: 'PUT', headers: headers, body: chunk});
+            }).then(function (result) {
+                if (result.status === 200 || (result.status === 409 && result.body.offset !== offset)) {
+                    // 409 с другим смещением — сервер принял больше или меньше, чем думал клиент:
+                    // продолжаем с его смещения; с тем же — часть ещё пишется, ждём и повторяем
+                    offset = result.body.offset;
+                    failures = 0;
+                    return next();
+                }
+                if (result.status >= 400 && result.status < 500 && result.status !== 400) {
+                    throw new Error(result.body.error || 'Ошибка загрузки');
+                }
+                return retry();
+            }, retry);
+        }
+
+        function retry() {
+            failures += 1;
+            if (failures > MAX_RETRIES) {
+                throw new Error('Нет связи с сервером. Выберите тот же файл ещё раз — загрузка продолжится');
+            }
+            return sleep(Math.min(1000 * Math.pow(2, failures - 1), 30000)).then(function () {
+                return request(uploadUrl(upload.upload_id), {method: 'GET'});
+            }).then(function (result) {
+                if (result.status === 200) {
+                    offset = result.body.offset;
+                }
+                return next();
+            }, retry);
+        }
+
+        return next();
+    }
+
+    form.addEventListener('submit', function (event) {
+        var file = form.querySelector('[name=file]').files[0];
+        if (!file) {
+            return;
+        }
+        event.preventDefault();
+        errorBox.classList.add('d-none');
+        form.querySelector('[type=submit]').disabled = true;
+
+        var uploadId;
+        openUpload(file).then(function (upload) {
+            uploadId = upload.upload_id;
+            return sendChunks(file, upload);
+        }).then(function () {
+            return request(uploadUrl(uploadId) + 'finish/', {method: 'POST'});
+        }).then(function (result) {
+            if (result.status === 404 || result.status === 410 || result.status === 422) {
+                localStorage.removeItem(storageKey(file));
+            }
+            if (result.status !== 200 && result.status !== 201) {
+                throw new Error(result.body.error || 'Не удалось завершить загрузку');
+            }
+            localStorage.removeItem(storageKey(file));
+            window.location.reload();
+        }).catch(function (error) {
+            showError(error.message);
+            form.querySelector('[type=submit]').disabled = false;
+        });
+    });
+})();